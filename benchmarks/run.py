@@ -0,0 +1,234 @@
+import argparse
+import asyncio
+import json
+import platform
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.stats import compare, summarize
+from benchmarks.workload import WorkloadGenerator, load_workload
+from src.config import Config
+
+DEFAULT_WORKLOAD = "benchmarks/workload.jsonl"
+SERVER_START_TIMEOUT = 30.0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Replay a weighted request mix against the contact book API."
+    )
+    parser.add_argument(
+        "--target",
+        choices=["asgi", "uvicorn"],
+        default="asgi",
+        help="Call the app in-process through ASGITransport, or over HTTP "
+        "through a uvicorn server started for the run (default: asgi)",
+    )
+    parser.add_argument(
+        "--url", help="Benchmark an already running server instead of --target"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument(
+        "--contacts",
+        type=int,
+        default=10_000,
+        help="Rows seeded by benchmarks.seed",
+    )
+    parser.add_argument("--workload", default=DEFAULT_WORKLOAD)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Allowed slowdown against the baseline (default: 0.1, i.e. 10%%)",
+    )
+    return parser.parse_args()
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    generator: WorkloadGenerator,
+    requests: int,
+    concurrency: int,
+):
+    """Sends `requests` requests from `concurrency` concurrent workers."""
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            request = generator.next_request()
+            route = f"{request.method} {request.route}"
+            start = time.perf_counter()
+            try:
+                response = await client.request(
+                    request.method,
+                    request.url,
+                    params=request.params,
+                    json=request.json,
+                )
+            except httpx.HTTPError:
+                errors[route] += 1
+                continue
+            latencies[route].append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors[route] += 1
+            elif response.status_code < 300 and response.content:
+                generator.record_response(
+                    request, response.status_code, response.json()
+                )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_serving(url: str):
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    async with httpx.AsyncClient(base_url=url) as client:
+        while True:
+            # Ready once the worker has warmed up its connection pool
+            try:
+                response = await client.get("/ready")
+                if response.status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"uvicorn did not become ready on {url}")
+            await asyncio.sleep(0.2)
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    generator = WorkloadGenerator(
+        weights=load_workload(args.workload),
+        contacts=args.contacts,
+    )
+    generator.rng.seed(args.seed)
+
+    server = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url)
+    elif args.target == "uvicorn":
+        port = _free_port()
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "src:app",
+                "--port",
+                str(port),
+                "--workers",
+                str(args.workers),
+                "--log-level",
+                "warning",
+            ]
+        )
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}")
+        await _wait_until_serving(str(client.base_url))
+    else:
+        from src import app
+
+        client = httpx.AsyncClient(
+            # Unhandled errors become 500s, as they would behind uvicorn
+            transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+            base_url="http://localhost",
+        )
+
+    try:
+        async with client:
+            await replay(client, generator, args.warmup, args.concurrency)
+            latencies, errors, elapsed = await replay(
+                client, generator, args.requests, args.concurrency
+            )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "target": args.url or args.target,
+            "workers": args.workers,
+            "contacts": args.contacts,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "workload": generator.weights,
+            # As seen by this process and any uvicorn server it starts
+            "fast_serialization": Config.FAST_SERIALIZATION,
+        },
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+        "routes": {
+            route: summarize(latencies[route], errors[route], elapsed)
+            for route in sorted(latencies.keys() | errors.keys())
+        },
+    }
+
+
+def print_report(results: dict):
+    columns = ("requests", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+    print(f"{'route':<40}" + "".join(f"{column:>16}" for column in columns))
+    for route, summary in [*results["routes"].items(), ("total", results["total"])]:
+        print(f"{route:<40}" + "".join(f"{summary[column]:>16}" for column in columns))
+
+
+async def main():
+    args = parse_args()
+    results = await run(args)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
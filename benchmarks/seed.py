@@ -0,0 +1,56 @@
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy import text
+
+from benchmarks.workload import synthetic_contact
+from src.contacts.service import contact_db_layer
+from src.database.main import get_session
+
+SEED_BATCH_SIZE = 50_000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Fill the contacts table with deterministic synthetic contacts."
+    )
+    parser.add_argument(
+        "--contacts", type=int, default=10_000, help="Contacts to seed (1e4 to 1e7)"
+    )
+    parser.add_argument("--batch-size", type=int, default=SEED_BATCH_SIZE)
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="Keep existing rows instead of truncating the table first",
+    )
+    return parser.parse_args()
+
+
+async def seed(contacts: int, batch_size: int, keep: bool = False) -> int:
+    inserted = 0
+    async with get_session() as session:
+        if not keep:
+            # Restart ids at 1, so contact ids line up with synthetic_contact
+            await session.execute(text("TRUNCATE contacts RESTART IDENTITY"))
+            await session.commit()
+        for start in range(0, contacts, batch_size):
+            rows = [
+                synthetic_contact(index)
+                for index in range(start, min(start + batch_size, contacts))
+            ]
+            inserted += len(await contact_db_layer.copy_contacts(rows, session))
+            print(f"{start + len(rows)}/{contacts} seeded", file=sys.stderr)
+        await session.execute(text("ANALYZE contacts"))
+        await session.commit()
+    return inserted
+
+
+async def main():
+    args = parse_args()
+    inserted = await seed(args.contacts, args.batch_size, args.keep)
+    print(f"Seeded {inserted} contacts")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+import argparse
+import json
+import timeit
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from benchmarks.workload import synthetic_contact
+from src.contacts.responses import ContactJSONResponse
+from src.contacts.schemas import Contact
+from src.contacts.utils import normalize_phone
+from src.database import models
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare the response model and direct contact serializers."
+    )
+    parser.add_argument("--contacts", type=int, default=100, help="Contacts per body")
+    parser.add_argument("--repeat", type=int, default=2_000)
+    return parser.parse_args()
+
+
+def make_rows(count: int) -> list[models.Contact]:
+    now = datetime.utcnow()
+    rows = []
+    for index in range(count):
+        first_name, last_name, phone_number, address = synthetic_contact(index)
+        rows.append(
+            models.Contact(
+                id=index + 1,
+                first_name=first_name,
+                last_name=last_name,
+                phone_number=phone_number,
+                phone_e164=normalize_phone(phone_number),
+                address=address,
+                created_at=now,
+                updated_at=now,
+            )
+        )
+    return rows
+
+
+def main():
+    args = parse_args()
+    rows = make_rows(args.contacts)
+    # What FastAPI does for `response_model=list[Contact]`: validate the rows
+    # into models, dump them back out, then JSON-encode the result
+    adapter = TypeAdapter(list[Contact])
+
+    def response_model():
+        content = adapter.dump_python(
+            adapter.validate_python(rows, from_attributes=True), mode="json"
+        )
+        return JSONResponse(jsonable_encoder(content)).body
+
+    def direct():
+        return ContactJSONResponse(rows).body
+
+    assert json.loads(response_model()) == json.loads(direct())
+    for name, render in [("response_model", response_model), ("direct", direct)]:
+        seconds = min(timeit.repeat(render, number=args.repeat, repeat=3))
+        per_body = seconds / args.repeat * 1_000_000
+        print(f"{name:<16}{per_body:>10.1f} us per {args.contacts}-contact body")
+
+
+if __name__ == "__main__":
+    main()
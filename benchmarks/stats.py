@@ -0,0 +1,49 @@
+import math
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Throughput and latency percentiles, in milliseconds, for one route."""
+    latencies = sorted(latencies)
+    summary = {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3)
+        if latencies
+        else 0.0,
+    }
+    for q in PERCENTILES:
+        summary[f"p{q}_ms"] = round(percentile(latencies, q) * 1000, 3)
+    return summary
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Lists the routes whose p95 or throughput got worse than the baseline by
+    more than `tolerance` (a fraction, 0.1 for 10%).
+    """
+    regressions = []
+    for route, summary in current["routes"].items():
+        before = baseline["routes"].get(route)
+        if before is None:
+            continue
+        if before["p95_ms"] and summary["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{route}: p95 {before['p95_ms']}ms -> {summary['p95_ms']}ms"
+            )
+        if summary["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{route}: throughput {before['throughput_rps']}/s -> "
+                f"{summary['throughput_rps']}/s"
+            )
+    return regressions
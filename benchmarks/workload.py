@@ -0,0 +1,210 @@
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Optional
+
+from src.contacts.utils import encode_cursor
+
+CONTACTS_PATH = "/api/v1/contacts"
+OPERATIONS = (
+    "get",
+    "search_phone",
+    "search_name",
+    "search_address",
+    "paginate",
+    "create",
+    "update",
+    "delete",
+)
+
+FIRST_NAMES = [
+    "Noa", "Yosef", "Tamar", "David", "Maya", "Avraham", "Shira", "Moshe",
+    "Yael", "Daniel", "Michal", "Itai", "Roni", "Omer", "Adi", "Eitan",
+    "Lior", "Ariel", "Hila", "Nadav", "Dana", "Gal", "Yonatan", "Talia",
+    "Amit", "Shai", "Neta", "Uri", "Keren", "Ido", "Liat", "Eyal",
+]  # fmt: skip
+LAST_NAMES = [
+    "Cohen", "Levi", "Mizrahi", "Peretz", "Biton", "Dahan", "Avraham",
+    "Friedman", "Azulay", "Katz", "Yosef", "David", "Amar", "Ohana",
+    "Hadad", "Gabay", "Ben-David", "Malka", "Shapira", "Klein", "Segal",
+    "Ashkenazi", "Rosen", "Goldberg", "Weiss", "Halevi", "Carmeli", "Barak",
+]  # fmt: skip
+STREETS = [
+    "Herzl", "Rothschild", "Dizengoff", "Ben Yehuda", "Allenby", "Jabotinsky",
+    "Weizmann", "King George", "HaNassi", "Bialik", "Arlozorov", "Ibn Gabirol",
+]  # fmt: skip
+
+
+def seeded_phone(index: int) -> str:
+    """Phone number of the `index`-th seeded contact, unique up to 10^8."""
+    return f"05{index:08d}"
+
+
+def synthetic_contact(index: int) -> tuple:
+    """
+    The `index`-th seeded contact as an import row. Derived from the index
+    alone, so the seeder and the load generator agree on every contact.
+    """
+    return (
+        FIRST_NAMES[index % len(FIRST_NAMES)],
+        LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)],
+        seeded_phone(index),
+        f"{index % 200 + 1} {STREETS[(index // 7) % len(STREETS)]}",
+    )
+
+
+def load_workload(path: str) -> dict[str, float]:
+    """Reads the operation mix, one `{"operation", "weight"}` object per line."""
+    weights = {}
+    with open(path) as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            operation = entry.get("operation")
+            if operation not in OPERATIONS:
+                raise ValueError(
+                    f"{path}:{line_number}: unknown operation {operation!r}"
+                )
+            weights[operation] = weights.get(operation, 0) + float(entry["weight"])
+    if not any(weights.values()):
+        raise ValueError(f"{path}: no operation has a positive weight")
+    return weights
+
+
+@dataclass
+class Request:
+    operation: str
+    method: str
+    # Route template, used to group latencies the same way /metrics does
+    route: str
+    url: str
+    params: Optional[dict] = None
+    json: Optional[dict] = None
+
+
+@dataclass
+class WorkloadGenerator:
+    """
+    Produces requests against a table seeded with `contacts` rows by
+    benchmarks.seed. Contacts created during the run are the only ones deleted,
+    so repeated runs leave the seeded data in place.
+    """
+
+    weights: dict[str, float]
+    contacts: int
+    rng: random.Random = field(default_factory=random.Random)
+    created: list[int] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.operations = list(self.weights)
+        self.cumulative_weights = []
+        total = 0.0
+        for operation in self.operations:
+            total += self.weights[operation]
+            self.cumulative_weights.append(total)
+
+    def next_request(self) -> Request:
+        (operation,) = self.rng.choices(
+            self.operations, cum_weights=self.cumulative_weights
+        )
+        return getattr(self, f"_{operation}")()
+
+    def record_response(self, request: Request, status_code: int, body):
+        if request.operation == "create" and status_code == 201:
+            self.created.append(body["id"])
+
+    def _seeded_index(self) -> int:
+        return self.rng.randrange(self.contacts)
+
+    def _get(self):
+        contact_id = self._seeded_index() + 1
+        return Request(
+            "get",
+            "GET",
+            f"{CONTACTS_PATH}/{{contact_id}}",
+            f"{CONTACTS_PATH}/{contact_id}",
+        )
+
+    def _search_phone(self):
+        return Request(
+            "search_phone",
+            "GET",
+            f"{CONTACTS_PATH}/search",
+            f"{CONTACTS_PATH}/search",
+            params={"phone_number": seeded_phone(self._seeded_index())},
+        )
+
+    def _search_name(self):
+        last_name = synthetic_contact(self._seeded_index())[1]
+        return Request(
+            "search_name",
+            "GET",
+            f"{CONTACTS_PATH}/search",
+            f"{CONTACTS_PATH}/search",
+            params={"q": last_name[:3], "mode": "prefix"},
+        )
+
+    def _search_address(self):
+        street = self.rng.choice(STREETS)
+        return Request(
+            "search_address",
+            "GET",
+            f"{CONTACTS_PATH}/search",
+            f"{CONTACTS_PATH}/search",
+            params={"q": street, "mode": "address", "limit": 20},
+        )
+
+    def _paginate(self):
+        after = encode_cursor("id", [self._seeded_index()])
+        return Request(
+            "paginate",
+            "GET",
+            f"{CONTACTS_PATH}/",
+            f"{CONTACTS_PATH}/",
+            params={"after": after, "page_size": 20},
+        )
+
+    def _create(self):
+        # Above the seeded range, so creates only collide with each other
+        index = self.rng.randrange(max(self.contacts, 10**7), 10**8)
+        first_name, last_name, phone_number, address = synthetic_contact(index)
+        return Request(
+            "create",
+            "POST",
+            f"{CONTACTS_PATH}/",
+            f"{CONTACTS_PATH}/",
+            json={
+                "first_name": first_name,
+                "last_name": last_name,
+                "phone_number": phone_number,
+                "address": address,
+            },
+        )
+
+    def _update(self):
+        index = self._seeded_index()
+        first_name, last_name, phone_number, _ = synthetic_contact(index)
+        return Request(
+            "update",
+            "PUT",
+            f"{CONTACTS_PATH}/{{contact_id}}",
+            f"{CONTACTS_PATH}/{index + 1}",
+            json={
+                "first_name": first_name,
+                "last_name": last_name,
+                "phone_number": phone_number,
+                "address": f"{self.rng.randrange(1, 200)} {self.rng.choice(STREETS)}",
+            },
+        )
+
+    def _delete(self):
+        if not self.created:
+            return self._create()
+        contact_id = self.created.pop(self.rng.randrange(len(self.created)))
+        return Request(
+            "delete",
+            "DELETE",
+            f"{CONTACTS_PATH}/{{contact_id}}",
+            f"{CONTACTS_PATH}/{contact_id}",
+        )
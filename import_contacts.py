@@ -0,0 +1,69 @@
+import argparse
+import asyncio
+import csv
+import sys
+
+from src.contacts.service import IMPORT_BATCH_SIZE, ContactService
+
+READ_SIZE = 1024 * 1024
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Bulk-load contacts from a CSV or NDJSON file."
+    )
+    parser.add_argument("path", help="File to import")
+    parser.add_argument(
+        "--format",
+        choices=["csv", "ndjson"],
+        help="File format, guessed from the extension when omitted",
+    )
+    parser.add_argument(
+        "--rejected",
+        default="rejected_rows.csv",
+        help="Where to write rejected rows (default: rejected_rows.csv)",
+    )
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    return parser.parse_args()
+
+
+async def read_chunks(path: str):
+    with open(path, "rb") as file:
+        while chunk := file.read(READ_SIZE):
+            yield chunk
+
+
+def print_progress(summary: dict):
+    print(
+        f"{summary['processed']} processed, {summary['inserted']} inserted, "
+        f"{summary['rejected']} rejected",
+        file=sys.stderr,
+    )
+
+
+async def main():
+    args = parse_args()
+    file_format = args.format or ("ndjson" if args.path.endswith(".ndjson") else "csv")
+
+    with open(args.rejected, "w", newline="") as rejected_file:
+        rejected_writer = csv.writer(rejected_file)
+        rejected_writer.writerow(["line", "reason", "row"])
+
+        summary = await ContactService().import_contacts(
+            chunks=read_chunks(args.path),
+            format=file_format,
+            batch_size=args.batch_size,
+            on_rejected=lambda line_number, line, reason: rejected_writer.writerow(
+                [line_number, reason, line]
+            ),
+            on_progress=print_progress,
+        )
+
+    print(
+        f"Imported {summary['inserted']} contacts, "
+        f"{summary['rejected']} rejected rows written to {args.rejected}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
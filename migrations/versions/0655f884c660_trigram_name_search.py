@@ -0,0 +1,43 @@
+"""Trigram indexes for prefix and fuzzy name search
+
+Revision ID: 0655f884c660
+Revises: e67b4735654b
+Create Date: 2026-10-18 10:41:27.903114
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0655f884c660"
+down_revision: Union[str, None] = "e67b4735654b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Build the GIN indexes without blocking writes on large tables
+    with op.get_context().autocommit_block():
+        for column in ("first_name", "last_name"):
+            op.create_index(
+                f"ix_contacts_{column}_trgm",
+                "contacts",
+                [column],
+                unique=False,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in ("first_name", "last_name"):
+            op.drop_index(
+                f"ix_contacts_{column}_trgm",
+                table_name="contacts",
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,43 @@
+"""Stored responses for idempotency keys
+
+Revision ID: 6d63cefe5aee
+Revises: 9a63758b9bf0
+Create Date: 2026-10-18 16:48:03.772915
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "6d63cefe5aee"
+down_revision: Union[str, None] = "9a63758b9bf0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("key", sa.TEXT(), nullable=False),
+        sa.Column("fingerprint", sa.TEXT(), nullable=False),
+        sa.Column("status_code", sa.INTEGER(), nullable=False),
+        sa.Column("body", postgresql.BYTEA(), nullable=False),
+        sa.Column("created_at", postgresql.TIMESTAMP(), nullable=False),
+        sa.Column("expires_at", postgresql.TIMESTAMP(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index(
+        op.f("ix_idempotency_keys_expires_at"),
+        "idempotency_keys",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_idempotency_keys_expires_at"), table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
@@ -0,0 +1,178 @@
+"""Hash partition contacts by canonical phone number
+
+Revision ID: 9a63758b9bf0
+Revises: a2a23e7e44b2
+Create Date: 2026-10-18 15:36:52.418275
+
+The partitioned table is built next to the live one while the application
+keeps running: a trigger mirrors every write on contacts into it, existing
+rows are copied over in committed batches, and the two tables are swapped in
+one short transaction at the end.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9a63758b9bf0"
+down_revision: Union[str, None] = "a2a23e7e44b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 50_000
+
+# Mirrors database.models.CONTACT_PARTITIONS
+PARTITIONS = 16
+
+COLUMNS = (
+    "id, first_name, last_name, phone_number, phone_e164, address, "
+    "created_at, updated_at"
+)
+
+# address_search is generated, so it is never copied
+COLUMN_DEFINITIONS = """
+    id INTEGER NOT NULL DEFAULT nextval('{sequence}'::regclass),
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    phone_number TEXT NOT NULL,
+    phone_e164 TEXT NOT NULL,
+    address TEXT NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    address_search TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', address))
+        STORED NOT NULL
+"""
+
+# (name, unique, definition) of every index on contacts besides the key
+INDEXES = [
+    ("ix_contacts_phone_e164", True, "(phone_e164)"),
+    ("idx_first_last_name", False, "(first_name, last_name)"),
+    ("idx_last_first_name_id", False, "(last_name, first_name, id)"),
+    ("ix_contacts_first_name_trgm", False, "USING gin (first_name gin_trgm_ops)"),
+    ("ix_contacts_last_name_trgm", False, "USING gin (last_name gin_trgm_ops)"),
+    ("ix_contacts_address_search", False, "USING gin (address_search)"),
+]
+
+# Keeps contacts_partitioned in step with contacts until the swap. Rows the
+# backfill has not reached yet are inserted here and skipped by it later.
+MIRROR_FUNCTION = f"""
+CREATE FUNCTION contacts_mirror_to_partitioned() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM contacts_partitioned
+        WHERE id = OLD.id AND phone_e164 = OLD.phone_e164;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO contacts_partitioned ({COLUMNS})
+        VALUES (NEW.id, NEW.first_name, NEW.last_name, NEW.phone_number,
+                NEW.phone_e164, NEW.address, NEW.created_at, NEW.updated_at)
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def _create_indexes(table: str, suffix: str = ""):
+    for name, unique, definition in INDEXES:
+        op.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX {name}{suffix} "
+            f"ON {table} {definition}"
+        )
+
+
+def _rename_indexes(suffix: str):
+    for name, _, _ in INDEXES:
+        op.execute(f"ALTER INDEX {name}{suffix} RENAME TO {name}")
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        sequence = connection.execute(
+            sa.text("SELECT pg_get_serial_sequence('contacts', 'id')")
+        ).scalar()
+
+        op.execute(
+            "CREATE TABLE contacts_partitioned ("
+            + COLUMN_DEFINITIONS.format(sequence=sequence)
+            + ", PRIMARY KEY (id, phone_e164)) PARTITION BY HASH (phone_e164)"
+        )
+        for remainder in range(PARTITIONS):
+            op.execute(
+                f"CREATE TABLE contacts_p{remainder:02d} "
+                "PARTITION OF contacts_partitioned "
+                f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+            )
+        # Indexes go on while the table is empty, a partitioned table cannot
+        # be indexed concurrently later
+        _create_indexes("contacts_partitioned", suffix="_new")
+
+        # Waits for writes in flight on contacts, every later write is mirrored
+        op.execute(MIRROR_FUNCTION)
+        op.execute(
+            "CREATE TRIGGER contacts_mirror "
+            "AFTER INSERT OR UPDATE OR DELETE ON contacts "
+            "FOR EACH ROW EXECUTE FUNCTION contacts_mirror_to_partitioned()"
+        )
+
+        # Copy in committed batches. FOR SHARE makes a concurrent update of a
+        # row in the batch wait for the batch, so its mirrored update lands
+        # on the copied row instead of being overwritten by a stale copy.
+        max_id = connection.execute(sa.text("SELECT max(id) FROM contacts")).scalar()
+        for start in range(0, (max_id or 0) + 1, BACKFILL_BATCH_SIZE):
+            connection.execute(
+                sa.text(
+                    f"INSERT INTO contacts_partitioned ({COLUMNS}) "
+                    f"SELECT {COLUMNS} FROM contacts "
+                    "WHERE id >= :start AND id < :end FOR SHARE "
+                    "ON CONFLICT DO NOTHING"
+                ),
+                {"start": start, "end": start + BACKFILL_BATCH_SIZE},
+            )
+        connection.execute(sa.text("ANALYZE contacts_partitioned"))
+
+    # Swap, the only step that blocks the application
+    op.execute("LOCK TABLE contacts IN ACCESS EXCLUSIVE MODE")
+    op.execute("DROP TRIGGER contacts_mirror ON contacts")
+    op.execute("DROP FUNCTION contacts_mirror_to_partitioned()")
+    op.execute("ALTER TABLE contacts RENAME TO contacts_unpartitioned")
+    op.execute("ALTER TABLE contacts_partitioned RENAME TO contacts")
+    # Move the id sequence over before its owner is dropped with the old table
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY contacts.id")
+    op.execute("DROP TABLE contacts_unpartitioned")
+    op.execute(
+        "ALTER TABLE contacts RENAME CONSTRAINT contacts_partitioned_pkey "
+        "TO contacts_pkey"
+    )
+    _rename_indexes(suffix="_new")
+
+
+def downgrade() -> None:
+    # Copies the whole table in one transaction, writes wait until it is done
+    connection = op.get_bind()
+    sequence = connection.execute(
+        sa.text("SELECT pg_get_serial_sequence('contacts', 'id')")
+    ).scalar()
+
+    op.execute("LOCK TABLE contacts IN EXCLUSIVE MODE")
+    op.execute(
+        "CREATE TABLE contacts_unpartitioned ("
+        + COLUMN_DEFINITIONS.format(sequence=sequence)
+        + ", PRIMARY KEY (id))"
+    )
+    op.execute(
+        f"INSERT INTO contacts_unpartitioned ({COLUMNS}) SELECT {COLUMNS} FROM contacts"
+    )
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY contacts_unpartitioned.id")
+    op.execute("DROP TABLE contacts")
+    op.execute("ALTER TABLE contacts_unpartitioned RENAME TO contacts")
+    op.execute(
+        "ALTER TABLE contacts RENAME CONSTRAINT contacts_unpartitioned_pkey "
+        "TO contacts_pkey"
+    )
+    _create_indexes("contacts")
@@ -0,0 +1,56 @@
+"""Full-text search column and GIN index on the address
+
+Revision ID: a2a23e7e44b2
+Revises: d6971a067f64
+Create Date: 2026-10-18 14:12:09.561802
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlalchemy.dialects.postgresql as pg
+
+# revision identifiers, used by Alembic.
+revision: str = "a2a23e7e44b2"
+down_revision: Union[str, None] = "d6971a067f64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Mirrors database.models.ADDRESS_SEARCH
+ADDRESS_SEARCH_SQL = "to_tsvector('simple', address)"
+
+
+def upgrade() -> None:
+    # A stored generated column is computed for every existing row while the
+    # table is locked, run this in a maintenance window on large tables
+    op.add_column(
+        "contacts",
+        sa.Column(
+            "address_search",
+            pg.TSVECTOR(),
+            sa.Computed(ADDRESS_SEARCH_SQL, persisted=True),
+            nullable=False,
+        ),
+    )
+    # Build the GIN index without blocking writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_contacts_address_search",
+            "contacts",
+            ["address_search"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_contacts_address_search",
+            table_name="contacts",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("contacts", "address_search")
@@ -0,0 +1,146 @@
+"""Canonical E.164 phone number column
+
+Revision ID: d6971a067f64
+Revises: 0655f884c660
+Create Date: 2026-10-18 11:58:44.207351
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d6971a067f64"
+down_revision: Union[str, None] = "0655f884c660"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 50_000
+INDEX_NAME = "ix_contacts_phone_e164"
+NOT_NULL_CHECK = "contacts_phone_e164_not_null"
+
+
+def canonical_phone_sql(column: str) -> str:
+    # Mirrors contacts.utils.normalize_phone
+    return (
+        f"CASE WHEN {column} ~ '^05[0-9]{{8}}$' "
+        f"THEN '+972' || substr({column}, 2) ELSE {column} END"
+    )
+
+
+CANONICAL_PHONE_SQL = canonical_phone_sql("phone_number")
+
+# Fills phone_e164 on every write while the migration runs, so rows the
+# application inserts or updates after their batch was backfilled are never
+# left NULL or stale
+FILL_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION contacts_fill_phone_e164() RETURNS trigger AS $$
+BEGIN
+    NEW.phone_e164 := {canonical_phone_sql("NEW.phone_number")};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """
+    Online, and safe to run again after a failure at any step. The
+    application must write phone_e164 itself by the time this finishes, the
+    trigger filling it in is dropped at the end.
+    """
+    # Checked before anything is changed, so the migration can simply be run
+    # again once the duplicates are merged
+    connection = op.get_bind()
+    duplicates = connection.execute(
+        sa.text(
+            f"SELECT count(*) FROM (SELECT {CANONICAL_PHONE_SQL} FROM contacts "
+            "GROUP BY 1 HAVING count(*) > 1) AS duplicates"
+        )
+    ).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} phone numbers are stored in more than one format, "
+            "merge those contacts before running this migration"
+        )
+
+    op.execute("ALTER TABLE contacts ADD COLUMN IF NOT EXISTS phone_e164 TEXT")
+    op.execute(FILL_FUNCTION)
+    op.execute("DROP TRIGGER IF EXISTS contacts_fill_phone_e164 ON contacts")
+    op.execute(
+        "CREATE TRIGGER contacts_fill_phone_e164 "
+        "BEFORE INSERT OR UPDATE ON contacts "
+        "FOR EACH ROW EXECUTE FUNCTION contacts_fill_phone_e164()"
+    )
+
+    # Entering the block commits the column and the trigger, every write from
+    # here on fills phone_e164. Backfill the rest in committed batches so the
+    # table is never locked for long.
+    with op.get_context().autocommit_block():
+        max_id = connection.execute(sa.text("SELECT max(id) FROM contacts")).scalar()
+        for start in range(0, (max_id or 0) + 1, BACKFILL_BATCH_SIZE):
+            connection.execute(
+                sa.text(
+                    f"UPDATE contacts SET phone_e164 = {CANONICAL_PHONE_SQL} "
+                    "WHERE id >= :start AND id < :end AND phone_e164 IS NULL"
+                ),
+                {"start": start, "end": start + BACKFILL_BATCH_SIZE},
+            )
+
+        # A failed CREATE INDEX CONCURRENTLY, e.g. on a duplicate written
+        # after the check above, leaves an invalid index behind
+        invalid = connection.execute(
+            sa.text(
+                "SELECT 1 FROM pg_index WHERE indexrelid = to_regclass(:name) "
+                "AND NOT indisvalid"
+            ),
+            {"name": INDEX_NAME},
+        ).scalar()
+        if invalid:
+            op.drop_index(
+                INDEX_NAME,
+                table_name="contacts",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+        op.create_index(
+            INDEX_NAME,
+            "contacts",
+            ["phone_e164"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+        # SET NOT NULL would scan the table under an ACCESS EXCLUSIVE lock. A
+        # validated CHECK constraint proves it instead, and validating one
+        # does not block writes.
+        has_check = connection.execute(
+            sa.text(
+                "SELECT 1 FROM pg_constraint WHERE conname = :name "
+                "AND conrelid = 'contacts'::regclass"
+            ),
+            {"name": NOT_NULL_CHECK},
+        ).scalar()
+        if not has_check:
+            op.execute(
+                f"ALTER TABLE contacts ADD CONSTRAINT {NOT_NULL_CHECK} "
+                "CHECK (phone_e164 IS NOT NULL) NOT VALID"
+            )
+        op.execute(f"ALTER TABLE contacts VALIDATE CONSTRAINT {NOT_NULL_CHECK}")
+
+    op.alter_column("contacts", "phone_e164", nullable=False)
+    op.drop_constraint(NOT_NULL_CHECK, "contacts", type_="check")
+    op.execute("DROP TRIGGER contacts_fill_phone_e164 ON contacts")
+    op.execute("DROP FUNCTION contacts_fill_phone_e164()")
+    op.drop_index("ix_contacts_phone_number", table_name="contacts")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_contacts_phone_number", "contacts", ["phone_number"], unique=True
+    )
+    op.drop_index(op.f("ix_contacts_phone_e164"), table_name="contacts")
+    op.drop_column("contacts", "phone_e164")
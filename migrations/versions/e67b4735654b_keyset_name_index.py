@@ -0,0 +1,30 @@
+"""Index for keyset pagination by name
+
+Revision ID: e67b4735654b
+Revises: 24ec16656f2d
+Create Date: 2026-10-18 09:12:03.512874
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e67b4735654b"
+down_revision: Union[str, None] = "24ec16656f2d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_last_first_name_id",
+        "contacts",
+        ["last_name", "first_name", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_last_first_name_id", table_name="contacts")
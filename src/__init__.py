@@ -1,5 +1,13 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
+from src.config import Config
 from src.contacts.routes import contact_router
+from src.contacts.service import contact_db_layer
+from src.database.main import async_engine, replicas
+from src.database.warmup import readiness, warm_up_engines
+from src.internal.routes import internal_router, metrics_router, probe_router
 from .errors import register_all_errors
 from .middleware import register_middleware
 
@@ -16,6 +24,36 @@ This REST API is able to;
 
 version_prefix = f"/api/{version}"
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background; /ready reports 503 until it has finished
+    engines = [async_engine, *(replica.engine for replica in replicas.replicas)]
+    connections = min(
+        Config.DB_POOL_SIZE
+        if Config.DB_WARMUP_CONNECTIONS is None
+        else Config.DB_WARMUP_CONNECTIONS,
+        Config.DB_POOL_SIZE,
+    )
+    warm_up = None
+    if connections > 0:
+        warm_up = asyncio.create_task(
+            warm_up_engines(engines, connections, contact_db_layer.warm_up)
+        )
+    else:
+        readiness.ready = True
+
+    yield
+
+    readiness.ready = False
+    if warm_up is not None:
+        warm_up.cancel()
+        with suppress(asyncio.CancelledError):
+            await warm_up
+    for engine in engines:
+        await engine.dispose()
+
+
 app = FastAPI(
     title="Contact API",
     description=description,
@@ -23,6 +61,7 @@ app = FastAPI(
     openapi_url=f"{version_prefix}/openapi.json",
     docs_url=f"{version_prefix}/docs",
     redoc_url=f"{version_prefix}/redoc",
+    lifespan=lifespan,
 )
 
 register_all_errors(app)
@@ -30,5 +69,10 @@ register_middleware(app)
 
 
 app.include_router(contact_router, prefix=f"{version_prefix}/contacts", tags=["auth"])
+app.include_router(
+    internal_router, prefix=f"{version_prefix}/internal", tags=["internal"]
+)
+app.include_router(metrics_router, tags=["internal"])
+app.include_router(probe_router, tags=["internal"])
 
 __all__ = ["app"]
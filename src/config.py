@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,6 +11,74 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int  # ✅ Ensure it's an integer
     DATABASE_URL: str
 
+    # Connection pool, the defaults match SQLAlchemy's own
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    # Prepared statements cached per asyncpg connection
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # Read replicas, a comma separated list of DSNs. GET routes read from them
+    # unless they are down or lag more than DB_REPLICA_MAX_LAG seconds, or the
+    # client wrote within the last DB_READ_YOUR_WRITES_WINDOW seconds.
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_MAX_LAG: float = 5.0
+    DB_REPLICA_CHECK_INTERVAL: float = 5.0
+    DB_REPLICA_CHECK_TIMEOUT: float = 1.0
+    DB_READ_YOUR_WRITES_WINDOW: float = 5.0
+
+    # Pool connections opened and primed with the hot statements at startup,
+    # per engine. Defaults to DB_POOL_SIZE, 0 skips the warm-up.
+    DB_WARMUP_CONNECTIONS: Optional[int] = None
+
+    # Slow query log, off unless DB_SLOW_QUERY_MS is set. Slower statements
+    # are logged and the last DB_SLOW_QUERY_LOG_SIZE are kept for
+    # /internal/slow-queries; DB_SLOW_QUERY_EXPLAIN_RATE of the slow SELECTs
+    # get an EXPLAIN (ANALYZE, BUFFERS) captured in the background.
+    DB_SLOW_QUERY_MS: Optional[float] = None
+    DB_SLOW_QUERY_LOG_SIZE: int = 100
+    DB_SLOW_QUERY_EXPLAIN_RATE: float = 0.1
+    DB_SLOW_QUERY_EXPLAIN_TIMEOUT: float = 10.0
+
+    # Connections all workers of `python -m src.server` may open to one
+    # database server together, unset to give every worker the full pool
+    DB_MAX_CONNECTIONS: Optional[int] = None
+
+    # Production server, `python -m src.server`. WEB_WORKERS defaults to the
+    # number of available CPU cores.
+    WEB_HOST: str = "0.0.0.0"
+    WEB_PORT: int = 8000
+    WEB_WORKERS: Optional[int] = None
+    WEB_GRACEFUL_TIMEOUT: float = 30.0
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = False
+    # Fraction of per-request INFO lines (lookups, searches) that are logged
+    LOG_HOT_PATH_SAMPLE_RATE: float = 1.0
+
+    # Metrics, set a shared directory when running several worker processes
+    METRICS_MULTIPROC_DIR: Optional[str] = None
+    METRICS_FLUSH_INTERVAL: float = 5.0
+
+    # Cache for single-contact lookups, see contacts.cache.create_cache.
+    # "lru_ttl" is in-process and only invalidated on the worker that wrote,
+    # so `python -m src.server` switches it to "none" when it runs more than
+    # one worker, unless CONTACT_CACHE_BACKEND is set. A size of 0 also
+    # disables it.
+    CONTACT_CACHE_BACKEND: Optional[Literal["lru_ttl", "none"]] = None
+    CONTACT_CACHE_SIZE: int = 10_000
+    CONTACT_CACHE_TTL: float = 30.0
+
+    # Seconds a response is kept for replay under its Idempotency-Key
+    IDEMPOTENCY_KEY_TTL: float = 86_400.0
+
+    # Render contact responses straight from the ORM rows, skipping the
+    # response model validation (see contacts.responses)
+    FAST_SERIALIZATION: bool = True
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 
@@ -0,0 +1,144 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+class CacheBackend(ABC):
+    """
+    Interface for the contact cache. Methods are async so a shared backend
+    (e.g. Redis) can be dropped in without changing the service.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value, or None on a miss."""
+
+    @abstractmethod
+    async def peek(self, key: str) -> Optional[Any]:
+        """Like get, without counting a hit or miss or refreshing the entry."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any) -> None:
+        pass
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        pass
+
+    @abstractmethod
+    async def clear(self) -> None:
+        pass
+
+    @abstractmethod
+    async def stats(self) -> dict:
+        pass
+
+
+class LRUTTLCache(CacheBackend):
+    """
+    In-process cache evicting the least recently used entry once `maxsize` is
+    reached. Entries expire `ttl` seconds after being set, which bounds how
+    stale another worker's copy can get after a write.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def peek(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self.clock():
+            return None
+        return entry[1]
+
+    async def set(self, key: str, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    async def stats(self) -> dict:
+        return {
+            "backend": "lru_ttl",
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class NullCache(CacheBackend):
+    """Caches nothing, every lookup goes to the database."""
+
+    async def get(self, key: str) -> Optional[Any]:
+        return None
+
+    async def peek(self, key: str) -> Optional[Any]:
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        pass
+
+    async def delete(self, *keys: str) -> None:
+        pass
+
+    async def clear(self) -> None:
+        pass
+
+    async def stats(self) -> dict:
+        return {"backend": "none"}
+
+
+def create_cache(backend: str, maxsize: int, ttl: float) -> CacheBackend:
+    """
+    The cache backend named by `backend`. "lru_ttl" is local to the process,
+    so a write on one worker leaves the other workers serving their copy
+    until it expires; "none" disables caching.
+    """
+    if backend == "lru_ttl":
+        return LRUTTLCache(maxsize=maxsize, ttl=ttl)
+    if backend == "none":
+        return NullCache()
+    raise ValueError(f"Unknown contact cache backend: {backend}")
@@ -0,0 +1,107 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+# Validators for conditional GETs. Every write bumps Contact.updated_at, so
+# (id, updated_at) identifies the representation of a contact, and the
+# (id, updated_at) pairs of its rows identify a page.
+
+
+def _get(contact, field: str):
+    if isinstance(contact, dict):
+        return contact.get(field)
+    return getattr(contact, field, None)
+
+
+def contact_version(contact) -> Optional[tuple]:
+    """(id, updated_at) of a contact, None when it carries no updated_at."""
+    updated_at = _get(contact, "updated_at")
+    if updated_at is None:
+        return None
+    return _get(contact, "id"), updated_at
+
+
+def contact_etag(contact_id: int, updated_at: datetime) -> str:
+    return f'"{contact_id}-{updated_at:%Y%m%d%H%M%S%f}"'
+
+
+def page_etag(
+    versions: list[tuple], has_more: bool = False, total: Optional[int] = None
+) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for contact_id, updated_at in versions:
+        digest.update(f"{contact_id}-{updated_at:%Y%m%d%H%M%S%f};".encode())
+    digest.update(b"more" if has_more else b"last")
+    if total is not None:
+        digest.update(f";total={total}".encode())
+    return f'"p-{digest.hexdigest()}"'
+
+
+def _http_date(updated_at: datetime) -> str:
+    # updated_at is stored as naive UTC
+    return format_datetime(updated_at.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def contact_validators(contact_id: int, updated_at: datetime) -> dict:
+    return {
+        "ETag": contact_etag(contact_id, updated_at),
+        "Last-Modified": _http_date(updated_at),
+    }
+
+
+def validators_for_contact(contact) -> dict:
+    version = contact_version(contact)
+    return contact_validators(*version) if version else {}
+
+
+def validators_for_page(
+    contacts, has_more: bool = False, total: Optional[int] = None
+) -> dict:
+    # A page has no honest Last-Modified, deleting a row does not move the
+    # newest updated_at, so pages are only validated by ETag
+    versions = [contact_version(contact) for contact in contacts]
+    if None in versions:
+        return {}
+    return {"ETag": page_etag(versions, has_more, total)}
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, validators: dict) -> bool:
+    """
+    Evaluates If-None-Match, or If-Modified-Since when no If-None-Match was
+    sent, against the validators of the current representation.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etag = validators.get("ETag")
+        if etag is None:
+            return False
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        # If-None-Match uses the weak comparison
+        return "*" in candidates or etag in [
+            tag.removeprefix("W/") for tag in candidates
+        ]
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = validators.get("Last-Modified")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # HTTP dates have a resolution of one second
+    return parsedate_to_datetime(last_modified) <= since
+
+
+def not_modified_response(validators: dict) -> Response:
+    return Response(status_code=HTTP_304_NOT_MODIFIED, headers=validators)
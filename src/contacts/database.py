@@ -1,61 +1,304 @@
-from sqlalchemy.exc import IntegrityError
-from typing import Any
+from datetime import timedelta
+from typing import Any, Optional
+import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import (
+    and_,
+    any_,
+    bindparam,
+    cast,
+    column,
+    delete,
+    func,
+    literal,
+    literal_column,
+    or_,
+    table,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, INTERVAL, REAL, insert
 from sqlmodel import select
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import Contact
+from src.database.instrumentation import label_queries
+from src.database.models import (
+    ADDRESS_SEARCH,
+    ADDRESS_SEARCH_CONFIG,
+    Contact,
+    IdempotencyKey,
+)
+from src.database.slow_queries import SKIP_OPTION
 
+from .utils import normalize_phone
 
+IMPORT_COLUMNS = ["first_name", "last_name", "phone_number", "address", "phone_e164"]
+
+import_staging = table("contacts_import_staging", *map(column, IMPORT_COLUMNS))
+
+# Matches no contact and has enough trigrams to stay on the trigram indexes
+WARM_UP_TERM = "zqxwarmupzqx"
+
+
+def _utc_now():
+    # Timestamps are stored as naive UTC
+    return func.timezone("utc", func.now())
+
+
+def _contact_values(contact_data: Any, **kwargs) -> dict:
+    values = contact_data.model_dump(**kwargs)
+    if "phone_number" in values:
+        values["phone_e164"] = normalize_phone(values["phone_number"])
+    return values
+
+
+# The mapped columns of Contact, which leave out the generated address_search
+CONTACT_COLUMNS = tuple(Contact.__mapper__.columns)
+
+
+def _returning_contacts(statement):
+    # RETURNING Contact lists every column of the table, address_search
+    # included, when compiled outside the ORM. Naming the mapped columns keeps
+    # the tsvector on the server whichever way the statement is compiled.
+    return select(Contact).from_statement(statement.returning(*CONTACT_COLUMNS))
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _entities(columns: Optional[tuple]) -> tuple:
+    # The whole row, or only the named columns of a sparse fieldset
+    if columns is None:
+        return (Contact,)
+    return tuple(getattr(Contact, name) for name in columns)
+
+
+def _all(result, columns: Optional[tuple]) -> list:
+    if columns is None:
+        return result.scalars().all()
+    # Projected rows become plain dicts, no ORM instances are built for them
+    return [row._asdict() for row in result]
+
+
+def _first(result, columns: Optional[tuple]):
+    if columns is None:
+        return result.scalars().first()
+    row = result.first()
+    return row._asdict() if row is not None else None
+
+
+def _keyset_page(entities: tuple, after: Optional[list], limit: int, sort: str):
+    # Keyset pagination: seek past the last row of the previous page on an
+    # index instead of counting rows with OFFSET.
+    if sort == "name":
+        keys = (Contact.last_name, Contact.first_name, Contact.id)
+    else:
+        keys = (Contact.id,)
+
+    statement = select(*entities).order_by(*keys).limit(limit)
+    if after is not None:
+        statement = statement.where(tuple_(*keys) > tuple_(*after))
+    return statement
+
+
+@label_queries
 class ContactDBLayer:
     async def create_contact(self, contact_data: Any, session: AsyncSession):
-        contact_data_dict = contact_data.model_dump()
-        new_contact = Contact(**contact_data_dict)
-        session.add(new_contact)
+        # A duplicate phone number inserts nothing and returns no row
+        statement = _returning_contacts(
+            insert(Contact)
+            .values(**_contact_values(contact_data))
+            .on_conflict_do_nothing(index_elements=[Contact.phone_e164])
+        )
+        result = await session.execute(statement)
+        return result.scalars().first()
+
+    async def bulk_create_contacts(self, contacts: list, session: AsyncSession):
+        # One multi-row INSERT; rows whose phone number already exists are
+        # skipped by the database and simply absent from RETURNING.
+        if not contacts:
+            return []
+
+        statement = _returning_contacts(
+            insert(Contact)
+            .values([_contact_values(contact) for contact in contacts])
+            .on_conflict_do_nothing(index_elements=[Contact.phone_e164])
+        )
+        result = await session.execute(statement)
+        return result.scalars().all()
 
-        try:
-            await session.commit()
-            return new_contact
-        except IntegrityError as e:
-            await session.rollback()
-            if "unique constraint" in str(e.orig).lower():
-                return None
-            raise e
+    async def copy_contacts(self, rows: list[tuple], session: AsyncSession):
+        # COPY the batch into a session-local staging table, then merge it into
+        # contacts with a single INSERT ... SELECT. Returns the canonical phone
+        # numbers that were inserted; the caller commits.
+        connection = await session.connection()
+        await connection.exec_driver_sql(
+            f"CREATE TEMP TABLE IF NOT EXISTS {import_staging.name} "
+            "(first_name TEXT, last_name TEXT, phone_number TEXT, address TEXT, "
+            "phone_e164 TEXT) ON COMMIT DELETE ROWS"
+        )
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            import_staging.name,
+            records=[(*row, normalize_phone(row[2])) for row in rows],
+            columns=IMPORT_COLUMNS,
+        )
+
+        now = _utc_now()
+        statement = (
+            insert(Contact)
+            .from_select(
+                [*IMPORT_COLUMNS, "created_at", "updated_at"],
+                select(*import_staging.c, now, now),
+            )
+            .on_conflict_do_nothing(index_elements=[Contact.phone_e164])
+            .returning(Contact.phone_e164)
+        )
+        result = await connection.execute(statement)
+        return set(result.scalars().all())
+
+    async def get_contact(
+        self, contact_id: int, session: AsyncSession, columns: Optional[tuple] = None
+    ):
+        # Not the partition key, every partition probes its primary key index
+        statement = select(*_entities(columns)).where(Contact.id == contact_id)
+        result = await session.execute(statement)
+        return _first(result, columns)  # ✅ Returns None if not found, no exception
 
-    async def get_contact(self, contact_id: int, session: AsyncSession):
-        statement = select(Contact).where(Contact.id == contact_id)
+    async def get_contacts_by_ids(self, ids: list[int], session: AsyncSession):
+        # One array parameter, so every batch size shares a prepared statement
+        statement = select(Contact).where(
+            Contact.id == any_(bindparam("ids", ids, type_=ARRAY(pg.INTEGER)))
+        )
         result = await session.execute(statement)
-        return result.scalars().first()  # ✅ Returns None if not found, no exception
+        return result.scalars().all()
+
+    async def get_contacts_by_phones(
+        self, phones_e164: list[str], session: AsyncSession
+    ):
+        # Postgres cannot prune partitions on an array parameter, each
+        # partition probes its phone_e164 index once for the whole batch
+        statement = select(Contact).where(
+            Contact.phone_e164
+            == any_(bindparam("phones", phones_e164, type_=ARRAY(pg.TEXT)))
+        )
+        result = await session.execute(statement)
+        return result.scalars().all()
+
+    async def get_contact_version(self, contact_id: int, session: AsyncSession):
+        # Enough to answer a conditional GET without loading the row
+        statement = select(Contact.updated_at).where(Contact.id == contact_id)
+        result = await session.execute(statement)
+        return result.scalars().first()
 
     async def get_contacts_paginated(
-        self, offset: int, page_size: int, session: AsyncSession
+        self,
+        offset: int,
+        page_size: int,
+        session: AsyncSession,
+        columns: Optional[tuple] = None,
     ):
-        statement = select(Contact).offset(offset).limit(page_size)
+        statement = (
+            select(*_entities(columns))
+            .order_by(Contact.id)
+            .offset(offset)
+            .limit(page_size)
+        )
         result = await session.execute(statement)
-        contacts = result.scalars().all()
+        contacts = _all(result, columns)
 
         return contacts
 
-    async def delete_contact(self, contact_id: int, session: AsyncSession):
-        contact = await self.get_contact(contact_id=contact_id, session=session)
+    async def estimate_contacts_count(self, session: AsyncSession):
+        # The planner's own estimate: rows per page from the last ANALYZE,
+        # scaled to each partition's current size and summed. None while a
+        # partition has never been analyzed.
+        statement = text(
+            "SELECT CASE WHEN count(*) = count(estimate) THEN sum(estimate) "
+            "END::bigint FROM (SELECT CASE "
+            "WHEN reltuples < 0 THEN NULL "
+            "WHEN relpages = 0 THEN CASE WHEN pg_relation_size(oid) = 0 THEN 0 END "
+            "ELSE reltuples / relpages * (pg_relation_size(oid) "
+            "/ current_setting('block_size')::int) END AS estimate "
+            "FROM pg_class WHERE relkind = 'r' AND (oid = CAST(:table AS regclass) "
+            "OR oid IN (SELECT inhrelid FROM pg_inherits "
+            "WHERE inhparent = CAST(:table AS regclass)))) AS partitions"
+        )
+        result = await session.execute(statement, {"table": Contact.__tablename__})
+        return result.scalar()
 
-        if contact is None:
-            return False
+    async def count_contacts(self, session: AsyncSession):
+        result = await session.execute(select(func.count()).select_from(Contact))
+        return result.scalar_one()
 
-        await session.delete(contact)
-        await session.commit()
-        return True
+    async def get_versions_paginated(
+        self, offset: int, page_size: int, session: AsyncSession
+    ):
+        statement = (
+            select(Contact.id, Contact.updated_at)
+            .order_by(Contact.id)
+            .offset(offset)
+            .limit(page_size)
+        )
+        result = await session.execute(statement)
+        return [tuple(row) for row in result.all()]
 
-    async def update_contact(
-        self, contact_to_update, update_data: Any, session: AsyncSession
+    async def get_contacts_after(
+        self,
+        after: Optional[list],
+        page_size: int,
+        sort: str,
+        session: AsyncSession,
+        columns: Optional[tuple] = None,
     ):
-        update_data_dict = update_data.model_dump(exclude_unset=True)
+        statement = _keyset_page(_entities(columns), after, page_size, sort)
+        result = await session.execute(statement)
+        return _all(result, columns)
 
-        for key, value in update_data_dict.items():
-            setattr(contact_to_update, key, value)
+    async def get_versions_after(
+        self,
+        after: Optional[list],
+        page_size: int,
+        sort: str,
+        session: AsyncSession,
+    ):
+        # Same page as get_contacts_after, reduced to (id, updated_at) pairs
+        statement = _keyset_page(
+            (Contact.id, Contact.updated_at), after, page_size, sort
+        )
+        result = await session.execute(statement)
+        return [tuple(row) for row in result.all()]
 
-        await session.commit()
-        return contact_to_update
+    async def stream_contacts(self, chunk_size: int, session: AsyncSession):
+        # Server-side cursor: rows arrive `chunk_size` at a time, so memory
+        # stays flat no matter how large the table is.
+        statement = (
+            select(Contact).order_by(Contact.id).execution_options(yield_per=chunk_size)
+        )
+        result = await session.stream_scalars(statement)
+        async for contacts in result.partitions():
+            yield contacts
+
+    async def delete_contact(self, contact_id: int, session: AsyncSession):
+        statement = (
+            delete(Contact).where(Contact.id == contact_id).returning(Contact.id)
+        )
+        result = await session.execute(statement)
+        return result.scalars().first() is not None
+
+    async def update_contact(
+        self, contact_id: int, update_data: Any, session: AsyncSession
+    ):
+        # Returns None when no contact has this id
+        statement = _returning_contacts(
+            update(Contact)
+            .where(Contact.id == contact_id)
+            .values(**_contact_values(update_data, exclude_unset=True))
+        )
+        result = await session.execute(statement)
+        return result.scalars().first()
 
     async def search_contact(
         self,
@@ -63,15 +306,197 @@ class ContactDBLayer:
         first_name: str = None,
         last_name: str = None,
         session: AsyncSession = None,
+        columns: Optional[tuple] = None,
     ):
         if phone_number:
-            statement = select(Contact).where(Contact.phone_number == phone_number)
+            # Equality on the partition key, so only one partition is read
+            statement = select(*_entities(columns)).where(
+                Contact.phone_e164 == normalize_phone(phone_number)
+            )
         elif first_name and last_name:
-            statement = select(Contact).where(
+            statement = select(*_entities(columns)).where(
                 Contact.first_name == first_name, Contact.last_name == last_name
             )
 
         result = await session.execute(statement)
-        contacts = result.scalars().all()
+        contacts = _all(result, columns)
 
         return contacts
+
+    async def search_contacts_by_name(
+        self,
+        query: str,
+        mode: str,
+        limit: int,
+        session: AsyncSession,
+        columns: Optional[tuple] = None,
+    ):
+        # Both modes can use the pg_trgm GIN indexes on first_name and
+        # last_name. Fuzzy matches are ranked by trigram similarity to the
+        # query, which the similarity threshold keeps to a small candidate set.
+        # A short prefix can match a large share of the table, so prefix
+        # matches come in name order instead: Postgres walks
+        # idx_last_first_name_id and stops after `limit` rows rather than
+        # scoring every match.
+        order_by = [Contact.last_name, Contact.first_name, Contact.id]
+
+        if mode == "prefix":
+            # Every term must prefix either name, so "jo do" finds John Doe
+            conditions = []
+            for term in query.split():
+                pattern = _escape_like(term) + "%"
+                conditions.append(
+                    or_(
+                        Contact.first_name.ilike(pattern, escape="\\"),
+                        Contact.last_name.ilike(pattern, escape="\\"),
+                    )
+                )
+            criteria = and_(*conditions)
+        else:
+            criteria = or_(
+                Contact.first_name.op("%")(query), Contact.last_name.op("%")(query)
+            )
+            score = func.greatest(
+                func.similarity(Contact.first_name, query),
+                func.similarity(Contact.last_name, query),
+            )
+            order_by.insert(0, score.desc())
+
+        statement = (
+            select(*_entities(columns)).where(criteria).order_by(*order_by).limit(limit)
+        )
+        result = await session.execute(statement)
+        return _all(result, columns)
+
+    async def search_contacts_by_address(
+        self,
+        query: str,
+        after: Optional[list],
+        limit: int,
+        session: AsyncSession,
+        columns: Optional[tuple] = None,
+    ):
+        """
+        Contacts whose address holds every word of `query`, found through the
+        GIN index on the address_search tsvector and ranked by ts_rank. Returns
+        (contact, rank) pairs; `after` is the [rank, id] of the last row of the
+        previous page.
+        """
+        tsquery = func.websearch_to_tsquery(
+            literal_column(f"'{ADDRESS_SEARCH_CONFIG}'"), query
+        )
+        rank = func.ts_rank(ADDRESS_SEARCH, tsquery)
+
+        statement = (
+            select(*_entities(columns), rank.label("search_rank"))
+            .where(ADDRESS_SEARCH.op("@@")(tsquery))
+            .order_by(rank.desc(), Contact.id)
+            .limit(limit)
+        )
+        if after is not None:
+            after_rank, after_id = after
+            # Ranks are real values, compare them as such so the rank read
+            # back from the cursor equals the one computed here
+            after_rank = cast(after_rank, REAL)
+            statement = statement.where(
+                or_(
+                    rank < after_rank,
+                    and_(rank == after_rank, Contact.id > after_id),
+                )
+            )
+        result = await session.execute(statement)
+        rows = result.all()
+        if columns is None:
+            return [(row[0], row.search_rank) for row in rows]
+        return [(row._asdict(), row.search_rank) for row in rows]
+
+    async def lock_idempotency_key(self, key: str, session: AsyncSession):
+        # Held until the transaction ends, so a concurrent request with the
+        # same key, on any worker, waits for this one to commit or roll back.
+        # That wait is not a slow query, and an EXPLAIN ANALYZE of it would
+        # queue up for the same lock.
+        statement = select(
+            func.pg_advisory_xact_lock(func.hashtextextended(key, 0))
+        ).execution_options(**{SKIP_OPTION: True})
+        await session.execute(statement)
+
+    async def get_idempotency_record(self, key: str, session: AsyncSession):
+        statement = select(IdempotencyKey).where(
+            IdempotencyKey.key == key, IdempotencyKey.expires_at > _utc_now()
+        )
+        result = await session.execute(statement)
+        return result.scalars().first()
+
+    async def save_idempotency_record(
+        self,
+        key: str,
+        fingerprint: str,
+        status_code: int,
+        body: bytes,
+        ttl: float,
+        session: AsyncSession,
+    ):
+        now = _utc_now()
+        statement = insert(IdempotencyKey).values(
+            key=key,
+            fingerprint=fingerprint,
+            status_code=status_code,
+            body=body,
+            created_at=now,
+            expires_at=now + literal(timedelta(seconds=ttl), INTERVAL),
+        )
+        # Only an expired record can still hold the key
+        statement = statement.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key],
+            set_={
+                name: statement.excluded[name]
+                for name in (
+                    "fingerprint",
+                    "status_code",
+                    "body",
+                    "created_at",
+                    "expires_at",
+                )
+            },
+            where=IdempotencyKey.expires_at <= now,
+        )
+        await session.execute(statement)
+
+    async def purge_idempotency_keys(self, limit: int, session: AsyncSession):
+        # Skips rows another transaction is already deleting
+        expired = (
+            select(IdempotencyKey.key)
+            .where(IdempotencyKey.expires_at <= _utc_now())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        statement = delete(IdempotencyKey).where(IdempotencyKey.key.in_(expired))
+        await session.execute(statement)
+
+    async def warm_up(self, session: AsyncSession):
+        # Runs the hot read statements once with arguments that match nothing,
+        # so SQLAlchemy compiles them and asyncpg prepares them on this
+        # session's connection before real traffic needs them.
+        await self.get_contact(contact_id=0, session=session)
+        await self.get_contact_version(contact_id=0, session=session)
+        await self.search_contact(phone_number=WARM_UP_TERM, session=session)
+        await self.get_contacts_by_ids(ids=[0], session=session)
+        await self.get_contacts_by_phones(phones_e164=[WARM_UP_TERM], session=session)
+        for sort, after in [("id", None), ("id", [0]), ("name", None)]:
+            await self.get_contacts_after(
+                after=after, page_size=1, sort=sort, session=session
+            )
+            await self.get_versions_after(
+                after=after, page_size=1, sort=sort, session=session
+            )
+        await self.get_contacts_paginated(offset=0, page_size=1, session=session)
+        await self.get_versions_paginated(offset=0, page_size=1, session=session)
+        for mode in ("prefix", "fuzzy"):
+            await self.search_contacts_by_name(
+                query=WARM_UP_TERM, mode=mode, limit=1, session=session
+            )
+        for after in (None, [0.0, 0]):
+            await self.search_contacts_by_address(
+                query=WARM_UP_TERM, after=after, limit=1, session=session
+            )
+        await self.estimate_contacts_count(session=session)
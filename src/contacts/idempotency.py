@@ -0,0 +1,99 @@
+import asyncio
+import hashlib
+import json
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import Config
+from src.errors import IdempotencyKeyReused
+from src.logger import app_log
+
+from .service import contact_db_layer
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+# Set on responses replayed from a stored record
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+# Expired keys deleted along with every stored response, more than one so
+# the table shrinks back after a burst of requests
+PURGE_BATCH_SIZE = 2
+
+# Requests of this worker currently holding or waiting for each key
+_local_locks: dict[str, list] = {}
+
+
+@asynccontextmanager
+async def _local_lock(key: str):
+    # Duplicates within one worker queue here, before checking out a
+    # database connection to wait on the advisory lock
+    entry = _local_locks.setdefault(key, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del _local_locks[key]
+
+
+def request_fingerprint(request: Request, payload: BaseModel) -> str:
+    body = json.dumps(
+        payload.model_dump(mode="json"), sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(
+        f"{request.method} {request.url.path}\n{body}".encode()
+    ).hexdigest()
+
+
+async def idempotent(
+    request: Request,
+    key: Optional[str],
+    payload: BaseModel,
+    session: AsyncSession,
+    handler: Callable[[], Awaitable[Response]],
+) -> Response:
+    """
+    Runs `handler` once per Idempotency-Key. The response is stored in
+    idempotency_keys in the request's own transaction, so it commits together
+    with the write it describes; a retry with the same key and body gets the
+    stored response back without touching contacts. A concurrent duplicate
+    waits on the key's lock until the first request has committed, then
+    replays it. Failed requests store nothing and may be retried.
+    """
+    if key is None:
+        return await handler()
+
+    fingerprint = request_fingerprint(request, payload)
+    async with _local_lock(key):
+        await contact_db_layer.lock_idempotency_key(key=key, session=session)
+        stored = await contact_db_layer.get_idempotency_record(key=key, session=session)
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                app_log.warning("Idempotency key reused for a different request")
+                raise IdempotencyKeyReused()
+            app_log.info("Replaying stored response for an idempotency key")
+            return Response(
+                stored.body,
+                status_code=stored.status_code,
+                media_type="application/json",
+                headers={REPLAYED_HEADER: "true"},
+            )
+
+        response = await handler()
+        await contact_db_layer.save_idempotency_record(
+            key=key,
+            fingerprint=fingerprint,
+            status_code=response.status_code,
+            body=response.body,
+            ttl=Config.IDEMPOTENCY_KEY_TTL,
+            session=session,
+        )
+        await contact_db_layer.purge_idempotency_keys(
+            limit=PURGE_BATCH_SIZE, session=session
+        )
+        return response
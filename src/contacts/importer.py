@@ -0,0 +1,87 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Iterator, Optional
+
+from src.errors import InvalidImportFile
+
+IMPORT_FIELDS = ["first_name", "last_name", "phone_number", "address"]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 byte chunks into lines without buffering the file."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+class RecordParser:
+    """
+    Turns numbered lines into contact records. Every record must sit on a single
+    line, CSV files need a header naming at least the `IMPORT_FIELDS` columns.
+    """
+
+    def __init__(self, format: str):
+        self.format = format
+        self.header: Optional[list[str]] = None
+
+    def parse(
+        self, lines: list[tuple[int, str]]
+    ) -> Iterator[tuple[int, str, Optional[dict], Optional[str]]]:
+        """Yields (line number, raw line, record, rejection reason) per line."""
+        if self.format == "csv":
+            return self._parse_csv(lines)
+        return self._parse_ndjson(lines)
+
+    def _parse_csv(self, lines):
+        for line_number, line in lines:
+            if not line.strip():
+                continue
+            try:
+                row = next(csv.reader([line], strict=True))
+            except csv.Error:
+                yield line_number, line, None, "malformed"
+                continue
+            if self.header is None:
+                self.header = [column.strip() for column in row]
+                missing = set(IMPORT_FIELDS) - set(self.header)
+                if missing:
+                    raise InvalidImportFile()
+                continue
+            if len(row) != len(self.header):
+                yield line_number, line, None, "malformed"
+                continue
+            yield line_number, line, dict(zip(self.header, row)), None
+
+    def _parse_ndjson(self, lines):
+        for line_number, line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if not isinstance(record, dict):
+                yield line_number, line, None, "malformed"
+                continue
+            yield line_number, line, record, None
+
+
+def to_row(record: dict) -> Optional[tuple]:
+    """Returns the record as a row in `IMPORT_FIELDS` order, None if incomplete."""
+    values = []
+    for field in IMPORT_FIELDS:
+        value = record.get(field)
+        if not isinstance(value, str) or not value.strip():
+            return None
+        values.append(value.strip())
+    return tuple(values)
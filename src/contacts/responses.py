@@ -0,0 +1,116 @@
+import json
+from typing import Optional
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from starlette.status import HTTP_200_OK
+
+from src.config import Config
+
+from .schemas import Contact
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+CONTACT_FIELDS = tuple(Contact.model_fields)
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def contact_to_dict(contact, fields: tuple = CONTACT_FIELDS) -> dict:
+    """
+    The public `schemas.Contact` fields, or the `fields` subset of them, of an
+    ORM row, cached contact or projected row.
+    """
+    if isinstance(contact, dict):
+        return {field: contact[field] for field in fields}
+    # Loaded column values live in the instance __dict__, reading them there
+    # skips the attribute instrumentation, which costs several times more
+    values = vars(contact)
+    try:
+        return {field: values[field] for field in fields}
+    except KeyError:
+        # Expired or deferred attribute, let the ORM load it
+        return {field: getattr(contact, field) for field in fields}
+
+
+def _is_contact_dict(content: dict, fields: frozenset) -> bool:
+    # Lookup results are keyed by user input, which may spell a field name
+    return content.keys() >= fields and isinstance(content.get("id"), int)
+
+
+def _to_plain(content, fields: tuple, field_set: frozenset):
+    if isinstance(content, _PLAIN_TYPES):
+        return content
+    if isinstance(content, (list, tuple)):
+        return [_to_plain(item, fields, field_set) for item in content]
+    if isinstance(content, dict) and not _is_contact_dict(content, field_set):
+        # A wrapper such as ContactPage, whose values may hold contacts
+        return {
+            key: _to_plain(value, fields, field_set) for key, value in content.items()
+        }
+    return contact_to_dict(content, fields)
+
+
+class ContactJSONResponse(JSONResponse):
+    """
+    Renders contacts, lists of contacts and pages of contacts straight from
+    the ORM rows, without validating them into response models first. With
+    `fields` every contact is rendered with only those fields.
+    """
+
+    def __init__(self, content, fields: Optional[tuple] = None, **kwargs):
+        self.fields = fields or CONTACT_FIELDS
+        super().__init__(content, **kwargs)
+
+    def render(self, content) -> bytes:
+        return dumps(_to_plain(content, self.fields, frozenset(self.fields)))
+
+
+_adapters: dict = {}
+
+
+def _model_content(content, model):
+    # What FastAPI does with `response_model`: validate, then dump as JSON data
+    adapter = _adapters.get(model)
+    if adapter is None:
+        adapter = _adapters[model] = TypeAdapter(model)
+    # exclude_unset leaves out optional keys the content does not carry, as
+    # the direct serializer does
+    return adapter.dump_python(
+        adapter.validate_python(content, from_attributes=True),
+        mode="json",
+        exclude_unset=True,
+    )
+
+
+def contact_response(
+    content,
+    model,
+    status_code: int = HTTP_200_OK,
+    headers: Optional[dict] = None,
+    fields: Optional[tuple] = None,
+):
+    """
+    Wraps a route's contact result in a `ContactJSONResponse`. Returning a
+    response makes FastAPI skip the `response_model` round trip, which is only
+    kept for the OpenAPI schema. With FAST_SERIALIZATION off the content goes
+    through `model` the way FastAPI would validate it, except for sparse
+    fieldsets, which `model` does not describe.
+    """
+    if fields is not None:
+        return ContactJSONResponse(
+            content, fields=fields, status_code=status_code, headers=headers
+        )
+    if not Config.FAST_SERIALIZATION:
+        return JSONResponse(
+            _model_content(content, model), status_code=status_code, headers=headers
+        )
+    return ContactJSONResponse(content, status_code=status_code, headers=headers)
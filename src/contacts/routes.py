@@ -1,54 +1,327 @@
-from fastapi import APIRouter, Query, status
+from typing import Literal, Optional, Union
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    Query,
+    Request,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.status import HTTP_200_OK
 
-from src.contacts.service import ContactService
+from src.database.main import get_db_session, get_read_session
+from src.contacts.service import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SEARCH_LIMIT,
+    MAX_BULK_SIZE,
+    MAX_LOOKUP_SIZE,
+    MAX_PAGE_SIZE,
+    MAX_SEARCH_LIMIT,
+    ContactService,
+)
 
-from .schemas import Contact, ContactCreateModel, ContactUpdateModel
+from .conditional import (
+    contact_validators,
+    is_conditional,
+    is_not_modified,
+    not_modified_response,
+    page_etag,
+    validators_for_contact,
+    validators_for_page,
+)
+from .idempotency import IDEMPOTENCY_HEADER, MAX_KEY_LENGTH, idempotent
+from .responses import CONTACT_FIELDS, contact_response
+from .schemas import (
+    BulkCreateResult,
+    Contact,
+    ContactCreateModel,
+    ContactLookupResult,
+    ContactPage,
+    ContactUpdateModel,
+    ImportSummary,
+)
+from .utils import parse_fields
 
 contact_router = APIRouter()
 contact_service = ContactService()
 
 
+def sparse_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Comma separated contact fields to return, e.g. "
+        "`first_name,last_name,phone_number`. Only these columns are read.",
+    ),
+) -> Optional[tuple]:
+    if fields is None:
+        return None
+    return parse_fields(fields, CONTACT_FIELDS)
+
+
+def idempotency_key(
+    key: Optional[str] = Header(
+        None,
+        alias=IDEMPOTENCY_HEADER,
+        min_length=1,
+        max_length=MAX_KEY_LENGTH,
+        description="Client generated key; a retry with the same key and body "
+        "gets the stored response instead of writing again.",
+    ),
+) -> Optional[str]:
+    return key
+
+
 # Create Route
 @contact_router.post("/", status_code=status.HTTP_201_CREATED, response_model=Contact)
-async def create_contact(contact_data: ContactCreateModel) -> Contact:
-    return await contact_service.create_contact(contact_data=contact_data)
+async def create_contact(
+    contact_data: ContactCreateModel,
+    request: Request,
+    key: Optional[str] = Depends(idempotency_key),
+    session: AsyncSession = Depends(get_db_session),
+):
+    async def create():
+        contact = await contact_service.create_contact(
+            contact_data=contact_data, session=session
+        )
+        return contact_response(contact, Contact, status_code=status.HTTP_201_CREATED)
+
+    return await idempotent(request, key, contact_data, session, create)
+
+
+# Bulk Create Route
+@contact_router.post(
+    "/bulk", status_code=status.HTTP_200_OK, response_model=list[BulkCreateResult]
+)
+async def bulk_create_contacts(
+    contacts: list[ContactCreateModel] = Body(..., max_length=MAX_BULK_SIZE),
+    session: AsyncSession = Depends(get_db_session),
+):
+    return await contact_service.bulk_create_contacts(
+        contacts=contacts, session=session
+    )
+
+
+# Batch Lookup Route
+@contact_router.post(
+    "/lookup", status_code=status.HTTP_200_OK, response_model=ContactLookupResult
+)
+async def lookup_contacts(
+    ids: list[int] = Body([], max_length=MAX_LOOKUP_SIZE),
+    phone_numbers: list[str] = Body([], max_length=MAX_LOOKUP_SIZE),
+    session: AsyncSession = Depends(get_read_session),
+):
+    result = await contact_service.lookup_contacts(
+        ids=ids, phone_numbers=phone_numbers, session=session
+    )
+    return contact_response(result, ContactLookupResult)
+
+
+# Import Route
+IMPORT_READ_SIZE = 64 * 1024
+
+
+async def _read_upload(file: UploadFile):
+    while chunk := await file.read(IMPORT_READ_SIZE):
+        yield chunk
+
+
+@contact_router.post(
+    "/import", status_code=status.HTTP_200_OK, response_model=ImportSummary
+)
+async def import_contacts(file: UploadFile, format: Literal["csv", "ndjson"] = "csv"):
+    return await contact_service.import_contacts(
+        chunks=_read_upload(file), format=format
+    )
 
 
 # Get Route
 @contact_router.get(
     "/{contact_id:int}", status_code=status.HTTP_200_OK, response_model=Contact
 )
-async def get_contact(contact_id: int) -> Contact:
-    return await contact_service.get_contact(contact_id=contact_id)
+async def get_contact(
+    contact_id: int,
+    request: Request,
+    fields: Optional[tuple] = Depends(sparse_fields),
+    session: AsyncSession = Depends(get_read_session),
+):
+    if is_conditional(request):
+        # Answer revalidations from updated_at alone, without loading the row
+        updated_at = await contact_service.get_contact_version(
+            contact_id=contact_id, session=session
+        )
+        validators = contact_validators(contact_id, updated_at)
+        if is_not_modified(request, validators):
+            return not_modified_response(validators)
+
+    contact = await contact_service.get_contact(
+        contact_id=contact_id, session=session, fields=fields
+    )
+    return contact_response(
+        contact, Contact, headers=validators_for_contact(contact), fields=fields
+    )
+
+
+# Export Route
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@contact_router.get("/export", status_code=HTTP_200_OK)
+async def export_contacts(format: Literal["ndjson", "csv"] = "ndjson"):
+    return StreamingResponse(
+        contact_service.export_contacts(format=format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="contacts.{format}"'},
+    )
 
 
 # Delete Route
 @contact_router.delete("/{contact_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_contact(contact_id: int):
-    return await contact_service.delete_contact(contact_id=contact_id)
+async def delete_contact(
+    contact_id: int, session: AsyncSession = Depends(get_db_session)
+):
+    return await contact_service.delete_contact(contact_id=contact_id, session=session)
 
 
 # Pagination Route
-@contact_router.get("/", status_code=HTTP_200_OK, response_model=list[Contact])
-async def get_contacts_paginated(page: int = 1):
-    return await contact_service.get_contacts_paginated(page=page)
+# The legacy offset listing is kept for `page` and for a bare request. The
+# cursor mode is used with `mode=cursor` or any of `after`, `page_size` and
+# `sort`.
+@contact_router.get(
+    "/", status_code=HTTP_200_OK, response_model=Union[list[Contact], ContactPage]
+)
+async def get_contacts_paginated(
+    request: Request,
+    page: Optional[int] = None,
+    mode: Optional[Literal["page", "cursor"]] = None,
+    after: Optional[str] = None,
+    page_size: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    sort: Optional[Literal["id", "name"]] = None,
+    include_total: bool = False,
+    count: Literal["estimate", "exact"] = "estimate",
+    fields: Optional[tuple] = Depends(sparse_fields),
+    session: AsyncSession = Depends(get_read_session),
+):
+    total = None
+    if include_total:
+        total, is_estimate = await contact_service.count_contacts(
+            session=session, exact=count == "exact"
+        )
+
+    cursor_mode = page is None and (
+        mode == "cursor"
+        or (mode is None and any(v is not None for v in (after, page_size, sort)))
+    )
+    conditional = "if-none-match" in request.headers
+    if not cursor_mode:
+        page = 1 if page is None else page
+        if conditional:
+            versions = await contact_service.get_contacts_paginated_versions(
+                page=page, session=session
+            )
+            validators = {"ETag": page_etag(versions, total=total)}
+            if is_not_modified(request, validators):
+                return not_modified_response(validators)
+
+        contacts = await contact_service.get_contacts_paginated(
+            page=page, session=session, fields=fields
+        )
+        headers = validators_for_page(contacts, total=total)
+        if total is not None:
+            # The legacy listing is a bare array, so its metadata goes in headers
+            headers.update(
+                {
+                    "X-Total-Count": str(total),
+                    "X-Total-Pages": str(_total_pages(total, DEFAULT_PAGE_SIZE)),
+                    "X-Total-Is-Estimate": str(is_estimate).lower(),
+                    "X-Page": str(page),
+                    "X-Page-Size": str(DEFAULT_PAGE_SIZE),
+                }
+            )
+        return contact_response(contacts, list[Contact], headers=headers, fields=fields)
+
+    page_size = page_size or DEFAULT_PAGE_SIZE
+    sort = sort or "id"
+    if conditional:
+        versions, has_more = await contact_service.get_contacts_keyset_versions(
+            after=after, page_size=page_size, sort=sort, session=session
+        )
+        validators = {"ETag": page_etag(versions, has_more, total=total)}
+        if is_not_modified(request, validators):
+            return not_modified_response(validators)
+
+    contact_page = await contact_service.get_contacts_keyset(
+        after=after, page_size=page_size, sort=sort, session=session, fields=fields
+    )
+    has_more = contact_page["next_cursor"] is not None
+    if total is not None:
+        contact_page.update(
+            total=total,
+            total_pages=_total_pages(total, page_size),
+            total_is_estimate=is_estimate,
+        )
+    return contact_response(
+        contact_page,
+        ContactPage,
+        headers=validators_for_page(contact_page["items"], has_more, total=total),
+        fields=fields,
+    )
+
+
+def _total_pages(total: int, page_size: int) -> int:
+    return -(-total // page_size)
 
 
 # Update Route
 @contact_router.put("/{contact_id}", response_model=Contact)
-async def update_contact(contact_id: int, update_data: ContactUpdateModel):
-    return await contact_service.update_contact(
-        contact_id=contact_id, update_data=update_data
-    )
+async def update_contact(
+    contact_id: int,
+    update_data: ContactUpdateModel,
+    request: Request,
+    key: Optional[str] = Depends(idempotency_key),
+    session: AsyncSession = Depends(get_db_session),
+):
+    async def update():
+        contact = await contact_service.update_contact(
+            contact_id=contact_id, update_data=update_data, session=session
+        )
+        return contact_response(contact, Contact)
 
+    return await idempotent(request, key, update_data, session, update)
 
-@contact_router.get("/search", status_code=HTTP_200_OK, response_model=list[Contact])
+
+# `mode=address` searches the address by words and returns a page with a cursor
+@contact_router.get(
+    "/search",
+    status_code=HTTP_200_OK,
+    response_model=Union[list[Contact], ContactPage],
+)
 async def search_contact(
     phone_number: str = Query(None),
     first_name: str = Query(None),
     last_name: str = Query(None),
+    q: str = Query(None),
+    mode: Literal["exact", "prefix", "fuzzy", "address"] = "exact",
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    after: Optional[str] = None,
+    fields: Optional[tuple] = Depends(sparse_fields),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    return await contact_service.search_contact(
-        phone_number=phone_number, first_name=first_name, last_name=last_name
+    contacts = await contact_service.search_contact(
+        phone_number=phone_number,
+        first_name=first_name,
+        last_name=last_name,
+        q=q,
+        mode=mode,
+        limit=limit,
+        after=after,
+        session=session,
+        fields=fields,
     )
+    if mode == "address":
+        return contact_response(contacts, ContactPage, fields=fields)
+    return contact_response(contacts, list[Contact], fields=fields)
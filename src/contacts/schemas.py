@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Contact(BaseModel):
@@ -10,6 +10,15 @@ class Contact(BaseModel):
     address: str
 
 
+class ContactPage(BaseModel):
+    items: list[Contact]
+    next_cursor: Optional[str] = None
+    # Only present when the page was requested with include_total
+    total: Optional[int] = None
+    total_pages: Optional[int] = None
+    total_is_estimate: Optional[bool] = None
+
+
 class ContactCreateModel(BaseModel):
     first_name: str
     last_name: str
@@ -17,6 +26,36 @@ class ContactCreateModel(BaseModel):
     address: str
 
 
+class BulkCreateResult(BaseModel):
+    index: int
+    status: Literal["created", "duplicate", "invalid_phone"]
+    contact: Optional[Contact] = None
+
+
+class LookupResult(BaseModel):
+    status: Literal["found", "not_found"]
+    contact: Optional[Contact] = None
+
+
+class ContactLookupResult(BaseModel):
+    # Keyed by the ids and phone numbers as sent, in request order
+    ids: dict[str, LookupResult]
+    phone_numbers: dict[str, LookupResult]
+
+
+class RejectedRow(BaseModel):
+    line: int
+    reason: str
+    row: str
+
+
+class ImportSummary(BaseModel):
+    processed: int
+    inserted: int
+    rejected: int
+    rejected_rows: list[RejectedRow]
+
+
 class ContactUpdateModel(BaseModel):
     first_name: str
     last_name: str
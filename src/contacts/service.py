@@ -1,8 +1,23 @@
+import csv
+import io
+import json
+from functools import partial
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import create_cache
 from .database import ContactDBLayer
+from .importer import RecordParser, iter_lines, to_row
 
-from .schemas import ContactCreateModel, ContactUpdateModel
-from .utils import is_valid_israeli_phone
-from ..database.main import get_session
+from .schemas import Contact, ContactCreateModel, ContactUpdateModel
+from .utils import (
+    decode_cursor,
+    encode_cursor,
+    is_valid_israeli_phone,
+    normalize_phone,
+)
+from ..database.main import after_commit, from_replica, get_session
 from ..errors import (
     ContactNotFound,
     InvalidPageNumber,
@@ -10,97 +25,636 @@ from ..errors import (
     InvalidPhoneNumber,
     InvalidSearch,
 )
+from src.config import Config
 from src.logger import app_log
 
+# Per-request INFO lines are sampled, the rest of the log is kept in full
+HOT_PATH_LOG_SAMPLE_RATE = Config.LOG_HOT_PATH_SAMPLE_RATE
+
 contact_db_layer = ContactDBLayer()
+contact_cache = create_cache(
+    Config.CONTACT_CACHE_BACKEND or "lru_ttl",
+    maxsize=Config.CONTACT_CACHE_SIZE,
+    ttl=Config.CONTACT_CACHE_TTL,
+)
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+# Each row binds six parameters, keep well below asyncpg's 32767 limit
+MAX_BULK_SIZE = 1000
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_FIELDS = list(Contact.model_fields)
+IMPORT_BATCH_SIZE = 5000
+# Ids plus phone numbers resolved by one lookup request
+MAX_LOOKUP_SIZE = 1000
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+# Rejections returned inline by the import endpoint, the rest are only counted
+MAX_REPORTED_REJECTIONS = 100
+
+# Columns making up the keyset cursor for each supported sort order, and
+# their types
+CURSOR_KEY_FIELDS = {
+    "id": ("id",),
+    "name": ("last_name", "first_name", "id"),
+}
+CURSOR_KEY_TYPES = {
+    "id": (int,),
+    "name": (str, str, int),
+}
+# Address search pages are continued from the (rank, id) of their last row
+ADDRESS_CURSOR_TYPES = (float, int)
+# Loaded with every sparse fieldset, the ETag and Last-Modified validators
+# are computed from them
+VERSION_FIELDS = ("id", "updated_at")
+_PROJECTABLE_COLUMNS = (*EXPORT_FIELDS, "updated_at")
+
+
+def _cursor_keys(contact, sort: str) -> list:
+    if isinstance(contact, dict):
+        return [contact[field] for field in CURSOR_KEY_FIELDS[sort]]
+    return [getattr(contact, field) for field in CURSOR_KEY_FIELDS[sort]]
+
+
+def _columns(fields: Optional[tuple], *required: str) -> Optional[tuple]:
+    """
+    The columns to select for a sparse fieldset, None for whole rows. They
+    are kept in table order so every request for the same set of fields
+    shares one compiled and prepared statement.
+    """
+    if fields is None:
+        return None
+    wanted = {*fields, *VERSION_FIELDS, *required}
+    return tuple(column for column in _PROJECTABLE_COLUMNS if column in wanted)
+
+
+def _render_export_chunk(contacts, format: str) -> str:
+    rows = [
+        [getattr(contact, field) for field in EXPORT_FIELDS] for contact in contacts
+    ]
+    if format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+    return "".join(json.dumps(dict(zip(EXPORT_FIELDS, row))) + "\n" for row in rows)
+
+
+def _id_key(contact_id: int) -> str:
+    return f"contact:id:{contact_id}"
+
+
+def _phone_key(phone_number: str) -> str:
+    return f"contact:phone:{phone_number}"
+
+
+# Left in the id entry of a deleted contact until it expires. Ids are never
+# reused, so no read may cache the contact again.
+DELETED = "deleted"
+
+
+async def _cached(contact_id: int):
+    contact = await contact_cache.get(_id_key(contact_id))
+    return None if contact == DELETED else contact
+
+
+async def _cache_contact(contact):
+    """
+    Caches `contact` unless the cache holds a newer version of it or its
+    tombstone. A read that started before a write committed must not replace
+    what the write's after-commit callback cached. The in-process cache does
+    not yield between the check and the set, a shared backend would need to
+    do both atomically.
+    """
+    # Phone entries only point at the id entry, so dropping or replacing the
+    # id entry is enough to invalidate every phone number it was cached under.
+    cached = await contact_cache.peek(_id_key(contact.id))
+    if cached == DELETED:
+        return
+    cached_version = getattr(cached, "updated_at", None)
+    version = getattr(contact, "updated_at", None)
+    if cached_version and version and cached_version > version:
+        return
+    await contact_cache.set(_id_key(contact.id), contact)
+    await contact_cache.set(
+        _phone_key(normalize_phone(contact.phone_number)), contact.id
+    )
+
+
+async def _cache_read(contact, session: AsyncSession):
+    # A lagging replica can return a row older than the one a write just
+    # cached, or one already deleted. Only rows read from the primary are
+    # cached.
+    if not from_replica(session):
+        await _cache_contact(contact)
+
+
+async def _cached_contact_by_phone(phone_number: str):
+    phone_e164 = normalize_phone(phone_number)
+    contact_id = await contact_cache.get(_phone_key(phone_e164))
+    if contact_id is None:
+        return None
+    contact = await _cached(contact_id)
+    if contact is None or normalize_phone(contact.phone_number) != phone_e164:
+        return None
+    return contact
+
+
+def _lookup_result(contact) -> dict:
+    if contact is None:
+        return {"status": "not_found", "contact": None}
+    return {"status": "found", "contact": contact}
+
+
+def _page_offset(page: int) -> int:
+    if page < 1:
+        app_log.warning("Invalid page number requested")
+        raise InvalidPageNumber()
+    return (page - 1) * DEFAULT_PAGE_SIZE
+
+
+def _after_keys(after: str, page_size: int, sort: str):
+    if page_size < 1 or page_size > MAX_PAGE_SIZE:
+        app_log.warning("Invalid page size requested")
+        raise InvalidPageNumber()
+    if not after:
+        return None
+    return decode_cursor(after, sort, CURSOR_KEY_TYPES[sort])
 
 
 # Create Service
 class ContactService:
     # Create contact
-    async def create_contact(self, contact_data: ContactCreateModel):
+    async def create_contact(
+        self, contact_data: ContactCreateModel, session: AsyncSession
+    ):
         app_log.info("Creating a new contact")
-        async with get_session() as session:
-            if is_valid_israeli_phone(contact_data.phone_number) is False:
-                app_log.warning("Invalid phone number provided")
-                raise InvalidPhoneNumber
-            contact = await contact_db_layer.create_contact(
-                contact_data=contact_data, session=session
-            )
+        if is_valid_israeli_phone(contact_data.phone_number) is False:
+            app_log.warning("Invalid phone number provided")
+            raise InvalidPhoneNumber
+        contact = await contact_db_layer.create_contact(
+            contact_data=contact_data, session=session
+        )
+        if contact is None:
+            app_log.warning("Attempt to create a contact that already exists")
+            raise ContactAlreadyExists()
+        after_commit(session, partial(_cache_contact, contact))
+        app_log.info("Contact created: %s", contact)
+        return contact
+
+    # Bulk create contacts
+    async def bulk_create_contacts(
+        self, contacts: list[ContactCreateModel], session: AsyncSession
+    ):
+        app_log.info("Bulk creating %s contacts", len(contacts))
+        results = [None] * len(contacts)
+        valid = []
+        for index, contact_data in enumerate(contacts):
+            if is_valid_israeli_phone(contact_data.phone_number):
+                valid.append((index, contact_data))
+            else:
+                results[index] = {"index": index, "status": "invalid_phone"}
+
+        created = await contact_db_layer.bulk_create_contacts(
+            contacts=[contact_data for _, contact_data in valid], session=session
+        )
+
+        # Within the batch the first row for a phone number wins, any later
+        # row with the same (canonical) number is reported as a duplicate.
+        created_by_phone = {contact.phone_e164: contact for contact in created}
+        for index, contact_data in valid:
+            phone_e164 = normalize_phone(contact_data.phone_number)
+            contact = created_by_phone.pop(phone_e164, None)
             if contact is None:
-                app_log.warning("Attempt to create a contact that already exists")
-                raise ContactAlreadyExists()
-            app_log.info(f"Contact created: {contact}")
-            return contact
+                results[index] = {"index": index, "status": "duplicate"}
+            else:
+                results[index] = {
+                    "index": index,
+                    "status": "created",
+                    "contact": contact,
+                }
 
-    # Get contact
-    async def get_contact(self, contact_id: int):
-        app_log.info(f"Fetching contact with ID: {contact_id}")
-        async with get_session() as session:
-            contact = await contact_db_layer.get_contact(
-                contact_id=contact_id, session=session
+        app_log.info(
+            "Bulk create finished: %s of %s created", len(created), len(contacts)
+        )
+        return results
+
+    # Import contacts
+    async def import_contacts(
+        self,
+        chunks,
+        format: str,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        on_rejected=None,
+        on_progress=None,
+    ):
+        app_log.info("Importing contacts from %s stream", format)
+        parser = RecordParser(format)
+        summary = {"processed": 0, "inserted": 0, "rejected": 0, "rejected_rows": []}
+
+        def reject(line_number: int, line: str, reason: str):
+            summary["rejected"] += 1
+            if len(summary["rejected_rows"]) < MAX_REPORTED_REJECTIONS:
+                summary["rejected_rows"].append(
+                    {"line": line_number, "reason": reason, "row": line}
+                )
+            if on_rejected is not None:
+                on_rejected(line_number, line, reason)
+
+        async def load(lines: list[tuple[int, str]]):
+            pending = {}
+            for line_number, line, record, reason in parser.parse(lines):
+                summary["processed"] += 1
+                row = to_row(record) if reason is None else None
+                if reason is None and row is None:
+                    reason = "missing_field"
+                if reason is not None:
+                    reject(line_number, line, reason)
+                    continue
+
+                first_name, last_name, phone_number, address = row
+                if not is_valid_israeli_phone(phone_number):
+                    reject(line_number, line, "invalid_phone")
+                    continue
+                phone_e164 = normalize_phone(phone_number)
+                if phone_e164 in pending:
+                    reject(line_number, line, "duplicate")
+                else:
+                    pending[phone_e164] = (line_number, line, row)
+
+            if not pending:
+                return
+            inserted = await contact_db_layer.copy_contacts(
+                rows=[row for _, _, row in pending.values()], session=session
             )
-            if contact is None:
-                app_log.warning(f"Contact with ID {contact_id} not found")
-                raise ContactNotFound()
+            # Each batch commits on its own, so a failure keeps the rows
+            # already imported
+            await session.commit()
+            summary["inserted"] += len(inserted)
+            for phone_e164, (line_number, line, _) in pending.items():
+                if phone_e164 not in inserted:
+                    reject(line_number, line, "duplicate")
+
+        async with get_session() as session:
+            batch = []
+            line_number = 0
+            async for line in iter_lines(chunks):
+                line_number += 1
+                batch.append((line_number, line))
+                if len(batch) >= batch_size:
+                    await load(batch)
+                    batch = []
+                    app_log.info(
+                        "Import progress: %s processed, %s inserted, %s rejected",
+                        summary["processed"],
+                        summary["inserted"],
+                        summary["rejected"],
+                    )
+                    if on_progress is not None:
+                        on_progress(summary)
+            await load(batch)
+
+        app_log.info(
+            "Import finished: %s of %s inserted",
+            summary["inserted"],
+            summary["processed"],
+        )
+        if on_progress is not None:
+            on_progress(summary)
+        return summary
+
+    # Get contact
+    async def get_contact(
+        self, contact_id: int, session: AsyncSession, fields: Optional[tuple] = None
+    ):
+        """
+        With `fields` only those columns are loaded when the cache misses, and
+        the partial row is returned as a dict without being cached. The
+        response trims a cached contact to the same fields.
+        """
+        app_log.info(
+            "Fetching contact with ID: %s", contact_id, sample=HOT_PATH_LOG_SAMPLE_RATE
+        )
+        contact = await _cached(contact_id)
+        if contact is not None:
             return contact
 
-    # Pagination
-    async def get_contacts_paginated(self, page: int):
-        if page < 1:
-            app_log.warning("Invalid page number requested")
-            raise InvalidPageNumber()
+        contact = await contact_db_layer.get_contact(
+            contact_id=contact_id, session=session, columns=_columns(fields)
+        )
+        if contact is None:
+            app_log.warning("Contact with ID %s not found", contact_id)
+            raise ContactNotFound()
+        if fields is None:
+            await _cache_read(contact, session)
+        return contact
 
-        page_size = 10
-        offset = (page - 1) * page_size
-        async with get_session() as session:
-            app_log.info(f"Fetching contacts for page {page}")
-            return await contact_db_layer.get_contacts_paginated(
-                offset=offset, page_size=page_size, session=session
+    # Version of a single contact, for conditional GETs
+    async def get_contact_version(self, contact_id: int, session: AsyncSession):
+        updated_at = await contact_db_layer.get_contact_version(
+            contact_id=contact_id, session=session
+        )
+        if updated_at is None:
+            raise ContactNotFound()
+        return updated_at
+
+    # Batch lookup
+    async def lookup_contacts(
+        self, ids: list[int], phone_numbers: list[str], session: AsyncSession
+    ):
+        app_log.info(
+            "Looking up %s ids and %s phone numbers",
+            len(ids),
+            len(phone_numbers),
+            sample=HOT_PATH_LOG_SAMPLE_RATE,
+        )
+        by_id = {}
+        for contact_id in dict.fromkeys(ids):
+            contact = await _cached(contact_id)
+            if contact is not None:
+                by_id[contact_id] = contact
+
+        by_phone = {}
+        for phone_number in dict.fromkeys(phone_numbers):
+            contact = await _cached_contact_by_phone(phone_number)
+            if contact is not None:
+                by_phone[normalize_phone(phone_number)] = contact
+
+        # One query per key type for everything the cache did not have
+        missing_ids = [contact_id for contact_id in ids if contact_id not in by_id]
+        if missing_ids:
+            contacts = await contact_db_layer.get_contacts_by_ids(
+                ids=list(dict.fromkeys(missing_ids)), session=session
             )
+            for contact in contacts:
+                by_id[contact.id] = contact
+                await _cache_read(contact, session)
 
-    # Delete contact
-    async def delete_contact(self, contact_id: int):
-        app_log.info(f"Deleting contact with ID: {contact_id}")
-        async with get_session() as session:
-            deleted = await contact_db_layer.delete_contact(
-                contact_id=contact_id, session=session
+        missing_phones = [
+            phone_e164
+            for phone_e164 in dict.fromkeys(map(normalize_phone, phone_numbers))
+            if phone_e164 not in by_phone
+        ]
+        if missing_phones:
+            contacts = await contact_db_layer.get_contacts_by_phones(
+                phones_e164=missing_phones, session=session
             )
-            if not deleted:
-                app_log.warning(
-                    f"Attempted to delete non-existent contact ID: {contact_id}"
+            for contact in contacts:
+                by_phone[contact.phone_e164] = contact
+                await _cache_read(contact, session)
+
+        return {
+            "ids": {
+                str(contact_id): _lookup_result(by_id.get(contact_id))
+                for contact_id in ids
+            },
+            "phone_numbers": {
+                phone_number: _lookup_result(
+                    by_phone.get(normalize_phone(phone_number))
                 )
-                raise ContactNotFound()
-            app_log.info(f"Contact ID {contact_id} deleted successfully")
-            return {"message": "Contact deleted successfully"}
+                for phone_number in phone_numbers
+            },
+        }
 
-    async def update_contact(self, contact_id: int, update_data: ContactUpdateModel):
-        app_log.info(f"Updating contact ID: {contact_id}")
-        async with get_session() as session:
-            contact_to_update = await contact_db_layer.get_contact(contact_id, session)
+    # Total number of contacts, for page metadata
+    async def count_contacts(self, session: AsyncSession, exact: bool = False):
+        """
+        Returns (total, is_estimate). The estimate comes from the table
+        statistics and costs no scan; COUNT(*) only runs when `exact` is asked
+        for or the table has never been analyzed.
+        """
+        if not exact:
+            estimate = await contact_db_layer.estimate_contacts_count(session=session)
+            if estimate is not None:
+                return estimate, True
+        return await contact_db_layer.count_contacts(session=session), False
+
+    # Pagination
+    async def get_contacts_paginated(
+        self, page: int, session: AsyncSession, fields: Optional[tuple] = None
+    ):
+        offset = _page_offset(page)
+        app_log.info(
+            "Fetching contacts for page %s", page, sample=HOT_PATH_LOG_SAMPLE_RATE
+        )
+        return await contact_db_layer.get_contacts_paginated(
+            offset=offset,
+            page_size=DEFAULT_PAGE_SIZE,
+            session=session,
+            columns=_columns(fields),
+        )
+
+    async def get_contacts_paginated_versions(self, page: int, session: AsyncSession):
+        return await contact_db_layer.get_versions_paginated(
+            offset=_page_offset(page), page_size=DEFAULT_PAGE_SIZE, session=session
+        )
+
+    # Keyset pagination
+    async def get_contacts_keyset(
+        self,
+        session: AsyncSession,
+        after: str = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        sort: str = "id",
+        fields: Optional[tuple] = None,
+    ):
+        after_keys = _after_keys(after, page_size, sort)
+        app_log.info(
+            "Fetching %s contacts sorted by %s",
+            page_size,
+            sort,
+            sample=HOT_PATH_LOG_SAMPLE_RATE,
+        )
+        # Fetch one extra row to learn whether another page follows
+        contacts = await contact_db_layer.get_contacts_after(
+            after=after_keys,
+            page_size=page_size + 1,
+            sort=sort,
+            session=session,
+            columns=_columns(fields, *CURSOR_KEY_FIELDS[sort]),
+        )
+
+        next_cursor = None
+        if len(contacts) > page_size:
+            contacts = contacts[:page_size]
+            next_cursor = encode_cursor(sort, _cursor_keys(contacts[-1], sort))
+        return {"items": contacts, "next_cursor": next_cursor}
+
+    async def get_contacts_keyset_versions(
+        self,
+        session: AsyncSession,
+        after: str = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        sort: str = "id",
+    ):
+        """
+        The (id, updated_at) pairs of the page `get_contacts_keyset` would
+        return, and whether another page follows it.
+        """
+        versions = await contact_db_layer.get_versions_after(
+            after=_after_keys(after, page_size, sort),
+            page_size=page_size + 1,
+            sort=sort,
+            session=session,
+        )
+        return versions[:page_size], len(versions) > page_size
+
+    # Export contacts
+    async def export_contacts(self, format: str):
+        app_log.info("Exporting contacts as %s", format)
+        if format == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(EXPORT_FIELDS)
+            yield buffer.getvalue()
 
-            if contact_to_update is None:
-                app_log.warning(f"Contact ID {contact_id} not found for update")
-                raise ContactNotFound()
+        exported = 0
+        async with get_session() as session:
+            async for contacts in contact_db_layer.stream_contacts(
+                chunk_size=EXPORT_CHUNK_SIZE, session=session
+            ):
+                exported += len(contacts)
+                yield _render_export_chunk(contacts, format)
+        app_log.info("Exported %s contacts", exported)
 
-            updated_contact = await contact_db_layer.update_contact(
-                contact_to_update, update_data, session
+    # Delete contact
+    async def delete_contact(self, contact_id: int, session: AsyncSession):
+        app_log.info("Deleting contact with ID: %s", contact_id)
+        deleted = await contact_db_layer.delete_contact(
+            contact_id=contact_id, session=session
+        )
+        if not deleted:
+            app_log.warning(
+                "Attempted to delete non-existent contact ID: %s", contact_id
             )
-            app_log.info(f"Contact ID {contact_id} updated successfully")
-            return updated_contact
+            raise ContactNotFound()
+        after_commit(session, partial(contact_cache.set, _id_key(contact_id), DELETED))
+        app_log.info("Contact ID %s deleted successfully", contact_id)
+        return {"message": "Contact deleted successfully"}
+
+    async def update_contact(
+        self, contact_id: int, update_data: ContactUpdateModel, session: AsyncSession
+    ):
+        app_log.info("Updating contact ID: %s", contact_id)
+        updated_contact = await contact_db_layer.update_contact(
+            contact_id=contact_id, update_data=update_data, session=session
+        )
+        if updated_contact is None:
+            app_log.warning("Contact ID %s not found for update", contact_id)
+            raise ContactNotFound()
+
+        after_commit(session, partial(_cache_contact, updated_contact))
+        app_log.info("Contact ID %s updated successfully", contact_id)
+        return updated_contact
 
     async def search_contact(
-        self, phone_number: str = None, first_name: str = None, last_name: str = None
+        self,
+        session: AsyncSession,
+        phone_number: str = None,
+        first_name: str = None,
+        last_name: str = None,
+        q: str = None,
+        mode: str = "exact",
+        limit: int = DEFAULT_SEARCH_LIMIT,
+        fields: Optional[tuple] = None,
+        after: str = None,
     ):
-        app_log.info("Searching for contacts")
-        async with get_session() as session:
-            if not phone_number and not (first_name and last_name):
-                raise InvalidSearch()
-            contacts = await contact_db_layer.search_contact(
-                phone_number=phone_number,
-                first_name=first_name,
-                last_name=last_name,
-                session=session,
+        app_log.info("Searching for contacts", sample=HOT_PATH_LOG_SAMPLE_RATE)
+        if mode == "address":
+            return await self.search_contacts_by_address(
+                q=q, after=after, limit=limit, session=session, fields=fields
+            )
+        if mode != "exact":
+            return await self.search_contacts_by_name(
+                q=q, mode=mode, limit=limit, session=session, fields=fields
             )
-            app_log.info(f"Found {len(contacts)} contacts matching criteria")
-            return contacts if contacts else []
+
+        if phone_number:
+            contact = await _cached_contact_by_phone(phone_number)
+            if contact is not None:
+                return [contact]
+
+        if not phone_number and not (first_name and last_name):
+            raise InvalidSearch()
+        contacts = await contact_db_layer.search_contact(
+            phone_number=phone_number,
+            first_name=first_name,
+            last_name=last_name,
+            session=session,
+            columns=_columns(fields),
+        )
+        if phone_number and len(contacts) == 1 and fields is None:
+            await _cache_read(contacts[0], session)
+        app_log.info(
+            "Found %s contacts matching criteria",
+            len(contacts),
+            sample=HOT_PATH_LOG_SAMPLE_RATE,
+        )
+        return contacts if contacts else []
+
+    async def search_contacts_by_name(
+        self,
+        q: str,
+        mode: str,
+        limit: int,
+        session: AsyncSession,
+        fields: Optional[tuple] = None,
+    ):
+        if not q or not q.strip():
+            raise InvalidSearch()
+        if limit < 1 or limit > MAX_SEARCH_LIMIT:
+            raise InvalidSearch()
+
+        contacts = await contact_db_layer.search_contacts_by_name(
+            query=q.strip(),
+            mode=mode,
+            limit=limit,
+            session=session,
+            columns=_columns(fields),
+        )
+        app_log.info(
+            "Found %s contacts for %s search",
+            len(contacts),
+            mode,
+            sample=HOT_PATH_LOG_SAMPLE_RATE,
+        )
+        return contacts
+
+    async def search_contacts_by_address(
+        self,
+        q: str,
+        limit: int,
+        session: AsyncSession,
+        after: str = None,
+        fields: Optional[tuple] = None,
+    ):
+        """
+        A page of contacts whose address matches every word of `q`, best
+        matches first, with a cursor for the next page.
+        """
+        if not q or not q.strip():
+            raise InvalidSearch()
+        if limit < 1 or limit > MAX_SEARCH_LIMIT:
+            raise InvalidSearch()
+        after_keys = (
+            decode_cursor(after, "address", ADDRESS_CURSOR_TYPES) if after else None
+        )
+
+        # Fetch one extra row to learn whether another page follows
+        rows = await contact_db_layer.search_contacts_by_address(
+            query=q.strip(),
+            after=after_keys,
+            limit=limit + 1,
+            session=session,
+            columns=_columns(fields),
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            contact, rank = rows[-1]
+            contact_id = contact["id"] if isinstance(contact, dict) else contact.id
+            next_cursor = encode_cursor("address", [rank, contact_id])
+        app_log.info(
+            "Found %s contacts for address search",
+            len(rows),
+            sample=HOT_PATH_LOG_SAMPLE_RATE,
+        )
+        return {"items": [contact for contact, _ in rows], "next_cursor": next_cursor}
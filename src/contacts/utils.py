@@ -1,6 +1,57 @@
+import base64
+import json
 import re
 
+from src.errors import InvalidCursor, InvalidFields
+
+
+ISRAELI_PHONE_REGEX = re.compile(r"^(05\d{8}|\+9725\d{8})$")
+
 
 def is_valid_israeli_phone(phone: str) -> bool:
-    israeli_phone_regex = r"^(05\d{8}|\+9725\d{8})$"
-    return bool(re.match(israeli_phone_regex, phone))
+    return bool(ISRAELI_PHONE_REGEX.match(phone))
+
+
+def normalize_phone(phone: str) -> str:
+    """
+    Returns the canonical E.164 form used for storage and lookups. Local Israeli
+    mobile numbers (05XXXXXXXX) become +9725XXXXXXXX, anything else is kept as is.
+    """
+    if phone.startswith("05") and ISRAELI_PHONE_REGEX.match(phone):
+        return "+972" + phone[1:]
+    return phone
+
+
+def encode_cursor(sort: str, keys: list) -> str:
+    """Encode the sort keys of the last row on a page into an opaque token."""
+    payload = json.dumps({"s": sort, "k": keys}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort: str, key_types: tuple) -> list:
+    """Decode a token produced by `encode_cursor`, checking it matches `sort`."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        keys = payload["k"]
+        cursor_sort = payload["s"]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor()
+
+    if cursor_sort != sort or not isinstance(keys, list) or len(keys) != len(key_types):
+        raise InvalidCursor()
+    for key, key_type in zip(keys, key_types):
+        if type(key) is not key_type:
+            raise InvalidCursor()
+    return keys
+
+
+def parse_fields(value: str, allowed: tuple) -> tuple:
+    """
+    Parses a `fields=first_name,last_name` sparse fieldset into the requested
+    names, in the order of `allowed` so equal sets compile to the same query.
+    """
+    requested = {name.strip() for name in value.split(",")} - {""}
+    if not requested or not requested <= set(allowed):
+        raise InvalidFields()
+    return tuple(name for name in allowed if name in requested)
@@ -0,0 +1,76 @@
+import contextvars
+import functools
+import inspect
+import time
+
+from sqlalchemy import event
+
+from src.metrics import db_query_duration
+
+# Name of the ContactDBLayer method whose statements are currently running
+current_operation = contextvars.ContextVar("current_operation", default="other")
+
+
+def label_queries(cls):
+    """
+    Class decorator tagging every statement issued by a public async method
+    with that method's name, for the engine event listeners below.
+    """
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_"):
+            continue
+        if inspect.isasyncgenfunction(method):
+            setattr(cls, name, _label_async_generator(name, method))
+        elif inspect.iscoroutinefunction(method):
+            setattr(cls, name, _label_coroutine(name, method))
+    return cls
+
+
+def _label_coroutine(name, method):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = current_operation.set(name)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            current_operation.reset(token)
+
+    return wrapper
+
+
+def _label_async_generator(name, method):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        # Set per step: the consumer may resume the generator from another context
+        generator = method(*args, **kwargs)
+        try:
+            while True:
+                token = current_operation.set(name)
+                try:
+                    item = await generator.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    current_operation.reset(token)
+                yield item
+        finally:
+            await generator.aclose()
+
+    return wrapper
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_start_time
+    statement_type = statement.lstrip().partition(" ")[0].upper()
+    db_query_duration.observe((current_operation.get(), statement_type), elapsed)
+
+
+def instrument_engine(async_engine):
+    """Records the latency of every statement run through `async_engine`."""
+    sync_engine = async_engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
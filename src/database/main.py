@@ -1,17 +1,140 @@
+import time
 from contextlib import asynccontextmanager
+
+from fastapi import Request
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.config import Config
+from src.database.instrumentation import instrument_engine
+from src.database.pool import InstrumentedPool
+from src.database.replicas import ReplicaSet
+from src.database.slow_queries import SlowQueryLog
+
+# Cookie holding the time until which a client that just wrote reads from the
+# primary, set by the read-your-writes middleware
+PRIMARY_UNTIL_COOKIE = "db_primary_until"
+# Key in session.info of the callbacks waiting for the transaction to commit
+AFTER_COMMIT = "after_commit"
+# Key in session.info flagging a session that reads from a replica
+FROM_REPLICA = "from_replica"
+
+slow_queries = (
+    SlowQueryLog(
+        threshold_ms=Config.DB_SLOW_QUERY_MS,
+        size=Config.DB_SLOW_QUERY_LOG_SIZE,
+        explain_rate=Config.DB_SLOW_QUERY_EXPLAIN_RATE,
+        explain_timeout=Config.DB_SLOW_QUERY_EXPLAIN_TIMEOUT,
+    )
+    if Config.DB_SLOW_QUERY_MS is not None
+    else None
+)
+
+
+def _create_engine(url: str):
+    # Enable echo = true if we want SQL queries to be printed
+    engine = create_async_engine(
+        url,
+        poolclass=InstrumentedPool,
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+        pool_pre_ping=Config.DB_POOL_PRE_PING,
+        connect_args={"prepared_statement_cache_size": Config.DB_STATEMENT_CACHE_SIZE},
+    )
+    instrument_engine(engine)
+    if slow_queries is not None:
+        slow_queries.instrument(engine)
+    return engine
+
 
-# Enable echo = true if we want SQL queries to be printed
-async_engine = create_async_engine(Config.DATABASE_URL)
+async_engine = _create_engine(Config.DATABASE_URL)
 
 Session = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
 
+replicas = ReplicaSet(
+    engines=[
+        _create_engine(url.strip())
+        for url in Config.DATABASE_REPLICA_URLS.split(",")
+        if url.strip()
+    ],
+    max_lag=Config.DB_REPLICA_MAX_LAG,
+    check_interval=Config.DB_REPLICA_CHECK_INTERVAL,
+    check_timeout=Config.DB_REPLICA_CHECK_TIMEOUT,
+)
+
 
 @asynccontextmanager
 async def get_session():
     async with Session() as session:
         yield session
+
+
+def after_commit(session, callback):
+    """
+    Schedules `callback`, a coroutine function, to run once the transaction of
+    `session` has committed. It is dropped if the transaction rolls back.
+    """
+    session.info.setdefault(AFTER_COMMIT, []).append(callback)
+
+
+async def run_after_commit(session):
+    for callback in session.info.pop(AFTER_COMMIT, []):
+        await callback()
+
+
+async def get_db_session():
+    """
+    FastAPI dependency providing one session per request. Everything the request
+    does shares a single transaction, committed once after the route returns.
+    """
+    async with Session() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            session.info.pop(AFTER_COMMIT, None)
+            await session.rollback()
+            raise
+        await run_after_commit(session)
+
+
+def from_replica(session) -> bool:
+    """True if `session` reads from a replica, which may lag the primary."""
+    return session.info.get(FROM_REPLICA, False)
+
+
+def reads_from_primary(request: Request) -> bool:
+    """True while the client is inside its read-your-writes window."""
+    try:
+        return float(request.cookies.get(PRIMARY_UNTIL_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_session(request: Request):
+    """
+    FastAPI dependency for read-only routes. The session reads from a replica
+    when one is configured and usable, and from the primary otherwise. The
+    request is flagged as read-only, so it opens no read-your-writes window
+    whatever its method.
+    """
+    request.state.read_only = True
+    replica = None
+    if replicas and not reads_from_primary(request):
+        replica = await replicas.pick()
+    session_factory = replica.session_factory if replica else Session
+
+    async with session_factory() as session:
+        session.info[FROM_REPLICA] = replica is not None
+        try:
+            yield session
+        except (OSError, DBAPIError) as exc:
+            if replica is not None and (
+                isinstance(exc, OSError) or exc.connection_invalidated
+            ):
+                replicas.mark_failed(replica, exc)
+            raise
@@ -1,8 +1,14 @@
 from datetime import datetime
 import sqlalchemy.dialects.postgresql as pg
-from sqlalchemy import Index
+from sqlalchemy import DDL, Computed, Index, event
 from sqlmodel import SQLModel, Field, Column
 
+# contacts is hash partitioned on phone_e164, so a lookup by phone number
+# touches one partition. Postgres only enforces unique indexes that contain
+# the partition key, hence the (id, phone_e164) primary key; ids still come
+# from a single sequence.
+CONTACT_PARTITIONS = 16
+
 
 class Contact(SQLModel, table=True):
     __tablename__ = "contacts"
@@ -10,8 +16,12 @@ class Contact(SQLModel, table=True):
     id: int = Field(sa_column=Column(pg.INTEGER, primary_key=True, autoincrement=True))
     first_name: str = Field(sa_column=Column(pg.TEXT, nullable=False))
     last_name: str = Field(sa_column=Column(pg.TEXT, nullable=False))
-    phone_number: str = Field(
-        sa_column=Column(pg.TEXT, nullable=False, unique=True, index=True)
+    phone_number: str = Field(sa_column=Column(pg.TEXT, nullable=False))
+    # Canonical E.164 form of phone_number, see contacts.utils.normalize_phone
+    phone_e164: str = Field(
+        sa_column=Column(
+            pg.TEXT, primary_key=True, nullable=False, unique=True, index=True
+        )
     )
     address: str = Field(sa_column=Column(pg.TEXT, nullable=False))
 
@@ -27,7 +37,70 @@ class Contact(SQLModel, table=True):
         )
     )
 
-    __table_args__ = (Index("idx_first_last_name", "first_name", "last_name"),)
+    __table_args__ = (
+        Index("idx_first_last_name", "first_name", "last_name"),
+        Index("idx_last_first_name_id", "last_name", "first_name", "id"),
+        Index(
+            "ix_contacts_first_name_trgm",
+            "first_name",
+            postgresql_using="gin",
+            postgresql_ops={"first_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_contacts_last_name_trgm",
+            "last_name",
+            postgresql_using="gin",
+            postgresql_ops={"last_name": "gin_trgm_ops"},
+        ),
+        {"postgresql_partition_by": "HASH (phone_e164)"},
+    )
 
     def __repr__(self):
         return f"<Contact {self.first_name} {self.last_name} {self.phone_number} {self.address}>"
+
+
+# Full-text search over the address, kept up to date by Postgres itself. The
+# 'simple' configuration lowercases words without stemming, which suits
+# street and city names in any language. The column is added to the table but
+# not mapped, so loading a Contact never reads it; query it through
+# ADDRESS_SEARCH.
+ADDRESS_SEARCH_CONFIG = "simple"
+ADDRESS_SEARCH = Column(
+    "address_search",
+    pg.TSVECTOR,
+    Computed(f"to_tsvector('{ADDRESS_SEARCH_CONFIG}', address)", persisted=True),
+    nullable=False,
+)
+Contact.__table__.append_column(ADDRESS_SEARCH)
+Index("ix_contacts_address_search", ADDRESS_SEARCH, postgresql_using="gin")
+
+for remainder in range(CONTACT_PARTITIONS):
+    event.listen(
+        Contact.__table__,
+        "after_create",
+        DDL(
+            f"CREATE TABLE contacts_p{remainder:02d} PARTITION OF contacts "
+            f"FOR VALUES WITH (MODULUS {CONTACT_PARTITIONS}, REMAINDER {remainder})"
+        ),
+    )
+
+
+class IdempotencyKey(SQLModel, table=True):
+    """
+    Response stored for an Idempotency-Key sent with a create or update, see
+    contacts.idempotency. Rows past expires_at are replaced or purged.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    key: str = Field(sa_column=Column(pg.TEXT, primary_key=True))
+    # Hash of the method, path and body the key was first used with
+    fingerprint: str = Field(sa_column=Column(pg.TEXT, nullable=False))
+    status_code: int = Field(sa_column=Column(pg.INTEGER, nullable=False))
+    body: bytes = Field(sa_column=Column(pg.BYTEA, nullable=False))
+    created_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP, default=datetime.utcnow, nullable=False)
+    )
+    expires_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP, nullable=False, index=True)
+    )
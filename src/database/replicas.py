@@ -0,0 +1,140 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.logger import app_log
+
+# Seconds the replica is behind the primary. A replica that has replayed
+# everything it received counts as caught up, however old its last
+# transaction is, so an idle primary does not read as lag.
+LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+async def measure_replica_lag(engine: AsyncEngine) -> float:
+    async with engine.connect() as connection:
+        result = await connection.execute(LAG_QUERY)
+        return float(result.scalar())
+
+
+@dataclass
+class Replica:
+    engine: AsyncEngine
+    session_factory: sessionmaker
+    healthy: bool = True
+    lag: Optional[float] = None
+    error: Optional[str] = None
+    checked_at: float = float("-inf")
+    checking: bool = field(default=False, repr=False)
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+
+class ReplicaSet:
+    """
+    Read replicas, handed out round robin. Health and lag are re-checked
+    lazily, at most every `check_interval` seconds per replica, by the request
+    that finds the last check stale; replicas that are down or lag more than
+    `max_lag` seconds are skipped until a later check clears them.
+    """
+
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        max_lag: float,
+        check_interval: float,
+        check_timeout: float,
+        measure_lag=measure_replica_lag,
+        clock=time.monotonic,
+    ):
+        self.replicas = [
+            Replica(
+                engine=engine,
+                session_factory=sessionmaker(
+                    bind=engine, class_=AsyncSession, expire_on_commit=False
+                ),
+            )
+            for engine in engines
+        ]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.measure_lag = measure_lag
+        self.clock = clock
+        self.next_index = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    async def pick(self) -> Optional[Replica]:
+        """The next usable replica, or None to fall back to the primary."""
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self.next_index % len(self.replicas)]
+            self.next_index += 1
+            await self._maybe_check(replica)
+            if replica.healthy:
+                return replica
+        return None
+
+    async def _maybe_check(self, replica: Replica):
+        # Concurrent requests keep using the last result while one checks
+        if replica.checking or self.clock() - replica.checked_at < self.check_interval:
+            return
+        replica.checking = True
+        try:
+            lag = await asyncio.wait_for(
+                self.measure_lag(replica.engine), self.check_timeout
+            )
+        except (asyncio.TimeoutError, OSError, SQLAlchemyError) as exc:
+            self._set_unavailable(replica, exc)
+        else:
+            replica.lag = lag
+            replica.error = None
+            if lag > self.max_lag and replica.healthy:
+                app_log.warning(
+                    "Replica %s lags %.1fs behind, reading from the primary",
+                    replica.name,
+                    lag,
+                )
+            replica.healthy = lag <= self.max_lag
+        finally:
+            replica.checked_at = self.clock()
+            replica.checking = False
+
+    def mark_failed(self, replica: Replica, exc: Exception):
+        """Takes a replica out of rotation until its next check."""
+        self._set_unavailable(replica, exc)
+        replica.checked_at = self.clock()
+
+    def _set_unavailable(self, replica: Replica, exc: Exception):
+        if replica.healthy:
+            app_log.warning("Replica %s is unavailable: %s", replica.name, exc)
+        replica.healthy = False
+        replica.lag = None
+        replica.error = str(exc) or type(exc).__name__
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "replica": replica.name,
+                "healthy": replica.healthy,
+                "lag_seconds": replica.lag,
+                "error": replica.error,
+                "pool": replica.engine.pool.stats(),
+            }
+            for replica in self.replicas
+        ]
@@ -0,0 +1,181 @@
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.database.instrumentation import current_operation
+from src.logger import app_log
+
+# Execution option that keeps a statement out of the slow query log, set on
+# the EXPLAINs the log runs itself
+SKIP_OPTION = "skip_slow_query_log"
+_PLAIN_TYPES = (int, float, bool, type(None))
+
+
+def redact(parameters) -> list:
+    """
+    Bound parameters with the values blanked out: contacts are personal data,
+    so only numbers and NULLs are kept, anything else is reduced to its type
+    and length.
+    """
+    if isinstance(parameters, dict):
+        parameters = list(parameters.values())
+    redacted = []
+    for value in parameters or ():
+        if isinstance(value, _PLAIN_TYPES):
+            redacted.append(value)
+        elif isinstance(value, (str, bytes, list, tuple)):
+            redacted.append(f"<{type(value).__name__}:{len(value)}>")
+        else:
+            redacted.append(f"<{type(value).__name__}>")
+    return redacted
+
+
+@dataclass
+class SlowQuery:
+    at: str
+    duration_ms: float
+    operation: str
+    database: str
+    statement: str
+    parameters: list
+    # "pending", "captured" or "failed" once an EXPLAIN was sampled
+    plan_status: Optional[str] = None
+    plan: Optional[str] = None
+
+
+class SlowQueryLog:
+    """
+    Records statements slower than `threshold_ms` on the engines passed to
+    `instrument`. Each one is logged and kept in a ring buffer of the last
+    `size`, tagged with the ContactDBLayer method that issued it. A sampled
+    `explain_rate` of the slow SELECTs is re-run as EXPLAIN (ANALYZE, BUFFERS)
+    on another connection in a background task, so the request that hit the
+    slow query does not wait for it. Only SELECTs are explained, ANALYZE
+    executes the statement.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        size: int,
+        explain_rate: float,
+        explain_timeout: float,
+        sample=random.random,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.entries = deque(maxlen=size)
+        self.explain_rate = explain_rate
+        self.explain_timeout = explain_timeout
+        self.sample = sample
+        self.recorded = 0
+        self.explaining = False
+        self._tasks = set()
+
+    def instrument(self, async_engine: AsyncEngine):
+        def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+            context._slow_query_start = time.perf_counter()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+            elapsed = time.perf_counter() - context._slow_query_start
+            if elapsed < self.threshold or context.execution_options.get(SKIP_OPTION):
+                return
+            self.record(async_engine, statement, parameters, elapsed, many)
+
+        sync_engine = async_engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+
+    def record(
+        self,
+        async_engine: AsyncEngine,
+        statement: str,
+        parameters,
+        elapsed: float,
+        executemany: bool = False,
+    ) -> SlowQuery:
+        entry = SlowQuery(
+            at=datetime.now(timezone.utc).isoformat(),
+            duration_ms=round(elapsed * 1000, 3),
+            operation=current_operation.get(),
+            database=async_engine.url.render_as_string(hide_password=True),
+            statement=statement,
+            parameters=(
+                [f"<{len(parameters)} rows>"] if executemany else redact(parameters)
+            ),
+        )
+        self.entries.append(entry)
+        self.recorded += 1
+        app_log.warning(
+            "Slow query (%.1f ms) in %s: %s %s",
+            entry.duration_ms,
+            entry.operation,
+            " ".join(statement.split()),
+            entry.parameters,
+        )
+
+        is_select = statement.lstrip()[:6].upper() == "SELECT"
+        # One EXPLAIN at a time, so a burst of slow queries cannot take over
+        # the pool
+        if (
+            is_select
+            and not executemany
+            and not self.explaining
+            and self.sample() < self.explain_rate
+        ):
+            self._start_explain(async_engine, entry, statement, parameters)
+        return entry
+
+    def _start_explain(self, async_engine, entry, statement, parameters):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        entry.plan_status = "pending"
+        self.explaining = True
+        task = loop.create_task(
+            self._explain(async_engine, entry, statement, parameters)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, async_engine, entry, statement, parameters):
+        try:
+            entry.plan = await asyncio.wait_for(
+                explain(async_engine, statement, parameters), self.explain_timeout
+            )
+            entry.plan_status = "captured"
+        except (asyncio.TimeoutError, OSError, SQLAlchemyError) as exc:
+            entry.plan_status = "failed"
+            entry.plan = str(exc) or type(exc).__name__
+            app_log.warning("Could not explain slow query: %s", entry.plan)
+        finally:
+            self.explaining = False
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "recorded": self.recorded,
+            # Newest first
+            "queries": [asdict(entry) for entry in reversed(self.entries)],
+        }
+
+
+async def explain(async_engine: AsyncEngine, statement: str, parameters) -> str:
+    async with async_engine.connect() as connection:
+        try:
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, BUFFERS) {statement}",
+                parameters,
+                execution_options={SKIP_OPTION: True},
+            )
+            return "\n".join(row[0] for row in result)
+        finally:
+            await connection.rollback()
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from typing import Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.logger import app_log
+
+# Seconds between attempts while the database cannot be reached
+WARM_UP_RETRY_DELAY = 2.0
+
+
+class Readiness:
+    """Whether this worker has warmed up and may receive traffic."""
+
+    def __init__(self):
+        self.ready = False
+        self.error: Optional[str] = None
+        self.attempts = 0
+        self.duration: Optional[float] = None
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "attempts": self.attempts,
+            "warm_up_seconds": self.duration,
+            "error": self.error,
+        }
+
+
+readiness = Readiness()
+
+
+async def _warm_connection(engine: AsyncEngine, warm_up):
+    async with engine.connect() as connection:
+        session = AsyncSession(bind=connection, expire_on_commit=False)
+        try:
+            await warm_up(session)
+        finally:
+            await session.close()
+            await connection.rollback()
+
+
+async def warm_up_engines(engines: list[AsyncEngine], connections: int, warm_up):
+    """
+    Opens `connections` connections on every engine at once, so they all stay
+    in the pool, and runs `warm_up(session)` on each. Retries until it
+    succeeds, then marks the worker ready.
+    """
+    start = time.perf_counter()
+    while True:
+        readiness.attempts += 1
+        try:
+            await asyncio.gather(
+                *(
+                    _warm_connection(engine, warm_up)
+                    for engine in engines
+                    for _ in range(connections)
+                )
+            )
+        except (OSError, SQLAlchemyError) as exc:
+            readiness.error = str(exc) or type(exc).__name__
+            app_log.warning(
+                "Warm-up attempt %s failed, retrying in %ss: %s",
+                readiness.attempts,
+                WARM_UP_RETRY_DELAY,
+                readiness.error,
+            )
+            await asyncio.sleep(WARM_UP_RETRY_DELAY)
+            continue
+        break
+
+    readiness.duration = round(time.perf_counter() - start, 3)
+    readiness.error = None
+    readiness.ready = True
+    app_log.info(
+        "Warmed up %s connections per engine in %ss",
+        connections,
+        readiness.duration,
+    )
@@ -4,6 +4,8 @@ from fastapi.responses import JSONResponse
 from fastapi import FastAPI, status
 from sqlalchemy.exc import SQLAlchemyError
 
+from src.logger import app_log
+
 
 class ContactException(Exception):
     pass
@@ -29,6 +31,22 @@ class InvalidSearch(Exception):
     pass
 
 
+class InvalidCursor(Exception):
+    pass
+
+
+class InvalidImportFile(Exception):
+    pass
+
+
+class InvalidFields(Exception):
+    pass
+
+
+class IdempotencyKeyReused(Exception):
+    pass
+
+
 def create_exception_handler(
     status_code: int, initial_detail: Any
 ) -> Callable[[Request, Exception], JSONResponse]:
@@ -83,6 +101,50 @@ def register_all_errors(app: FastAPI):
         ),
     )
 
+    app.add_exception_handler(
+        InvalidCursor,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Invalid Pagination Cursor",
+                "error_code": "400",
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        InvalidImportFile,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Invalid Import File",
+                "error_code": "400",
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        InvalidFields,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Invalid Fields Parameter",
+                "error_code": "400",
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        IdempotencyKeyReused,
+        create_exception_handler(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            initial_detail={
+                "message": "Idempotency-Key was already used for a different request",
+                "error_code": "422",
+            },
+        ),
+    )
+
     app.add_exception_handler(
         InvalidPhoneNumber,
         create_exception_handler(
@@ -96,7 +158,7 @@ def register_all_errors(app: FastAPI):
 
     @app.exception_handler(SQLAlchemyError)
     async def database__error(request, exc):
-        print(str(exc))
+        app_log.error("Database error: %s", exc)
         return JSONResponse(
             content={
                 "message": "Oops! Something went wrong",
@@ -0,0 +1,55 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.status import HTTP_200_OK, HTTP_503_SERVICE_UNAVAILABLE
+
+from src.contacts.service import contact_cache
+from src.database.main import async_engine, replicas, slow_queries
+from src.database.warmup import readiness
+from src.metrics import registry
+
+internal_router = APIRouter()
+metrics_router = APIRouter()
+probe_router = APIRouter()
+
+
+# Prometheus Metrics Route
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+# Readiness Route, for load balancers
+@probe_router.get("/ready", status_code=HTTP_200_OK)
+async def get_readiness():
+    return JSONResponse(
+        readiness.stats(),
+        status_code=HTTP_200_OK if readiness.ready else HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+# Cache Statistics Route
+@internal_router.get("/cache", status_code=HTTP_200_OK)
+async def get_cache_stats():
+    return await contact_cache.stats()
+
+
+# Connection Pool Statistics Route
+@internal_router.get("/pool", status_code=HTTP_200_OK)
+async def get_pool_stats():
+    return async_engine.pool.stats()
+
+
+# Read Replica Health Route
+@internal_router.get("/replicas", status_code=HTTP_200_OK)
+async def get_replica_stats():
+    return replicas.stats()
+
+
+# Slow Query Log Route, recent slow statements of this worker process
+@internal_router.get("/slow-queries", status_code=HTTP_200_OK)
+async def get_slow_queries():
+    if slow_queries is None:
+        return {"enabled": False, "queries": []}
+    return {"enabled": True, **slow_queries.stats()}
@@ -1,47 +1,99 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
 
+from src.config import Config
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record, self.datefmt),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload)
+
 
 class AppLogger:
     def __init__(
-        self, name: str = "contact_book_app_logger", level: int = logging.INFO
+        self,
+        name: str = "contact_book_app_logger",
+        level: int = logging.INFO,
+        json_output: bool = False,
+        stream=sys.stdout,
     ):
         """
-        Creates a logger with the given name and level. By default, logs at DEBUG level.
+        Creates a logger with the given name and level. By default, logs at INFO level.
+
+        Records are handed to a queue and written to `stream` by a background
+        listener thread, so callers on the event loop never block on I/O.
         """
         self.logger = logging.getLogger(name)
         self.logger.setLevel(level)
+        self.listener = None
 
         # Prevent adding multiple handlers if logger already has them
         if not self.logger.handlers:
-            # Create console handler
-            console_handler = logging.StreamHandler(sys.stdout)
+            # Create console handler, only ever called from the listener thread
+            console_handler = logging.StreamHandler(stream)
             console_handler.setLevel(level)
 
             # Create a formatter with timestamps, module name, log level, and the message
-            formatter = logging.Formatter(
+            formatter_class = JsonFormatter if json_output else logging.Formatter
+            formatter = formatter_class(
                 fmt="%(asctime)s | %(name)s | %(levelname)s | %(message)s",
                 datefmt="%Y-%m-%d %H:%M:%S",
             )
             console_handler.setFormatter(formatter)
 
-            # Add the handler to the logger
-            self.logger.addHandler(console_handler)
+            log_queue = queue.SimpleQueue()
+            self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+            self.listener = logging.handlers.QueueListener(
+                log_queue, console_handler, respect_handler_level=True
+            )
+            self.listener.start()
+            atexit.register(self.stop)
+
+    def stop(self):
+        """Flushes queued records and stops the listener thread."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def _log(self, level: int, message: str, args: tuple, sample: float, **kwargs):
+        # Arguments are only interpolated once the record is known to be emitted
+        if not self.logger.isEnabledFor(level):
+            return
+        if sample < 1.0 and random.random() >= sample:
+            return
+        self.logger.log(level, message, *args, stacklevel=3, **kwargs)
 
-    def info(self, message: str):
-        self.logger.info(message)
+    def info(self, message: str, *args, sample: float = 1.0):
+        self._log(logging.INFO, message, args, sample)
 
-    def debug(self, message: str):
-        self.logger.debug(message)
+    def debug(self, message: str, *args, sample: float = 1.0):
+        self._log(logging.DEBUG, message, args, sample)
 
-    def error(self, message: str, exc_info: bool = False):
-        self.logger.error(message, exc_info=exc_info)
+    def error(self, message: str, *args, exc_info: bool = False):
+        self._log(logging.ERROR, message, args, 1.0, exc_info=exc_info)
 
-    def warning(self, message: str):
-        self.logger.warning(message)
+    def warning(self, message: str, *args):
+        self._log(logging.WARNING, message, args, 1.0)
 
-    def critical(self, message: str):
-        self.logger.critical(message)
+    def critical(self, message: str, *args):
+        self._log(logging.CRITICAL, message, args, 1.0)
 
 
-app_log = AppLogger(name="phonebook_app")
+app_log = AppLogger(
+    name="phonebook_app",
+    level=logging.getLevelName(Config.LOG_LEVEL.upper()),
+    json_output=Config.LOG_JSON,
+)
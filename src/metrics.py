@@ -0,0 +1,178 @@
+import atexit
+import glob
+import json
+import os
+import time
+from bisect import bisect_left
+from typing import Optional
+
+from src.config import Config
+
+# Upper bounds in seconds, shared by every latency histogram
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    """
+    Latency histogram for one label set. Buckets are allocated once and only
+    ever incremented from the event loop thread, so no locking is needed.
+    """
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        # One slot per bucket plus +Inf, stored non-cumulatively
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class HistogramFamily:
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.series: dict[tuple, Histogram] = {}
+
+    def observe(self, labels: tuple, value: float):
+        histogram = self.series.get(labels)
+        if histogram is None:
+            histogram = self.series[labels] = Histogram()
+        histogram.observe(value)
+
+    def snapshot(self) -> list:
+        return [
+            [list(labels), histogram.counts, histogram.sum, histogram.count]
+            for labels, histogram in self.series.items()
+        ]
+
+
+class MetricsRegistry:
+    """
+    Per-process metrics. With `multiproc_dir` set, every worker periodically
+    writes its snapshot there and /metrics merges the snapshots of all workers.
+    """
+
+    def __init__(self, multiproc_dir: Optional[str] = None, flush_interval=5.0):
+        self.multiproc_dir = multiproc_dir
+        self.flush_interval = flush_interval
+        self.last_flush = 0.0
+        self.families: dict[str, HistogramFamily] = {}
+
+    def histogram(self, name: str, help: str, label_names: tuple[str, ...]):
+        family = self.families.get(name)
+        if family is None:
+            family = self.families[name] = HistogramFamily(name, help, label_names)
+        return family
+
+    def snapshot(self) -> dict:
+        return {name: family.snapshot() for name, family in self.families.items()}
+
+    def maybe_flush(self):
+        """Writes this worker's snapshot when the flush interval has passed."""
+        if self.multiproc_dir and time.monotonic() - self.last_flush >= (
+            self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        if not self.multiproc_dir:
+            return
+        self.last_flush = time.monotonic()
+        path = os.path.join(self.multiproc_dir, f"metrics_{os.getpid()}.json")
+        # Write then rename, so readers never see a partial file
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(self.snapshot(), file)
+        os.replace(f"{path}.tmp", path)
+
+    def collect(self) -> dict:
+        """Returns the snapshot to expose, merged across workers if enabled."""
+        if not self.multiproc_dir:
+            return self.snapshot()
+
+        self.flush()
+        merged: dict[str, dict[tuple, list]] = {}
+        for path in glob.glob(os.path.join(self.multiproc_dir, "metrics_*.json")):
+            try:
+                with open(path) as file:
+                    snapshot = json.load(file)
+            except (OSError, ValueError):
+                continue
+            for name, series in snapshot.items():
+                family = merged.setdefault(name, {})
+                for labels, counts, total, count in series:
+                    current = family.setdefault(
+                        tuple(labels), [[0] * len(counts), 0.0, 0]
+                    )
+                    current[0] = [a + b for a, b in zip(current[0], counts)]
+                    current[1] += total
+                    current[2] += count
+        return {
+            name: [[list(labels), *values] for labels, values in series.items()]
+            for name, series in merged.items()
+        }
+
+    def render(self) -> str:
+        """Renders all histograms in the Prometheus text exposition format."""
+        lines = []
+        for name, series in sorted(self.collect().items()):
+            family = self.families.get(name)
+            if family is None:
+                continue
+            lines.append(f"# HELP {name} {family.help}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, counts, total, count in series:
+                label_text = ",".join(
+                    f'{label}="{_escape(value)}"'
+                    for label, value in zip(family.label_names, labels)
+                )
+                cumulative = 0
+                for bound, bucket_count in zip((*LATENCY_BUCKETS, "+Inf"), counts):
+                    cumulative += bucket_count
+                    lines.append(
+                        f'{name}_bucket{{{label_text},le="{bound}"}} {cumulative}'
+                    )
+                lines.append(f"{name}_sum{{{label_text}}} {total}")
+                lines.append(f"{name}_count{{{label_text}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry(
+    multiproc_dir=Config.METRICS_MULTIPROC_DIR,
+    flush_interval=Config.METRICS_FLUSH_INTERVAL,
+)
+atexit.register(registry.flush)
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route and status code",
+    ("method", "route", "status"),
+)
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds",
+    "Database statement latency by ContactDBLayer operation",
+    ("operation", "statement"),
+)
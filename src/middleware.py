@@ -2,14 +2,44 @@ from fastapi import FastAPI
 from fastapi.requests import Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-import time
 import logging
+import math
+import time
+
+from src.config import Config
+from src.database.main import PRIMARY_UNTIL_COOKIE, replicas
+from src.logger import app_log
+from src.metrics import http_request_duration, registry
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
 
 logger = logging.getLogger("uvicorn.access")
 logger.disabled = True
 
 
 def register_middleware(app: FastAPI):
+    @app.middleware("http")
+    async def read_your_writes(request: Request, call_next):
+        response = await call_next(request)
+        # After a successful write, read this client's GETs from the primary
+        # until the replicas have had time to catch up. Routes reading through
+        # get_read_session are reads whatever their method.
+        if (
+            replicas
+            and request.method not in SAFE_METHODS
+            and not getattr(request.state, "read_only", False)
+            and response.status_code < 400
+        ):
+            window = Config.DB_READ_YOUR_WRITES_WINDOW
+            response.set_cookie(
+                PRIMARY_UNTIL_COOKIE,
+                f"{time.time() + window:.3f}",
+                max_age=math.ceil(window),
+                httponly=True,
+                samesite="lax",
+            )
+        return response
+
     @app.middleware("http")
     async def custom_logging(request: Request, call_next):
         start_time = time.time()
@@ -17,9 +47,28 @@ def register_middleware(app: FastAPI):
         response = await call_next(request)
         processing_time = time.time() - start_time
 
-        message = f"{request.client.host}:{request.client.port} - {request.method} - {request.url.path} - {response.status_code} completed after {processing_time}s"
+        # Label by route template, unmatched paths would explode cardinality
+        route = request.scope.get("route")
+        http_request_duration.observe(
+            (
+                request.method,
+                route.path if route is not None else "unmatched",
+                str(response.status_code),
+            ),
+            processing_time,
+        )
+        registry.maybe_flush()
 
-        print(message)
+        app_log.info(
+            "%s:%s - %s - %s - %s completed after %ss",
+            request.client.host,
+            request.client.port,
+            request.method,
+            request.url.path,
+            response.status_code,
+            processing_time,
+            sample=Config.LOG_HOT_PATH_SAMPLE_RATE,
+        )
         return response
 
     app.add_middleware(
@@ -28,6 +77,17 @@ def register_middleware(app: FastAPI):
         allow_methods=["*"],
         allow_headers=["*"],
         allow_credentials=True,
+        # Conditional GET validators, legacy page metadata and idempotent replays
+        expose_headers=[
+            "ETag",
+            "Last-Modified",
+            "X-Total-Count",
+            "X-Total-Pages",
+            "X-Total-Is-Estimate",
+            "X-Page",
+            "X-Page-Size",
+            "Idempotent-Replayed",
+        ],
     )
 
     app.add_middleware(
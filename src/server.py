@@ -0,0 +1,101 @@
+import importlib.util
+import os
+import tempfile
+
+import uvicorn
+
+from src.config import Config
+from src.logger import app_log
+
+
+def worker_count() -> int:
+    if Config.WEB_WORKERS:
+        return Config.WEB_WORKERS
+    # Cores this process may run on, which can be fewer than the machine has
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def split_pool_budget(workers: int, budget: int) -> tuple[int, int]:
+    """
+    Per-worker (pool_size, max_overflow) so that `workers` pools together
+    never open more than `budget` connections.
+    """
+    per_worker = budget // workers
+    if per_worker < 1:
+        raise ValueError(
+            f"DB_MAX_CONNECTIONS={budget} cannot give each of {workers} "
+            "workers a connection"
+        )
+    pool_size = min(Config.DB_POOL_SIZE, per_worker)
+    return pool_size, per_worker - pool_size
+
+
+def main():
+    """
+    Production entry point, `python -m src.server`. Runs the app in several
+    uvicorn worker processes, with uvloop and httptools when installed. On
+    SIGTERM uvicorn stops accepting connections and gives in-flight requests
+    up to WEB_GRACEFUL_TIMEOUT seconds to finish. For development run
+    `uvicorn src:app --reload` instead.
+    """
+    workers = worker_count()
+
+    # Every worker opens its own pools (one per database server), so scale
+    # them down to stay within the budget. Workers are spawned with this
+    # environment and read their settings from it.
+    if Config.DB_MAX_CONNECTIONS:
+        try:
+            pool_size, max_overflow = split_pool_budget(
+                workers, Config.DB_MAX_CONNECTIONS
+            )
+        except ValueError as exc:
+            raise SystemExit(str(exc))
+        os.environ["DB_POOL_SIZE"] = str(pool_size)
+        os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+    else:
+        pool_size, max_overflow = Config.DB_POOL_SIZE, Config.DB_MAX_OVERFLOW
+
+    # Each worker would keep its own contact cache, and a write only
+    # invalidates the copy of the worker that handled it
+    if workers > 1:
+        if Config.CONTACT_CACHE_BACKEND is None:
+            os.environ["CONTACT_CACHE_BACKEND"] = "none"
+        elif Config.CONTACT_CACHE_BACKEND == "lru_ttl":
+            app_log.warning(
+                "The contact cache is per worker, reads may be up to %ss stale "
+                "after a write",
+                Config.CONTACT_CACHE_TTL,
+            )
+
+    # Histograms are per process, merge them for /metrics across workers
+    if workers > 1 and not Config.METRICS_MULTIPROC_DIR:
+        os.environ["METRICS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="metrics_")
+
+    app_log.info(
+        "Starting %s workers on %s:%s (loop=%s, http=%s), "
+        "DB pool %s + %s overflow per worker",
+        workers,
+        Config.WEB_HOST,
+        Config.WEB_PORT,
+        "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "httptools" if importlib.util.find_spec("httptools") else "h11",
+        pool_size,
+        max_overflow,
+    )
+    uvicorn.run(
+        "src:app",
+        host=Config.WEB_HOST,
+        port=Config.WEB_PORT,
+        workers=workers,
+        loop="auto",
+        http="auto",
+        timeout_graceful_shutdown=Config.WEB_GRACEFUL_TIMEOUT,
+        proxy_headers=True,
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
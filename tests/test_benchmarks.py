@@ -0,0 +1,128 @@
+import random
+
+import httpx
+import pytest
+
+from benchmarks.run import replay
+from benchmarks.stats import compare, percentile, summarize
+from benchmarks.workload import (
+    WorkloadGenerator,
+    load_workload,
+    seeded_phone,
+    synthetic_contact,
+)
+
+
+def test_load_workload_sums_weights_per_operation(tmp_path):
+    path = tmp_path / "workload.jsonl"
+    path.write_text(
+        '{"operation": "get", "weight": 3}\n\n'
+        '{"operation": "create", "weight": 1}\n'
+        '{"operation": "get", "weight": 2}\n'
+    )
+    assert load_workload(str(path)) == {"get": 5.0, "create": 1.0}
+
+
+def test_load_workload_rejects_unknown_operation(tmp_path):
+    path = tmp_path / "workload.jsonl"
+    path.write_text('{"operation": "drop_table", "weight": 1}\n')
+    with pytest.raises(ValueError, match="drop_table"):
+        load_workload(str(path))
+
+
+def test_synthetic_contacts_are_deterministic_and_unique():
+    assert synthetic_contact(42) == synthetic_contact(42)
+    assert synthetic_contact(42)[2] == seeded_phone(42) == "0500000042"
+    assert len({synthetic_contact(index)[2] for index in range(1000)}) == 1000
+
+
+def test_generator_is_reproducible_for_a_seed():
+    def urls(seed):
+        generator = WorkloadGenerator(
+            weights={"get": 1, "search_name": 1}, contacts=100, rng=random.Random(seed)
+        )
+        return [generator.next_request().url for _ in range(20)]
+
+    assert urls(7) == urls(7)
+
+
+def test_delete_only_targets_contacts_created_during_the_run():
+    generator = WorkloadGenerator(
+        weights={"delete": 1}, contacts=100, rng=random.Random(0)
+    )
+    request = generator.next_request()
+    assert request.operation == "create"
+
+    generator.record_response(request, 201, {"id": 500})
+    request = generator.next_request()
+    assert (request.operation, request.url) == ("delete", "/api/v1/contacts/500")
+    assert generator.created == []
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_summarize_reports_milliseconds_and_throughput():
+    summary = summarize([0.001, 0.002, 0.003, 0.004], errors=1, elapsed=2.0)
+    assert summary["requests"] == 4
+    assert summary["errors"] == 1
+    assert summary["throughput_rps"] == 2.0
+    assert summary["p50_ms"] == 2.0
+    assert summary["p99_ms"] == 4.0
+
+
+def test_compare_flags_routes_slower_than_tolerance():
+    baseline = {
+        "routes": {
+            "GET /a": {"p95_ms": 10.0, "throughput_rps": 100.0},
+            "GET /b": {"p95_ms": 10.0, "throughput_rps": 100.0},
+        }
+    }
+    current = {
+        "routes": {
+            "GET /a": {"p95_ms": 10.5, "throughput_rps": 95.0},
+            "GET /b": {"p95_ms": 12.0, "throughput_rps": 80.0},
+            "GET /new": {"p95_ms": 50.0, "throughput_rps": 1.0},
+        }
+    }
+    regressions = compare(current, baseline, tolerance=0.1)
+    assert len(regressions) == 2
+    assert all(regression.startswith("GET /b") for regression in regressions)
+
+
+@pytest.mark.asyncio
+async def test_replay_groups_latencies_by_route_template():
+    next_id = iter(range(1000, 2000))
+
+    def handler(request: httpx.Request):
+        if request.method == "POST":
+            return httpx.Response(201, json={"id": next(next_id)})
+        if request.method == "DELETE":
+            return httpx.Response(204)
+        return httpx.Response(500)
+
+    generator = WorkloadGenerator(
+        weights={"create": 1, "delete": 1, "get": 1},
+        contacts=100,
+        rng=random.Random(1),
+    )
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://test"
+    ) as client:
+        latencies, errors, elapsed = await replay(
+            client, generator, requests=60, concurrency=4
+        )
+
+    assert sum(len(values) for values in latencies.values()) == 60
+    assert set(latencies) <= {
+        "POST /api/v1/contacts/",
+        "DELETE /api/v1/contacts/{contact_id}",
+        "GET /api/v1/contacts/{contact_id}",
+    }
+    assert errors["GET /api/v1/contacts/{contact_id}"] == len(
+        latencies["GET /api/v1/contacts/{contact_id}"]
+    )
@@ -0,0 +1,84 @@
+import pytest
+from src.contacts.cache import LRUTTLCache, NullCache, create_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_get_miss_and_hit():
+    cache = LRUTTLCache(maxsize=2, ttl=10)
+    assert await cache.get("a") is None
+    await cache.set("a", 1)
+    assert await cache.get("a") == 1
+    stats = await cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used():
+    cache = LRUTTLCache(maxsize=2, ttl=10)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    await cache.get("a")
+    await cache.set("c", 3)
+    assert await cache.get("b") is None
+    assert await cache.get("a") == 1
+    assert await cache.get("c") == 3
+    assert (await cache.stats())["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = LRUTTLCache(maxsize=2, ttl=10, clock=clock)
+    await cache.set("a", 1)
+    clock.now = 10
+    assert await cache.get("a") is None
+    assert (await cache.stats())["expirations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_delete_and_disabled_cache():
+    cache = LRUTTLCache(maxsize=2, ttl=10)
+    await cache.set("a", 1)
+    await cache.delete("a", "missing")
+    assert await cache.get("a") is None
+
+    disabled = LRUTTLCache(maxsize=0, ttl=10)
+    await disabled.set("a", 1)
+    assert await disabled.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_create_cache_by_backend_name():
+    cache = create_cache("lru_ttl", maxsize=2, ttl=10)
+    assert isinstance(cache, LRUTTLCache)
+    assert (cache.maxsize, cache.ttl) == (2, 10)
+
+    null = create_cache("none", maxsize=2, ttl=10)
+    assert isinstance(null, NullCache)
+    await null.set("a", 1)
+    assert await null.get("a") is None
+
+    with pytest.raises(ValueError):
+        create_cache("redis", maxsize=2, ttl=10)
+
+
+@pytest.mark.asyncio
+async def test_peek_leaves_stats_and_recency_alone():
+    cache = LRUTTLCache(maxsize=2, ttl=10)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    assert await cache.peek("a") == 1
+    assert await cache.peek("missing") is None
+    await cache.set("c", 3)
+    assert await cache.peek("a") is None
+    stats = await cache.stats()
+    assert (stats["hits"], stats["misses"]) == (0, 0)
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import pytest
+from starlette.requests import Request
+
+from src.contacts.conditional import (
+    contact_validators,
+    is_not_modified,
+    page_etag,
+    validators_for_contact,
+    validators_for_page,
+)
+
+UPDATED_AT = datetime(2026, 1, 2, 3, 4, 5, 678901)
+VALIDATORS = contact_validators(7, UPDATED_AT)
+
+
+def make_request(**headers) -> Request:
+    raw = [
+        (name.replace("_", "-").lower().encode(), value.encode())
+        for name, value in headers.items()
+    ]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+
+def test_contact_validators():
+    assert VALIDATORS == {
+        "ETag": '"7-20260102030405678901"',
+        "Last-Modified": "Fri, 02 Jan 2026 03:04:05 GMT",
+    }
+
+
+def test_validators_need_updated_at():
+    assert validators_for_contact({"id": 7}) == {}
+    assert validators_for_page([{"id": 7}]) == {}
+    assert validators_for_contact({"id": 7, "updated_at": UPDATED_AT}) == VALIDATORS
+
+
+def test_page_etag_depends_on_every_row_and_on_has_more():
+    versions = [(1, UPDATED_AT), (2, UPDATED_AT)]
+    etag = page_etag(versions)
+    assert etag == page_etag(list(versions))
+    assert etag != page_etag(versions[:1])
+    assert etag != page_etag([(1, UPDATED_AT), (2, datetime(2026, 1, 3))])
+    assert etag != page_etag(versions, has_more=True)
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({}, False),
+        ({"If_None_Match": '"7-20260102030405678901"'}, True),
+        ({"If_None_Match": 'W/"7-20260102030405678901"'}, True),
+        ({"If_None_Match": '"other", "7-20260102030405678901"'}, True),
+        ({"If_None_Match": "*"}, True),
+        ({"If_None_Match": '"other"'}, False),
+        ({"If_Modified_Since": "Fri, 02 Jan 2026 03:04:05 GMT"}, True),
+        ({"If_Modified_Since": "Fri, 02 Jan 2026 03:04:04 GMT"}, False),
+        ({"If_Modified_Since": "not a date"}, False),
+        # If-None-Match takes precedence over If-Modified-Since
+        (
+            {
+                "If_None_Match": '"other"',
+                "If_Modified_Since": "Fri, 02 Jan 2026 03:04:05 GMT",
+            },
+            False,
+        ),
+    ],
+)
+def test_is_not_modified(headers, expected):
+    assert is_not_modified(make_request(**headers), VALIDATORS) is expected
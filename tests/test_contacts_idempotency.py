@@ -0,0 +1,172 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import pytest_mock
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from unittest.mock import AsyncMock
+from starlette.requests import Request
+
+from src.contacts import idempotency
+from src.contacts.database import ContactDBLayer
+from src.contacts.idempotency import idempotent
+from src.contacts.responses import contact_response
+from src.contacts.routes import contact_router
+from src.contacts.schemas import Contact, ContactCreateModel
+from src.database.main import get_db_session
+from src.database.slow_queries import SKIP_OPTION
+from src.errors import IdempotencyKeyReused
+
+CONTACT_DATA = {
+    "id": 1,
+    "first_name": "John",
+    "last_name": "Doe",
+    "phone_number": "0501234567",
+    "address": "123 Street",
+}
+PAYLOAD = ContactCreateModel(
+    first_name="John", last_name="Doe", phone_number="0501234567", address="123 Street"
+)
+SESSION = object()
+
+
+class FakeKeyStore:
+    """Stands in for the idempotency_keys queries of ContactDBLayer."""
+
+    def __init__(self):
+        self.records = {}
+        self.locked = []
+
+    async def lock_idempotency_key(self, key, session):
+        self.locked.append(key)
+
+    async def get_idempotency_record(self, key, session):
+        return self.records.get(key)
+
+    async def save_idempotency_record(
+        self, key, fingerprint, status_code, body, ttl, session
+    ):
+        self.records[key] = SimpleNamespace(
+            fingerprint=fingerprint, status_code=status_code, body=body
+        )
+
+    async def purge_idempotency_keys(self, limit, session):
+        pass
+
+
+@pytest.fixture
+def store(mocker: pytest_mock.MockFixture):
+    store = FakeKeyStore()
+    mocker.patch("src.contacts.idempotency.contact_db_layer", store)
+    return store
+
+
+def make_request(path="/contacts/", method="POST"):
+    return Request({"type": "http", "method": method, "path": path, "headers": []})
+
+
+def counting_handler():
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        # Yield, so a concurrent duplicate gets the chance to run
+        await asyncio.sleep(0)
+        return contact_response(CONTACT_DATA, Contact, status_code=201)
+
+    return handler, calls
+
+
+@pytest.mark.asyncio
+async def test_without_key_runs_handler(store):
+    handler, calls = counting_handler()
+    response = await idempotent(make_request(), None, PAYLOAD, SESSION, handler)
+    assert response.status_code == 201
+    assert calls == [1]
+    assert store.locked == []
+
+
+@pytest.mark.asyncio
+async def test_retry_replays_stored_response(store):
+    handler, calls = counting_handler()
+    first = await idempotent(make_request(), "key-1", PAYLOAD, SESSION, handler)
+    retry = await idempotent(make_request(), "key-1", PAYLOAD, SESSION, handler)
+
+    assert calls == [1]
+    assert retry.status_code == 201
+    assert retry.body == first.body
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+
+
+@pytest.mark.asyncio
+async def test_key_reused_for_another_request_is_rejected(store):
+    handler, _ = counting_handler()
+    await idempotent(make_request(), "key-1", PAYLOAD, SESSION, handler)
+
+    other = PAYLOAD.model_copy(update={"address": "9 Other Street"})
+    with pytest.raises(IdempotencyKeyReused):
+        await idempotent(make_request(), "key-1", other, SESSION, handler)
+    with pytest.raises(IdempotencyKeyReused):
+        await idempotent(
+            make_request("/contacts/1", "PUT"), "key-1", PAYLOAD, SESSION, handler
+        )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_run_once(store):
+    handler, calls = counting_handler()
+    responses = await asyncio.gather(
+        *(
+            idempotent(make_request(), "key-1", PAYLOAD, SESSION, handler)
+            for _ in range(3)
+        )
+    )
+    assert calls == [1]
+    assert [response.status_code for response in responses] == [201, 201, 201]
+    assert idempotency._local_locks == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_request_stores_nothing(store):
+    async def handler():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await idempotent(make_request(), "key-1", PAYLOAD, SESSION, handler)
+    assert store.records == {}
+    assert idempotency._local_locks == {}
+
+
+@pytest.mark.asyncio
+async def test_create_route_honours_header(store, mocker: pytest_mock.MockFixture):
+    create_contact = mocker.patch(
+        "src.contacts.routes.contact_service.create_contact",
+        AsyncMock(return_value=CONTACT_DATA),
+    )
+    app = FastAPI()
+    app.include_router(contact_router, prefix="/contacts")
+    app.dependency_overrides[get_db_session] = lambda: SESSION
+
+    async with AsyncClient(
+        base_url="http://test", transport=ASGITransport(app)
+    ) as client:
+        headers = {"Idempotency-Key": "key-1"}
+        body = PAYLOAD.model_dump()
+        first = await client.post("/contacts/", json=body, headers=headers)
+        retry = await client.post("/contacts/", json=body, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == CONTACT_DATA
+    assert retry.headers["idempotent-replayed"] == "true"
+    create_contact.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_key_lock_is_kept_out_of_slow_query_log():
+    session = AsyncMock()
+    await ContactDBLayer().lock_idempotency_key("key-1", session)
+
+    statement = session.execute.await_args.args[0]
+    assert statement.get_execution_options()[SKIP_OPTION] is True
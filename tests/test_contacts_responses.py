@@ -0,0 +1,100 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from src.config import Config
+from src.contacts import responses
+from src.contacts.responses import ContactJSONResponse, contact_response
+from src.contacts.schemas import Contact, ContactPage
+from src.database import models
+
+CONTACT_DATA = {
+    "id": 1,
+    "first_name": "Yael",
+    "last_name": "Cohen",
+    "phone_number": "0501234567",
+    "address": "1 Herzl",
+}
+
+
+def make_row(**overrides):
+    now = datetime(2026, 1, 1)
+    return models.Contact(
+        **{**CONTACT_DATA, **overrides},
+        phone_e164="+972501234567",
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def render(content):
+    return json.loads(ContactJSONResponse(content).body)
+
+
+def test_renders_only_public_fields_of_orm_rows():
+    assert render(make_row()) == CONTACT_DATA
+
+
+def test_matches_response_model_output():
+    rows = [make_row(), make_row(id=2, first_name="Noa")]
+    page = {"items": rows, "next_cursor": "abc"}
+
+    expected = ContactPage(
+        items=[Contact.model_validate(row, from_attributes=True) for row in rows],
+        next_cursor="abc",
+    ).model_dump(exclude_unset=True)
+    assert render(page) == expected
+    assert render(rows) == expected["items"]
+
+
+def test_renders_contact_dicts_and_models():
+    assert render(CONTACT_DATA) == CONTACT_DATA
+    assert render([Contact(**CONTACT_DATA)]) == [CONTACT_DATA]
+
+
+def test_falls_back_to_attribute_access_for_unloaded_fields():
+    class Lazy:
+        def __init__(self):
+            self.__dict__.update(CONTACT_DATA)
+            del self.__dict__["address"]
+
+        @property
+        def address(self):
+            return "loaded on access"
+
+    assert render(Lazy())["address"] == "loaded on access"
+
+
+def test_stdlib_fallback_produces_the_same_json(monkeypatch):
+    monkeypatch.setattr(responses, "orjson", None)
+    assert render({"items": [make_row(first_name="אבי")], "next_cursor": None}) == {
+        "items": [{**CONTACT_DATA, "first_name": "אבי"}],
+        "next_cursor": None,
+    }
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_contact_response_follows_setting(monkeypatch, enabled):
+    monkeypatch.setattr(Config, "FAST_SERIALIZATION", enabled)
+    row = make_row()
+
+    response = contact_response(row, Contact, status_code=201, headers={"ETag": '"1"'})
+
+    assert isinstance(response, ContactJSONResponse) is enabled
+    assert response.status_code == 201
+    assert response.headers["etag"] == '"1"'
+    assert json.loads(response.body) == CONTACT_DATA
+
+
+def test_sparse_fieldset_trims_rows_and_projected_dicts():
+    projected = {"id": 2, "first_name": "Dana", "updated_at": "skipped"}
+    response = contact_response(
+        {"items": [make_row(), projected], "next_cursor": None},
+        ContactPage,
+        fields=("first_name",),
+    )
+    assert json.loads(response.body) == {
+        "items": [{"first_name": "Yael"}, {"first_name": "Dana"}],
+        "next_cursor": None,
+    }
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 import pytest
 import pytest_mock
 import pytest_asyncio
@@ -6,6 +8,8 @@ from httpx import AsyncClient
 from httpx import ASGITransport
 from src.contacts.routes import contact_router
 from src.contacts.schemas import ContactCreateModel, ContactUpdateModel
+from src.config import Config
+from src.database.main import get_db_session, get_read_session
 from fastapi import FastAPI
 
 # Common test data
@@ -16,6 +20,9 @@ CONTACT_DATA = {
     "phone_number": "1234567890",
     "address": "123 Street",
 }
+SESSION = object()
+UPDATED_AT = datetime(2026, 1, 2, 3, 4, 5, 678901)
+ROW_DATA = {**CONTACT_DATA, "updated_at": UPDATED_AT}
 
 
 # Define a manual mock class for ContactService
@@ -27,6 +34,24 @@ class MockContactService:
             raise ValueError("Invalid page number")
         return [CONTACT_DATA]
 
+    async def get_contacts_keyset(self, after=None, page_size=10, sort="id"):
+        return {"items": [CONTACT_DATA], "next_cursor": None}
+
+    async def count_contacts(self, exact=False):
+        return 25, not exact
+
+    async def lookup_contacts(self, ids, phone_numbers):
+        return {"ids": {}, "phone_numbers": {}}
+
+    async def get_contact_version(self, contact_id: int):
+        return UPDATED_AT
+
+    async def get_contacts_paginated_versions(self, page: int):
+        return []
+
+    async def get_contacts_keyset_versions(self, after=None, page_size=10, sort="id"):
+        return [], False
+
     async def get_contact(self, contact_id: int):
         if contact_id != 1:
             return None  # Simulating a 404 response for non-existent contact
@@ -37,6 +62,19 @@ class MockContactService:
     async def create_contact(self, contact_data: ContactCreateModel):
         return CONTACT_DATA
 
+    async def bulk_create_contacts(self, contacts):
+        return []
+
+    async def export_contacts(self, format: str):
+        yield "id,first_name\n"
+        yield "1,John\n"
+
+    async def import_contacts(self, chunks, format: str):
+        return {"processed": 0, "inserted": 0, "rejected": 0, "rejected_rows": []}
+
+    async def search_contact(self, **criteria):
+        return [CONTACT_DATA]
+
     async def update_contact(self, contact_id: int, update_data: ContactUpdateModel):
         return CONTACT_DATA
 
@@ -52,6 +90,8 @@ class MockContactService:
 def app():
     app = FastAPI()
     app.include_router(contact_router, prefix="/contacts")
+    app.dependency_overrides[get_db_session] = lambda: SESSION
+    app.dependency_overrides[get_read_session] = lambda: SESSION
     return app
 
 
@@ -69,16 +109,37 @@ def mock_service(mocker: pytest_mock.MockFixture):
     mocker.patch.object(
         mock_service, "get_contacts_paginated", AsyncMock(return_value=[CONTACT_DATA])
     )
+    mocker.patch.object(
+        mock_service,
+        "get_contacts_keyset",
+        AsyncMock(return_value={"items": [CONTACT_DATA], "next_cursor": "abc"}),
+    )
     mocker.patch.object(
         mock_service, "get_contact", AsyncMock(return_value=CONTACT_DATA)
     )
     mocker.patch.object(
         mock_service, "create_contact", AsyncMock(return_value=CONTACT_DATA)
     )
+    mocker.patch.object(
+        mock_service,
+        "bulk_create_contacts",
+        AsyncMock(
+            return_value=[
+                {"index": 0, "status": "created", "contact": CONTACT_DATA},
+                {"index": 1, "status": "invalid_phone"},
+            ]
+        ),
+    )
     mocker.patch.object(
         mock_service, "update_contact", AsyncMock(return_value=CONTACT_DATA)
     )
     mocker.patch.object(mock_service, "delete_contact", AsyncMock(return_value=None))
+    mocker.patch.object(
+        mock_service, "search_contact", AsyncMock(return_value=[CONTACT_DATA])
+    )
+    mocker.patch.object(
+        mock_service, "count_contacts", AsyncMock(return_value=(25, True))
+    )
 
     # Patch the actual service import
     mocker.patch("src.contacts.routes.contact_service", mock_service)
@@ -107,6 +168,43 @@ async def test_get_page_contacts_invalid_page_string(client, mock_service):
     )  # FastAPI should return 422 for invalid query parameters
 
 
+@pytest.mark.asyncio(scope="function")
+async def test_get_contacts_cursor_mode(client, mock_service):
+    response = await client.get("/contacts/?after=abc&page_size=50&sort=name")
+    assert response.status_code == 200
+    assert response.json() == {"items": [CONTACT_DATA], "next_cursor": "abc"}
+    mock_service.get_contacts_keyset.assert_awaited_once_with(
+        after="abc", page_size=50, sort="name", session=SESSION, fields=None
+    )
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_get_contacts_bare_request_lists_first_page(client, mock_service):
+    response = await client.get("/contacts/")
+    assert response.status_code == 200
+    assert response.json() == [CONTACT_DATA]
+    mock_service.get_contacts_paginated.assert_awaited_once_with(
+        page=1, session=SESSION, fields=None
+    )
+    mock_service.get_contacts_keyset.assert_not_awaited()
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_get_contacts_explicit_cursor_mode(client, mock_service):
+    response = await client.get("/contacts/?mode=cursor")
+    assert response.status_code == 200
+    assert response.json() == {"items": [CONTACT_DATA], "next_cursor": "abc"}
+    mock_service.get_contacts_keyset.assert_awaited_once_with(
+        after=None, page_size=10, sort="id", session=SESSION, fields=None
+    )
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_get_contacts_cursor_page_size_too_large(client, mock_service):
+    response = await client.get("/contacts/?page_size=1000")
+    assert response.status_code == 422
+
+
 @pytest.mark.asyncio(scope="function")
 async def test_get_contact(client, mock_service):
     response = await client.get("/contacts/1")
@@ -139,6 +237,61 @@ async def test_create_contact(client, mock_service):
     assert response.json() == CONTACT_DATA
 
 
+@pytest.mark.asyncio(scope="function")
+async def test_bulk_create_contacts(client, mock_service):
+    response = await client.post("/contacts/bulk", json=[CONTACT_DATA, CONTACT_DATA])
+    assert response.status_code == 200
+    assert response.json() == [
+        {"index": 0, "status": "created", "contact": CONTACT_DATA},
+        {"index": 1, "status": "invalid_phone", "contact": None},
+    ]
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_bulk_create_contacts_too_many(client, mock_service):
+    response = await client.post("/contacts/bulk", json=[CONTACT_DATA] * 1001)
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_export_contacts(client, mock_service):
+    response = await client.get("/contacts/export?format=csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text == "id,first_name\n1,John\n"
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_export_contacts_invalid_format(client, mock_service):
+    response = await client.get("/contacts/export?format=xml")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_import_contacts(client, mock_service, mocker):
+    async def import_contacts(chunks, format):
+        body = b"".join([chunk async for chunk in chunks])
+        return {
+            "processed": body.count(b"\n"),
+            "inserted": 1,
+            "rejected": 0,
+            "rejected_rows": [],
+        }
+
+    mocker.patch.object(mock_service, "import_contacts", side_effect=import_contacts)
+    response = await client.post(
+        "/contacts/import?format=csv",
+        files={"file": ("contacts.csv", b"first_name\nJohn\n", "text/csv")},
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "processed": 2,
+        "inserted": 1,
+        "rejected": 0,
+        "rejected_rows": [],
+    }
+
+
 @pytest.mark.asyncio(scope="function")
 async def test_update_contact_invalid(client, mock_service):
     response = await client.put("/contacts/1", json={})
@@ -162,3 +315,206 @@ async def test_delete_contact_invalid(client, mock_service):
 async def test_delete_contact(client, mock_service):
     response = await client.delete("/contacts/1")
     assert response.status_code == 204
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_search_contact_fuzzy(client, mock_service):
+    response = await client.get("/contacts/search?q=jon&mode=fuzzy&limit=5")
+    assert response.status_code == 200
+    assert response.json() == [CONTACT_DATA]
+    mock_service.search_contact.assert_awaited_once_with(
+        phone_number=None,
+        first_name=None,
+        last_name=None,
+        q="jon",
+        mode="fuzzy",
+        limit=5,
+        after=None,
+        session=SESSION,
+        fields=None,
+    )
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_search_contact_address_returns_page(client, mock_service):
+    mock_service.search_contact.return_value = {
+        "items": [CONTACT_DATA],
+        "next_cursor": "next",
+    }
+    response = await client.get("/contacts/search?q=herzl+haifa&mode=address")
+    assert response.status_code == 200
+    assert response.json() == {"items": [CONTACT_DATA], "next_cursor": "next"}
+    assert mock_service.search_contact.await_args.kwargs["mode"] == "address"
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_search_contact_invalid_mode(client, mock_service):
+    response = await client.get("/contacts/search?q=jon&mode=regex")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_get_contact_sends_validators(client, mock_service):
+    mock_service.get_contact.return_value = ROW_DATA
+    response = await client.get("/contacts/1")
+    assert response.status_code == 200
+    assert response.json() == CONTACT_DATA
+    assert response.headers["etag"] == '"1-20260102030405678901"'
+    assert response.headers["last-modified"] == "Fri, 02 Jan 2026 03:04:05 GMT"
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_get_contact_sparse_fields(client, mock_service):
+    mock_service.get_contact.return_value = ROW_DATA
+    response = await client.get("/contacts/1?fields=phone_number,first_name")
+    assert response.status_code == 200
+    assert response.json() == {"first_name": "John", "phone_number": "1234567890"}
+    assert response.headers["etag"] == '"1-20260102030405678901"'
+    mock_service.get_contact.assert_awaited_once_with(
+        contact_id=1, session=SESSION, fields=("first_name", "phone_number")
+    )
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_search_contact_sparse_fields(client, mock_service):
+    response = await client.get("/contacts/search?phone_number=1&fields=last_name")
+    assert response.status_code == 200
+    assert response.json() == [{"last_name": "Doe"}]
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_get_contact_not_modified(client, mock_service, mocker):
+    mocker.patch.object(
+        mock_service, "get_contact_version", AsyncMock(return_value=UPDATED_AT)
+    )
+    response = await client.get(
+        "/contacts/1", headers={"If-None-Match": '"1-20260102030405678901"'}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == '"1-20260102030405678901"'
+    mock_service.get_contact.assert_not_awaited()
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_get_contact_if_modified_since(client, mock_service, mocker):
+    mocker.patch.object(
+        mock_service, "get_contact_version", AsyncMock(return_value=UPDATED_AT)
+    )
+    mock_service.get_contact.return_value = ROW_DATA
+
+    response = await client.get(
+        "/contacts/1", headers={"If-Modified-Since": "Fri, 02 Jan 2026 03:04:05 GMT"}
+    )
+    assert response.status_code == 304
+
+    response = await client.get(
+        "/contacts/1", headers={"If-Modified-Since": "Fri, 02 Jan 2026 03:04:04 GMT"}
+    )
+    assert response.status_code == 200
+    assert response.json() == CONTACT_DATA
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_get_contacts_page_not_modified(client, mock_service, mocker):
+    mock_service.get_contacts_keyset.return_value = {
+        "items": [ROW_DATA],
+        "next_cursor": "abc",
+    }
+    response = await client.get("/contacts/?page_size=1")
+    etag = response.headers["etag"]
+    assert "last-modified" not in response.headers
+
+    mocker.patch.object(
+        mock_service,
+        "get_contacts_keyset_versions",
+        AsyncMock(return_value=([(1, UPDATED_AT)], True)),
+    )
+    response = await client.get(
+        "/contacts/?page_size=1", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    mock_service.get_contacts_keyset.assert_awaited_once()
+
+    # The last page of the same rows is a different representation
+    mock_service.get_contacts_keyset_versions.return_value = ([(1, UPDATED_AT)], False)
+    response = await client.get(
+        "/contacts/?page_size=1", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_lookup_contacts(client, mock_service, mocker):
+    mocker.patch.object(
+        mock_service,
+        "lookup_contacts",
+        AsyncMock(
+            return_value={
+                "ids": {
+                    "2": {"status": "not_found", "contact": None},
+                    "1": {"status": "found", "contact": ROW_DATA},
+                },
+                "phone_numbers": {"id": {"status": "not_found", "contact": None}},
+            }
+        ),
+    )
+    response = await client.post(
+        "/contacts/lookup", json={"ids": [2, 1], "phone_numbers": ["id"]}
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "ids": {
+            "2": {"status": "not_found", "contact": None},
+            "1": {"status": "found", "contact": CONTACT_DATA},
+        },
+        "phone_numbers": {"id": {"status": "not_found", "contact": None}},
+    }
+    assert list(response.json()["ids"]) == ["2", "1"]
+    mock_service.lookup_contacts.assert_awaited_once_with(
+        ids=[2, 1], phone_numbers=["id"], session=SESSION
+    )
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_lookup_contacts_too_many(client, mock_service):
+    response = await client.post("/contacts/lookup", json={"ids": list(range(1001))})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio(scope="function")
+@pytest.mark.parametrize("fast", [True, False])
+async def test_get_contacts_cursor_mode_with_total(client, mock_service, mocker, fast):
+    mocker.patch.object(Config, "FAST_SERIALIZATION", fast)
+    response = await client.get("/contacts/?page_size=10&include_total=true")
+    assert response.status_code == 200
+    assert response.json() == {
+        "items": [CONTACT_DATA],
+        "next_cursor": "abc",
+        "total": 25,
+        "total_pages": 3,
+        "total_is_estimate": True,
+    }
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_get_page_contacts_with_exact_total(client, mock_service, mocker):
+    mocker.patch.object(
+        mock_service, "count_contacts", AsyncMock(return_value=(25, False))
+    )
+    response = await client.get("/contacts/?page=2&include_total=true&count=exact")
+    assert response.status_code == 200
+    assert response.json() == [CONTACT_DATA]
+    assert response.headers["x-total-count"] == "25"
+    assert response.headers["x-total-pages"] == "3"
+    assert response.headers["x-total-is-estimate"] == "false"
+    assert response.headers["x-page"] == "2"
+    mock_service.count_contacts.assert_awaited_once_with(session=SESSION, exact=True)
+
+
+@pytest.mark.asyncio(scope="function")
+async def test_get_contacts_without_total_skips_count(client, mock_service, mocker):
+    mocker.patch.object(mock_service, "count_contacts", AsyncMock())
+    response = await client.get("/contacts/?page=1")
+    assert "x-total-count" not in response.headers
+    mock_service.count_contacts.assert_not_awaited()
@@ -1,9 +1,27 @@
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime
+
 import pytest
+from types import SimpleNamespace
 import pytest_mock
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.dialects import postgresql
+
+from src.contacts.cache import LRUTTLCache
+from src.contacts.database import ContactDBLayer
 from src.contacts.service import ContactService
-from src.contacts.schemas import ContactCreateModel, ContactUpdateModel
-from src.errors import ContactNotFound, ContactAlreadyExists, InvalidPageNumber
+from src.contacts.utils import normalize_phone
+from src.database.main import FROM_REPLICA, run_after_commit
+from src.contacts.schemas import Contact, ContactCreateModel, ContactUpdateModel
+from src.errors import (
+    ContactNotFound,
+    ContactAlreadyExists,
+    InvalidCursor,
+    InvalidImportFile,
+    InvalidPageNumber,
+    InvalidSearch,
+)
 
 # Common test data
 CONTACT_DATA = {
@@ -13,6 +31,9 @@ CONTACT_DATA = {
     "phone_number": "1234567890",
     "address": "123 Street",
 }
+CONTACT = Contact(**CONTACT_DATA)
+# Request-scoped session handed to the service; the DB layer is mocked out
+SESSION = SimpleNamespace(info={})
 
 
 @pytest.fixture
@@ -20,16 +41,31 @@ def contact_service():
     return ContactService()
 
 
+@pytest.fixture(autouse=True)
+def clear_session():
+    # Drops callbacks left over by a test that never "committed"
+    SESSION.info.clear()
+
+
+@pytest.fixture(autouse=True)
+def contact_cache(mocker: pytest_mock.MockFixture):
+    cache = LRUTTLCache(maxsize=100, ttl=60)
+    mocker.patch("src.contacts.service.contact_cache", cache)
+    return cache
+
+
 @pytest.fixture
 def mock_contact_db_layer(mocker: pytest_mock.MockFixture):
     mocker.patch("src.contacts.service.is_valid_israeli_phone", return_value=True)
     mock_layer = mocker.patch("src.contacts.service.contact_db_layer")
 
-    mock_layer.get_contact = AsyncMock(return_value=CONTACT_DATA)
-    mock_layer.create_contact = AsyncMock(return_value=CONTACT_DATA)
-    mock_layer.update_contact = AsyncMock(return_value=CONTACT_DATA)
+    mock_layer.get_contact = AsyncMock(return_value=CONTACT)
+    mock_layer.create_contact = AsyncMock(return_value=CONTACT)
+    mock_layer.update_contact = AsyncMock(return_value=CONTACT)
+    mock_layer.search_contact = AsyncMock(return_value=[CONTACT])
     mock_layer.delete_contact = AsyncMock(return_value=True)
     mock_layer.get_contacts_paginated = AsyncMock(return_value=[CONTACT_DATA])
+    mock_layer.get_contacts_after = AsyncMock(return_value=[])
 
     return mock_layer
 
@@ -37,8 +73,8 @@ def mock_contact_db_layer(mocker: pytest_mock.MockFixture):
 @pytest.mark.asyncio
 async def test_create_contact(contact_service, mock_contact_db_layer):
     contact = ContactCreateModel(**CONTACT_DATA)
-    result = await contact_service.create_contact(contact)
-    assert result == CONTACT_DATA
+    result = await contact_service.create_contact(contact, session=SESSION)
+    assert result == CONTACT
 
 
 @pytest.mark.asyncio
@@ -46,52 +82,377 @@ async def test_create_contact_already_exists(contact_service, mock_contact_db_la
     mock_contact_db_layer.create_contact = AsyncMock(return_value=None)
     contact = ContactCreateModel(**CONTACT_DATA)
     with pytest.raises(ContactAlreadyExists):
-        await contact_service.create_contact(contact)
+        await contact_service.create_contact(contact, session=SESSION)
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_contacts(contact_service, mock_contact_db_layer, mocker):
+    mocker.patch(
+        "src.contacts.service.is_valid_israeli_phone",
+        side_effect=lambda phone: phone.startswith(("05", "+9725")),
+    )
+    created = SimpleNamespace(
+        id=1, phone_number="0501234567", phone_e164="+972501234567"
+    )
+    mock_contact_db_layer.bulk_create_contacts = AsyncMock(return_value=[created])
+    contacts = [
+        ContactCreateModel(**{**CONTACT_DATA, "phone_number": phone})
+        for phone in ("0501234567", "123", "+972501234567", "0507654321")
+    ]
+
+    result = await contact_service.bulk_create_contacts(contacts, session=SESSION)
+
+    assert result == [
+        {"index": 0, "status": "created", "contact": created},
+        {"index": 1, "status": "invalid_phone"},
+        {"index": 2, "status": "duplicate"},
+        {"index": 3, "status": "duplicate"},
+    ]
+    sent = mock_contact_db_layer.bulk_create_contacts.await_args.kwargs["contacts"]
+    assert [contact.phone_number for contact in sent] == [
+        "0501234567",
+        "+972501234567",
+        "0507654321",
+    ]
 
 
 @pytest.mark.asyncio
 async def test_get_contact(contact_service, mock_contact_db_layer):
-    result = await contact_service.get_contact(1)
-    assert result == CONTACT_DATA
+    result = await contact_service.get_contact(1, session=SESSION)
+    assert result == CONTACT
 
 
 @pytest.mark.asyncio
 async def test_get_contact_not_found(contact_service, mock_contact_db_layer):
     mock_contact_db_layer.get_contact = AsyncMock(return_value=None)
     with pytest.raises(ContactNotFound):
-        await contact_service.get_contact(9999)
+        await contact_service.get_contact(9999, session=SESSION)
+
+
+@pytest.mark.asyncio
+async def test_get_contact_sparse_fields(
+    contact_service, mock_contact_db_layer, contact_cache
+):
+    row = {"id": 1, "first_name": "John", "updated_at": "t1"}
+    mock_contact_db_layer.get_contact = AsyncMock(return_value=row)
+
+    result = await contact_service.get_contact(
+        1, session=SESSION, fields=("first_name",)
+    )
+
+    assert result == row
+    kwargs = mock_contact_db_layer.get_contact.await_args.kwargs
+    assert kwargs["columns"] == ("id", "first_name", "updated_at")
+    # A partial row must not stand in for the whole contact
+    assert await contact_cache.get("contact:id:1") is None
 
 
 @pytest.mark.asyncio
 async def test_get_contacts_paginated(contact_service, mock_contact_db_layer):
-    result = await contact_service.get_contacts_paginated(1)
+    result = await contact_service.get_contacts_paginated(1, session=SESSION)
     assert result == [CONTACT_DATA]
 
 
 @pytest.mark.asyncio
 async def test_get_contacts_paginated_invalid_page(contact_service):
     with pytest.raises(InvalidPageNumber):
-        await contact_service.get_contacts_paginated(-1)
+        await contact_service.get_contacts_paginated(-1, session=SESSION)
+
+
+@pytest.mark.asyncio
+async def test_get_contacts_keyset_next_cursor(contact_service, mock_contact_db_layer):
+    rows = [SimpleNamespace(id=i, first_name="A", last_name="B") for i in (1, 2, 3)]
+    mock_contact_db_layer.get_contacts_after = AsyncMock(return_value=rows)
+
+    first = await contact_service.get_contacts_keyset(
+        page_size=2, sort="name", session=SESSION
+    )
+    assert first["items"] == rows[:2]
+    assert first["next_cursor"] is not None
+
+    mock_contact_db_layer.get_contacts_after = AsyncMock(return_value=rows[2:])
+    second = await contact_service.get_contacts_keyset(
+        after=first["next_cursor"], page_size=2, sort="name", session=SESSION
+    )
+    assert second == {"items": rows[2:], "next_cursor": None}
+    assert mock_contact_db_layer.get_contacts_after.await_args.kwargs["after"] == [
+        "B",
+        "A",
+        2,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_contacts_keyset_sparse_fields_loads_cursor_keys(
+    contact_service, mock_contact_db_layer
+):
+    rows = [{"id": i, "first_name": "A", "last_name": "B"} for i in (1, 2)]
+    mock_contact_db_layer.get_contacts_after = AsyncMock(return_value=rows)
+
+    page = await contact_service.get_contacts_keyset(
+        page_size=1, sort="name", session=SESSION, fields=("phone_number",)
+    )
+
+    kwargs = mock_contact_db_layer.get_contacts_after.await_args.kwargs
+    assert kwargs["columns"] == (
+        "id",
+        "first_name",
+        "last_name",
+        "phone_number",
+        "updated_at",
+    )
+    second = await contact_service.get_contacts_keyset(
+        after=page["next_cursor"], page_size=1, sort="name", session=SESSION
+    )
+    assert second["items"] == rows[:1]
+    assert mock_contact_db_layer.get_contacts_after.await_args.kwargs["after"] == [
+        "B",
+        "A",
+        1,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_contacts_keyset_invalid_cursor(contact_service):
+    with pytest.raises(InvalidCursor):
+        await contact_service.get_contacts_keyset(after="not-a-cursor", session=SESSION)
+
+
+@pytest.mark.asyncio
+async def test_get_contacts_keyset_cursor_sort_mismatch(
+    contact_service, mock_contact_db_layer
+):
+    rows = [SimpleNamespace(id=i, first_name="A", last_name="B") for i in (1, 2)]
+    mock_contact_db_layer.get_contacts_after = AsyncMock(return_value=rows)
+    page = await contact_service.get_contacts_keyset(
+        page_size=1, sort="id", session=SESSION
+    )
+    with pytest.raises(InvalidCursor):
+        await contact_service.get_contacts_keyset(
+            after=page["next_cursor"], sort="name", session=SESSION
+        )
+
+
+@pytest.mark.asyncio
+async def test_get_contacts_keyset_versions(contact_service, mock_contact_db_layer):
+    versions = [(1, "t1"), (2, "t2"), (3, "t3")]
+    mock_contact_db_layer.get_versions_after = AsyncMock(return_value=versions)
+
+    page = await contact_service.get_contacts_keyset_versions(
+        page_size=2, session=SESSION
+    )
+    assert page == (versions[:2], True)
+    assert mock_contact_db_layer.get_versions_after.await_args.kwargs["page_size"] == 3
+
+
+@pytest.mark.asyncio
+async def test_lookup_contacts(contact_service, mock_contact_db_layer):
+    first = SimpleNamespace(**CONTACT_DATA, phone_e164="1234567890")
+    second = SimpleNamespace(
+        **{**CONTACT_DATA, "id": 2, "phone_number": "0501234567"},
+        phone_e164="+972501234567",
+    )
+    mock_contact_db_layer.get_contacts_by_ids = AsyncMock(return_value=[first])
+    mock_contact_db_layer.get_contacts_by_phones = AsyncMock(return_value=[second])
+
+    result = await contact_service.lookup_contacts(
+        ids=[3, 1, 3], phone_numbers=["+972501234567", "0509999999"], session=SESSION
+    )
+
+    assert list(result["ids"]) == ["3", "1"]
+    assert result["ids"]["1"] == {"status": "found", "contact": first}
+    assert result["ids"]["3"] == {"status": "not_found", "contact": None}
+    assert result["phone_numbers"] == {
+        "+972501234567": {"status": "found", "contact": second},
+        "0509999999": {"status": "not_found", "contact": None},
+    }
+    mock_contact_db_layer.get_contacts_by_ids.assert_awaited_once_with(
+        ids=[3, 1], session=SESSION
+    )
+    mock_contact_db_layer.get_contacts_by_phones.assert_awaited_once_with(
+        phones_e164=["+972501234567", "+972509999999"], session=SESSION
+    )
+
+
+@pytest.mark.asyncio
+async def test_lookup_contacts_uses_cache(contact_service, mock_contact_db_layer):
+    contact = SimpleNamespace(
+        **{**CONTACT_DATA, "phone_number": "0501234567"}, phone_e164="+972501234567"
+    )
+    mock_contact_db_layer.get_contacts_by_ids = AsyncMock(return_value=[contact])
+    mock_contact_db_layer.get_contacts_by_phones = AsyncMock(return_value=[])
+    await contact_service.lookup_contacts(ids=[1], phone_numbers=[], session=SESSION)
+
+    result = await contact_service.lookup_contacts(
+        ids=[1], phone_numbers=["0501234567"], session=SESSION
+    )
+    assert result["ids"]["1"]["contact"] is contact
+    assert result["phone_numbers"]["0501234567"]["contact"] is contact
+    mock_contact_db_layer.get_contacts_by_ids.assert_awaited_once()
+    mock_contact_db_layer.get_contacts_by_phones.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_replica_reads_are_not_cached(
+    contact_service, mock_contact_db_layer, contact_cache
+):
+    replica_session = SimpleNamespace(info={FROM_REPLICA: True})
+    mock_contact_db_layer.get_contacts_by_ids = AsyncMock(return_value=[CONTACT])
+    assert await contact_service.get_contact(1, session=replica_session) == CONTACT
+    await contact_service.lookup_contacts(
+        ids=[1], phone_numbers=[], session=replica_session
+    )
+    assert await contact_cache.get("contact:id:1") is None
+
+
+@pytest.mark.asyncio
+async def test_count_contacts_prefers_estimate(contact_service, mock_contact_db_layer):
+    mock_contact_db_layer.estimate_contacts_count = AsyncMock(return_value=1200)
+    mock_contact_db_layer.count_contacts = AsyncMock(return_value=1234)
+
+    assert await contact_service.count_contacts(session=SESSION) == (1200, True)
+    mock_contact_db_layer.count_contacts.assert_not_awaited()
+
+    assert await contact_service.count_contacts(session=SESSION, exact=True) == (
+        1234,
+        False,
+    )
+
+
+@pytest.mark.asyncio
+async def test_count_contacts_without_statistics(
+    contact_service, mock_contact_db_layer
+):
+    mock_contact_db_layer.estimate_contacts_count = AsyncMock(return_value=None)
+    mock_contact_db_layer.count_contacts = AsyncMock(return_value=3)
+    assert await contact_service.count_contacts(session=SESSION) == (3, False)
+
+
+@pytest.mark.asyncio
+async def test_get_contact_version_not_found(contact_service, mock_contact_db_layer):
+    mock_contact_db_layer.get_contact_version = AsyncMock(return_value=None)
+    with pytest.raises(ContactNotFound):
+        await contact_service.get_contact_version(contact_id=99, session=SESSION)
+
+
+@pytest.mark.asyncio
+async def test_export_contacts(contact_service, mock_contact_db_layer):
+    async def stream_contacts(chunk_size, session):
+        yield [SimpleNamespace(**CONTACT_DATA)]
+        yield [SimpleNamespace(**{**CONTACT_DATA, "id": 2, "address": "1, Main"})]
+
+    mock_contact_db_layer.stream_contacts = stream_contacts
+
+    ndjson = [chunk async for chunk in contact_service.export_contacts("ndjson")]
+    assert len(ndjson) == 2
+    assert json.loads(ndjson[0]) == CONTACT_DATA
+
+    csv_chunks = [chunk async for chunk in contact_service.export_contacts("csv")]
+    assert csv_chunks == [
+        "id,first_name,last_name,phone_number,address\r\n",
+        "1,John,Doe,1234567890,123 Street\r\n",
+        '2,John,Doe,1234567890,"1, Main"\r\n',
+    ]
+
+
+async def as_chunks(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.mark.asyncio
+async def test_import_contacts_csv(contact_service, mock_contact_db_layer, mocker):
+    mocker.patch(
+        "src.contacts.service.is_valid_israeli_phone",
+        side_effect=lambda phone: phone.startswith(("05", "+9725")),
+    )
+    stored = set()
+    import_session = AsyncMock()
+
+    @asynccontextmanager
+    async def get_session():
+        yield import_session
+
+    mocker.patch("src.contacts.service.get_session", get_session)
+
+    async def copy_contacts(rows, session):
+        inserted = {normalize_phone(row[2]) for row in rows} - stored
+        stored.update(inserted)
+        return inserted
+
+    mock_contact_db_layer.copy_contacts = AsyncMock(side_effect=copy_contacts)
+    data = (
+        "first_name,last_name,phone_number,address\r\n"
+        "John,Doe,0501111111,1 Street\r\n"
+        "Jane,Doe,123,2 Street\n"
+        "Jim,Doe,0502222222\n"
+        "Jack,Doe,0501111111,3 Street\n"
+        "Jill,Doe,0503333333,4 Street"
+    ).encode()
+    rejected = []
+
+    summary = await contact_service.import_contacts(
+        chunks=as_chunks(data),
+        format="csv",
+        batch_size=3,
+        on_rejected=lambda line, row, reason: rejected.append((line, reason)),
+    )
+
+    assert summary["processed"] == 5
+    assert summary["inserted"] == 2
+    assert summary["rejected"] == 3
+    assert rejected == [(3, "invalid_phone"), (4, "malformed"), (5, "duplicate")]
+    assert mock_contact_db_layer.copy_contacts.await_count == 2
+    # One commit per batch
+    assert import_session.commit.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_import_contacts_ndjson(contact_service, mock_contact_db_layer):
+    mock_contact_db_layer.copy_contacts = AsyncMock(return_value=set())
+    data = b'{"first_name": "A", "last_name": "B", "address": "C"}\nnot json\n'
+
+    summary = await contact_service.import_contacts(
+        chunks=as_chunks(data), format="ndjson"
+    )
+
+    assert summary["rejected_rows"] == [
+        {"line": 1, "reason": "missing_field", "row": data.decode().split("\n")[0]},
+        {"line": 2, "reason": "malformed", "row": "not json"},
+    ]
+    mock_contact_db_layer.copy_contacts.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_import_contacts_missing_columns(contact_service, mock_contact_db_layer):
+    with pytest.raises(InvalidImportFile):
+        await contact_service.import_contacts(
+            chunks=as_chunks(b"name,phone\nJohn,0501111111\n"), format="csv"
+        )
 
 
 @pytest.mark.asyncio
 async def test_update_contact(contact_service, mock_contact_db_layer):
     update_data = ContactUpdateModel(**CONTACT_DATA)
-    result = await contact_service.update_contact(1, update_data)
-    assert result == CONTACT_DATA
+    result = await contact_service.update_contact(1, update_data, session=SESSION)
+    assert result == CONTACT
+    mock_contact_db_layer.get_contact.assert_not_awaited()
+    mock_contact_db_layer.update_contact.assert_awaited_once_with(
+        contact_id=1, update_data=update_data, session=SESSION
+    )
 
 
 @pytest.mark.asyncio
 async def test_update_contact_not_found(contact_service, mock_contact_db_layer):
-    mock_contact_db_layer.get_contact = AsyncMock(return_value=None)
+    mock_contact_db_layer.update_contact = AsyncMock(return_value=None)
     update_data = ContactUpdateModel(**CONTACT_DATA)
     with pytest.raises(ContactNotFound):
-        await contact_service.update_contact(9999, update_data)
+        await contact_service.update_contact(9999, update_data, session=SESSION)
 
 
 @pytest.mark.asyncio
 async def test_delete_contact(contact_service, mock_contact_db_layer):
-    result = await contact_service.delete_contact(1)
+    result = await contact_service.delete_contact(1, session=SESSION)
     assert result == {"message": "Contact deleted successfully"}
 
 
@@ -99,5 +460,210 @@ async def test_delete_contact(contact_service, mock_contact_db_layer):
 async def test_delete_contact_not_found(contact_service, mock_contact_db_layer):
     mock_contact_db_layer.delete_contact = AsyncMock(return_value=False)
     with pytest.raises(ContactNotFound) as exc_info:
-        await contact_service.delete_contact(9999)
+        await contact_service.delete_contact(9999, session=SESSION)
     assert str(exc_info.value) == ""
+
+
+@pytest.mark.asyncio
+async def test_get_contact_cached(contact_service, mock_contact_db_layer):
+    assert await contact_service.get_contact(1, session=SESSION) == CONTACT
+    assert await contact_service.get_contact(1, session=SESSION) == CONTACT
+    mock_contact_db_layer.get_contact.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_search_contact_by_phone_cached(contact_service, mock_contact_db_layer):
+    await contact_service.get_contact(1, session=SESSION)
+    result = await contact_service.search_contact(
+        phone_number="1234567890", session=SESSION
+    )
+    assert result == [CONTACT]
+    mock_contact_db_layer.search_contact.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_update_contact_refreshes_cache(contact_service, mock_contact_db_layer):
+    await contact_service.get_contact(1, session=SESSION)
+    updated = CONTACT.model_copy(update={"phone_number": "0501234567"})
+    mock_contact_db_layer.update_contact = AsyncMock(return_value=updated)
+    await contact_service.update_contact(
+        1, ContactUpdateModel(**CONTACT_DATA), session=SESSION
+    )
+    await run_after_commit(SESSION)
+
+    assert await contact_service.get_contact(1, session=SESSION) == updated
+    mock_contact_db_layer.search_contact = AsyncMock(return_value=[])
+    assert (
+        await contact_service.search_contact(phone_number="1234567890", session=SESSION)
+        == []
+    )
+    mock_contact_db_layer.search_contact.assert_awaited_once()
+    assert await contact_service.search_contact(
+        phone_number="0501234567", session=SESSION
+    ) == [updated]
+    mock_contact_db_layer.search_contact.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_delete_contact_invalidates_cache(contact_service, mock_contact_db_layer):
+    await contact_service.get_contact(1, session=SESSION)
+    await contact_service.delete_contact(1, session=SESSION)
+    # Still cached until the transaction commits
+    assert await contact_service.get_contact(1, session=SESSION) == CONTACT
+
+    await run_after_commit(SESSION)
+    mock_contact_db_layer.get_contact = AsyncMock(return_value=None)
+    with pytest.raises(ContactNotFound):
+        await contact_service.get_contact(1, session=SESSION)
+
+
+def committing_while_reading(rows):
+    # The read returns rows from before a write that commits meanwhile
+    async def read(**kwargs):
+        await run_after_commit(SESSION)
+        return rows
+
+    return AsyncMock(side_effect=read)
+
+
+@pytest.mark.asyncio
+async def test_read_racing_delete_does_not_recache(
+    contact_service, mock_contact_db_layer, contact_cache
+):
+    await contact_service.delete_contact(1, session=SESSION)
+    mock_contact_db_layer.get_contact = committing_while_reading(CONTACT)
+    assert await contact_service.get_contact(1, session=SESSION) == CONTACT
+    assert await contact_cache.peek("contact:id:1") == "deleted"
+
+    mock_contact_db_layer.get_contact = AsyncMock(return_value=None)
+    with pytest.raises(ContactNotFound):
+        await contact_service.get_contact(1, session=SESSION)
+
+
+@pytest.mark.asyncio
+async def test_read_racing_update_keeps_newer_version(
+    contact_service, mock_contact_db_layer, contact_cache
+):
+    old = SimpleNamespace(**CONTACT_DATA, updated_at=datetime(2026, 1, 1))
+    new = SimpleNamespace(**CONTACT_DATA, updated_at=datetime(2026, 1, 2))
+    mock_contact_db_layer.update_contact = AsyncMock(return_value=new)
+    await contact_service.update_contact(
+        1, ContactUpdateModel(**CONTACT_DATA), session=SESSION
+    )
+    mock_contact_db_layer.get_contacts_by_ids = committing_while_reading([old])
+    await contact_service.lookup_contacts(ids=[1], phone_numbers=[], session=SESSION)
+    mock_contact_db_layer.get_contacts_by_ids.assert_awaited_once()
+    assert await contact_cache.peek("contact:id:1") is new
+
+
+@pytest.mark.asyncio
+async def test_create_contact_cached_after_commit(
+    contact_service, mock_contact_db_layer, contact_cache
+):
+    contact = ContactCreateModel(**CONTACT_DATA)
+    await contact_service.create_contact(contact, session=SESSION)
+    assert await contact_cache.get("contact:id:1") is None
+
+    await run_after_commit(SESSION)
+    assert await contact_cache.get("contact:id:1") == CONTACT
+
+
+@pytest.mark.asyncio
+async def test_search_contact_prefix(contact_service, mock_contact_db_layer):
+    mock_contact_db_layer.search_contacts_by_name = AsyncMock(return_value=[CONTACT])
+    result = await contact_service.search_contact(
+        q=" jo do ", mode="prefix", limit=5, session=SESSION
+    )
+    assert result == [CONTACT]
+    mock_contact_db_layer.search_contacts_by_name.assert_awaited_once()
+    kwargs = mock_contact_db_layer.search_contacts_by_name.await_args.kwargs
+    assert (kwargs["query"], kwargs["mode"], kwargs["limit"]) == ("jo do", "prefix", 5)
+
+
+@pytest.mark.asyncio
+async def test_writes_do_not_return_address_search():
+    session = AsyncMock()
+    session.execute.return_value = MagicMock()
+    db_layer = ContactDBLayer()
+    contact = ContactCreateModel(**CONTACT_DATA)
+    await db_layer.create_contact(contact, session=session)
+    await db_layer.bulk_create_contacts([contact], session=session)
+    await db_layer.update_contact(
+        1, ContactUpdateModel(**CONTACT_DATA), session=session
+    )
+    for call in session.execute.await_args_list:
+        sql = str(call.args[0].compile(dialect=postgresql.dialect()))
+        assert "RETURNING contacts.id" in sql
+        assert "address_search" not in sql
+
+
+@pytest.mark.asyncio
+async def test_prefix_search_orders_by_name():
+    session = AsyncMock()
+    session.execute.return_value = MagicMock()
+    for mode in ("prefix", "fuzzy"):
+        await ContactDBLayer().search_contacts_by_name(
+            query="jo", mode=mode, limit=5, session=session
+        )
+    prefix, fuzzy = (
+        str(call.args[0].compile(dialect=postgresql.dialect()))
+        for call in session.execute.await_args_list
+    )
+    # Prefix matches follow idx_last_first_name_id, only fuzzy ones are scored
+    assert "similarity" not in prefix
+    assert "ORDER BY contacts.last_name, contacts.first_name, contacts.id" in prefix
+    assert "ORDER BY greatest(similarity(" in fuzzy
+
+
+@pytest.mark.asyncio
+async def test_search_contact_by_address_pages_by_rank(
+    contact_service, mock_contact_db_layer
+):
+    rows = [
+        (SimpleNamespace(id=i), rank) for i, rank in ((4, 0.5), (2, 0.25), (9, 0.25))
+    ]
+    mock_contact_db_layer.search_contacts_by_address = AsyncMock(return_value=rows)
+
+    first = await contact_service.search_contact(
+        q=" herzl haifa ", mode="address", limit=2, session=SESSION
+    )
+    assert first["items"] == [rows[0][0], rows[1][0]]
+    kwargs = mock_contact_db_layer.search_contacts_by_address.await_args.kwargs
+    assert (kwargs["query"], kwargs["limit"], kwargs["after"]) == (
+        "herzl haifa",
+        3,
+        None,
+    )
+
+    mock_contact_db_layer.search_contacts_by_address = AsyncMock(return_value=rows[2:])
+    second = await contact_service.search_contact(
+        q="herzl haifa",
+        mode="address",
+        limit=2,
+        after=first["next_cursor"],
+        session=SESSION,
+    )
+    assert second == {"items": [rows[2][0]], "next_cursor": None}
+    kwargs = mock_contact_db_layer.search_contacts_by_address.await_args.kwargs
+    assert kwargs["after"] == [0.25, 2]
+
+
+@pytest.mark.asyncio
+async def test_search_contact_by_address_rejects_other_cursors(
+    contact_service, mock_contact_db_layer
+):
+    rows = [SimpleNamespace(id=i, first_name="A", last_name="B") for i in (1, 2)]
+    mock_contact_db_layer.get_contacts_after = AsyncMock(return_value=rows)
+    page = await contact_service.get_contacts_keyset(
+        page_size=1, sort="id", session=SESSION
+    )
+    with pytest.raises(InvalidCursor):
+        await contact_service.search_contact(
+            q="herzl", mode="address", after=page["next_cursor"], session=SESSION
+        )
+
+
+@pytest.mark.asyncio
+async def test_search_contact_fuzzy_requires_query(contact_service):
+    with pytest.raises(InvalidSearch):
+        await contact_service.search_contact(q="  ", mode="fuzzy", session=SESSION)
@@ -0,0 +1,62 @@
+import pytest
+from src.contacts.utils import (
+    decode_cursor,
+    encode_cursor,
+    is_valid_israeli_phone,
+    normalize_phone,
+    parse_fields,
+)
+from src.errors import InvalidCursor, InvalidFields
+
+
+@pytest.mark.parametrize(
+    "phone, expected",
+    [
+        ("0501234567", True),
+        ("+972501234567", True),
+        ("050123456", False),
+        ("0401234567", False),
+        ("+972401234567", False),
+    ],
+)
+def test_is_valid_israeli_phone(phone, expected):
+    assert is_valid_israeli_phone(phone) is expected
+
+
+@pytest.mark.parametrize(
+    "phone, expected",
+    [
+        ("0501234567", "+972501234567"),
+        ("+972501234567", "+972501234567"),
+        ("1234567890", "1234567890"),
+    ],
+)
+def test_normalize_phone(phone, expected):
+    assert normalize_phone(phone) == expected
+
+
+def test_cursor_round_trip():
+    token = encode_cursor("name", ["Doe", "John", 7])
+    assert decode_cursor(token, "name", (str, str, int)) == ["Doe", "John", 7]
+
+
+@pytest.mark.parametrize(
+    "token", [encode_cursor("id", [7]), encode_cursor("name", ["Doe", 1, 7]), "%%"]
+)
+def test_decode_cursor_rejects_mismatch(token):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, "name", (str, str, int))
+
+
+def test_parse_fields_keeps_allowed_order():
+    allowed = ("id", "first_name", "last_name", "phone_number")
+    assert parse_fields("phone_number, first_name,", allowed) == (
+        "first_name",
+        "phone_number",
+    )
+
+
+@pytest.mark.parametrize("value", ["", " , ", "first_name,password"])
+def test_parse_fields_rejects_unknown_or_empty(value):
+    with pytest.raises(InvalidFields):
+        parse_fields(value, ("id", "first_name"))
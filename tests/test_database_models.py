@@ -0,0 +1,32 @@
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from src.database.models import CONTACT_PARTITIONS, Contact
+
+
+def test_contacts_is_hash_partitioned_on_canonical_phone():
+    ddl = str(CreateTable(Contact.__table__).compile(dialect=postgresql.dialect()))
+    assert "PARTITION BY HASH (phone_e164)" in ddl
+    # Unique constraints on a partitioned table must contain the partition key
+    assert [column.name for column in Contact.__table__.primary_key] == [
+        "id",
+        "phone_e164",
+    ]
+    unique = [index for index in Contact.__table__.indexes if index.unique]
+    assert [[column.name for column in index.columns] for index in unique] == [
+        ["phone_e164"]
+    ]
+
+
+def test_partitions_are_created_with_the_table():
+    connection = MagicMock()
+    Contact.__table__.dispatch.after_create(Contact.__table__, connection)
+    statements = [call.args[0].statement for call in connection.execute.call_args_list]
+    assert len(statements) == CONTACT_PARTITIONS
+    assert statements[-1] == (
+        f"CREATE TABLE contacts_p{CONTACT_PARTITIONS - 1:02d} PARTITION OF contacts "
+        f"FOR VALUES WITH (MODULUS {CONTACT_PARTITIONS}, "
+        f"REMAINDER {CONTACT_PARTITIONS - 1})"
+    )
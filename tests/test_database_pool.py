@@ -0,0 +1,22 @@
+from unittest.mock import MagicMock
+from src.database.pool import InstrumentedPool
+
+
+def test_pool_stats_track_checkouts():
+    pool = InstrumentedPool(creator=MagicMock, pool_size=1, max_overflow=1)
+
+    first = pool.connect()
+    second = pool.connect()
+    stats = pool.stats()
+    assert stats["checked_out"] == 2
+    assert stats["idle"] == 0
+    assert stats["overflow"] == 1
+    assert stats["checkouts"] == 2
+    assert stats["max_wait_ms"] >= stats["avg_wait_ms"] > 0
+
+    first.close()
+    second.close()
+    stats = pool.stats()
+    assert stats["checked_out"] == 0
+    assert stats["idle"] == 1
+    assert stats["overflow"] == 0
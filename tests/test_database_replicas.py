@@ -0,0 +1,99 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.database.replicas import ReplicaSet
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_replicas(lags: dict, clock=None, max_lag=5.0):
+    """`lags` maps a replica name to its lag in seconds, or an exception."""
+    engines = []
+    for name in lags:
+        engine = MagicMock()
+        engine.url.render_as_string.return_value = name
+        engine.name = name
+        engines.append(engine)
+
+    checks = []
+
+    async def measure_lag(engine):
+        checks.append(engine.name)
+        lag = lags[engine.name]
+        if isinstance(lag, Exception):
+            raise lag
+        return lag
+
+    replica_set = ReplicaSet(
+        engines=engines,
+        max_lag=max_lag,
+        check_interval=10.0,
+        check_timeout=1.0,
+        measure_lag=measure_lag,
+        clock=clock or FakeClock(),
+    )
+    return replica_set, checks
+
+
+@pytest.mark.asyncio
+async def test_round_robin_over_healthy_replicas():
+    replica_set, _ = make_replicas({"a": 0.0, "b": 0.5})
+    picked = [(await replica_set.pick()).name for _ in range(4)]
+    assert picked == ["a", "b", "a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_skips_lagging_and_unreachable_replicas():
+    replica_set, _ = make_replicas(
+        {"a": 30.0, "b": ConnectionRefusedError("refused"), "c": 1.0}
+    )
+    picked = {(await replica_set.pick()).name for _ in range(3)}
+    assert picked == {"c"}
+
+    stats = {entry["replica"]: entry for entry in replica_set.stats()}
+    assert stats["a"]["healthy"] is False
+    assert stats["a"]["lag_seconds"] == 30.0
+    assert stats["b"]["error"] == "refused"
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_primary_when_no_replica_is_usable():
+    replica_set, _ = make_replicas({"a": 30.0})
+    assert await replica_set.pick() is None
+
+
+@pytest.mark.asyncio
+async def test_checks_lazily_once_per_interval():
+    clock = FakeClock()
+    lags = {"a": 30.0}
+    replica_set, checks = make_replicas(lags, clock=clock)
+
+    assert await replica_set.pick() is None
+    lags["a"] = 0.0
+    clock.now = 5.0
+    assert await replica_set.pick() is None
+    assert checks == ["a"]
+
+    clock.now = 10.0
+    assert (await replica_set.pick()).name == "a"
+    assert checks == ["a", "a"]
+
+
+@pytest.mark.asyncio
+async def test_mark_failed_removes_replica_until_next_check():
+    clock = FakeClock()
+    replica_set, _ = make_replicas({"a": 0.0}, clock=clock)
+    replica = await replica_set.pick()
+
+    replica_set.mark_failed(replica, OSError("connection reset"))
+    assert await replica_set.pick() is None
+
+    clock.now = 10.0
+    assert await replica_set.pick() is replica
@@ -0,0 +1,138 @@
+import time
+
+import pytest
+import pytest_mock
+from unittest.mock import AsyncMock, MagicMock
+from starlette.requests import Request
+from src.database.main import (
+    PRIMARY_UNTIL_COOKIE,
+    after_commit,
+    from_replica,
+    get_db_session,
+    get_read_session,
+)
+
+
+@pytest.fixture
+def session(mocker: pytest_mock.MockFixture):
+    session = AsyncMock()
+    session.info = {}
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=session)
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    mocker.patch("src.database.main.Session", factory)
+    return session
+
+
+@pytest.mark.asyncio
+async def test_get_db_session_commits_once(session):
+    dependency = get_db_session()
+    assert await anext(dependency) is session
+    with pytest.raises(StopAsyncIteration):
+        await anext(dependency)
+    session.commit.assert_awaited_once()
+    session.rollback.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_db_session_rolls_back_on_error(session):
+    dependency = get_db_session()
+    await anext(dependency)
+    with pytest.raises(ValueError):
+        await dependency.athrow(ValueError())
+    session.commit.assert_not_awaited()
+    session.rollback.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_after_commit_callbacks_run_once_committed(session):
+    calls = []
+
+    async def callback():
+        calls.append(session.commit.await_count)
+
+    dependency = get_db_session()
+    await anext(dependency)
+    after_commit(session, callback)
+    assert calls == []
+    with pytest.raises(StopAsyncIteration):
+        await anext(dependency)
+    assert calls == [1]
+
+
+@pytest.mark.asyncio
+async def test_after_commit_callbacks_dropped_on_rollback(session):
+    callback = AsyncMock()
+    dependency = get_db_session()
+    await anext(dependency)
+    after_commit(session, callback)
+    with pytest.raises(ValueError):
+        await dependency.athrow(ValueError())
+    callback.assert_not_awaited()
+    assert session.info == {}
+
+
+def make_request(cookies: str = "") -> Request:
+    headers = [(b"cookie", cookies.encode())] if cookies else []
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+@pytest.fixture
+def replica(mocker: pytest_mock.MockFixture):
+    replica_session = AsyncMock()
+    replica_session.info = {}
+    replica = MagicMock()
+    replica.session_factory.return_value.__aenter__ = AsyncMock(
+        return_value=replica_session
+    )
+    replica.session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    replica.session = replica_session
+
+    replica_set = MagicMock()
+    replica_set.__bool__.return_value = True
+    replica_set.pick = AsyncMock(return_value=replica)
+    mocker.patch("src.database.main.replicas", replica_set)
+    replica.replica_set = replica_set
+    return replica
+
+
+@pytest.mark.asyncio
+async def test_get_read_session_uses_replica(session, replica):
+    request = make_request()
+    dependency = get_read_session(request)
+    assert await anext(dependency) is replica.session
+    assert from_replica(replica.session)
+    assert request.state.read_only
+    with pytest.raises(StopAsyncIteration):
+        await anext(dependency)
+    replica.session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_read_session_sticks_to_primary_after_write(session, replica):
+    cookie = f"{PRIMARY_UNTIL_COOKIE}={time.time() + 5}"
+    dependency = get_read_session(make_request(cookie))
+    assert await anext(dependency) is session
+    replica.replica_set.pick.assert_not_awaited()
+
+    expired = f"{PRIMARY_UNTIL_COOKIE}={time.time() - 1}"
+    dependency = get_read_session(make_request(expired))
+    assert await anext(dependency) is replica.session
+
+
+@pytest.mark.asyncio
+async def test_get_read_session_falls_back_to_primary(session, replica):
+    replica.replica_set.pick.return_value = None
+    dependency = get_read_session(make_request())
+    assert await anext(dependency) is session
+    assert not from_replica(session)
+
+
+@pytest.mark.asyncio
+async def test_get_read_session_marks_unreachable_replica(session, replica):
+    dependency = get_read_session(make_request())
+    await anext(dependency)
+    error = ConnectionRefusedError()
+    with pytest.raises(ConnectionRefusedError):
+        await dependency.athrow(error)
+    replica.replica_set.mark_failed.assert_called_once_with(replica, error)
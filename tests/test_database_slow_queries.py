@@ -0,0 +1,102 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_mock
+
+from src.database.instrumentation import current_operation
+from src.database.slow_queries import SlowQueryLog, redact
+
+SELECT = "SELECT contacts.id FROM contacts WHERE contacts.phone_e164 = $1::VARCHAR"
+
+
+@pytest.fixture
+def engine():
+    engine = MagicMock()
+    engine.url.render_as_string.return_value = "postgresql+asyncpg://db/contacts"
+    return engine
+
+
+@pytest.fixture
+def explained(mocker: pytest_mock.MockFixture):
+    calls = []
+
+    async def explain(async_engine, statement, parameters):
+        calls.append((statement, parameters))
+        return "Seq Scan on contacts"
+
+    mocker.patch("src.database.slow_queries.explain", explain)
+    return calls
+
+
+def make_log(**overrides):
+    options = dict(threshold_ms=100, size=2, explain_rate=1.0, explain_timeout=1.0)
+    return SlowQueryLog(**{**options, **overrides})
+
+
+def test_redact_hides_personal_values():
+    assert redact(("+972501234567", 7, None, [1, 2], 1.5)) == [
+        "<str:13>",
+        7,
+        None,
+        "<list:2>",
+        1.5,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_records_call_site_and_captures_plan(engine, explained):
+    log = make_log()
+    token = current_operation.set("search_contact")
+    try:
+        entry = log.record(engine, SELECT, ("+972501234567",), 0.25)
+    finally:
+        current_operation.reset(token)
+
+    assert entry.operation == "search_contact"
+    assert entry.duration_ms == 250.0
+    assert entry.parameters == ["<str:13>"]
+    assert entry.plan_status == "pending"
+
+    await asyncio.gather(*log._tasks)
+    assert entry.plan_status == "captured"
+    assert entry.plan == "Seq Scan on contacts"
+    # The EXPLAIN gets the real values, only the log is redacted
+    assert explained == [(SELECT, ("+972501234567",))]
+
+
+@pytest.mark.asyncio
+async def test_only_sampled_selects_are_explained(engine, explained):
+    log = make_log(explain_rate=0.5, sample=lambda: 0.9)
+    assert log.record(engine, SELECT, (), 0.2).plan_status is None
+
+    log = make_log()
+    entry = log.record(engine, "UPDATE contacts SET address=$1::VARCHAR", ("x",), 0.2)
+    assert entry.plan_status is None
+    assert explained == []
+
+
+@pytest.mark.asyncio
+async def test_failed_explain_is_reported(engine, mocker: pytest_mock.MockFixture):
+    async def explain(async_engine, statement, parameters):
+        raise ConnectionResetError("connection reset")
+
+    mocker.patch("src.database.slow_queries.explain", explain)
+    log = make_log()
+    entry = log.record(engine, SELECT, (), 0.2)
+    await asyncio.gather(*log._tasks)
+
+    assert entry.plan_status == "failed"
+    assert entry.plan == "connection reset"
+    assert log.explaining is False
+
+
+@pytest.mark.asyncio
+async def test_ring_buffer_keeps_newest_entries(engine, explained):
+    log = make_log(explain_rate=0.0)
+    for elapsed in (0.1, 0.2, 0.3):
+        log.record(engine, SELECT, (), elapsed)
+
+    stats = log.stats()
+    assert stats["recorded"] == 3
+    assert [query["duration_ms"] for query in stats["queries"]] == [300.0, 200.0]
@@ -0,0 +1,89 @@
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_mock
+from httpx import ASGITransport, AsyncClient
+from fastapi import FastAPI
+
+from src.contacts.database import ContactDBLayer
+from src.database import warmup
+from src.internal.routes import probe_router
+
+
+class FakeEngine:
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.open = 0
+        self.max_open = 0
+
+    @asynccontextmanager
+    async def connect(self):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionRefusedError("refused")
+        self.open += 1
+        self.max_open = max(self.max_open, self.open)
+        try:
+            yield AsyncMock()
+        finally:
+            self.open -= 1
+
+
+@pytest.fixture(autouse=True)
+def readiness(mocker: pytest_mock.MockFixture):
+    readiness = warmup.Readiness()
+    mocker.patch("src.database.warmup.readiness", readiness)
+    mocker.patch("src.internal.routes.readiness", readiness)
+    mocker.patch("src.database.warmup.WARM_UP_RETRY_DELAY", 0)
+    return readiness
+
+
+@pytest.mark.asyncio
+async def test_warm_up_holds_connections_at_once(readiness):
+    engines = [FakeEngine(), FakeEngine()]
+    sessions = []
+
+    async def warm_up(session):
+        sessions.append(session)
+        await asyncio.sleep(0)
+
+    await warmup.warm_up_engines(engines, connections=3, warm_up=warm_up)
+
+    assert len(sessions) == 6
+    assert [engine.max_open for engine in engines] == [3, 3]
+    assert readiness.ready is True
+
+
+@pytest.mark.asyncio
+async def test_warm_up_retries_until_database_is_reachable(readiness):
+    engine = FakeEngine(failures=2)
+    await warmup.warm_up_engines([engine], connections=1, warm_up=AsyncMock())
+    assert readiness.ready is True
+    assert readiness.attempts == 3
+    assert readiness.error is None
+
+
+@pytest.mark.asyncio
+async def test_db_layer_warm_up_runs_statements():
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=MagicMock())
+    await ContactDBLayer().warm_up(session)
+    assert session.execute.await_count >= 10
+
+
+@pytest.mark.asyncio
+async def test_ready_endpoint(readiness):
+    app = FastAPI()
+    app.include_router(probe_router)
+    async with AsyncClient(
+        base_url="http://test", transport=ASGITransport(app)
+    ) as client:
+        response = await client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+
+        readiness.ready = True
+        response = await client.get("/ready")
+        assert response.status_code == 200
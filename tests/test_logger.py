@@ -0,0 +1,46 @@
+import io
+import json
+import logging
+from src.logger import AppLogger
+
+
+class Unprintable:
+    def __str__(self):
+        raise AssertionError("formatted although DEBUG is disabled")
+
+
+def test_logs_are_written_by_listener():
+    stream = io.StringIO()
+    logger = AppLogger(name="test_listener", stream=stream)
+    logger.info("Contact %s created", 1)
+    logger.stop()
+    assert stream.getvalue().rstrip().endswith("| INFO | Contact 1 created")
+
+
+def test_disabled_level_is_not_formatted():
+    stream = io.StringIO()
+    logger = AppLogger(name="test_lazy", level=logging.INFO, stream=stream)
+    logger.debug("Value %s", Unprintable())
+    logger.stop()
+    assert stream.getvalue() == ""
+
+
+def test_json_output():
+    stream = io.StringIO()
+    logger = AppLogger(name="test_json", json_output=True, stream=stream)
+    logger.warning("Contact %s not found", 9)
+    logger.stop()
+    record = json.loads(stream.getvalue())
+    assert record["level"] == "WARNING"
+    assert record["message"] == "Contact 9 not found"
+
+
+def test_sampling(mocker):
+    stream = io.StringIO()
+    logger = AppLogger(name="test_sampling", stream=stream)
+    mocker.patch("src.logger.random.random", side_effect=[0.05, 0.5])
+    logger.info("kept", sample=0.1)
+    logger.info("dropped", sample=0.1)
+    logger.stop()
+    assert "kept" in stream.getvalue()
+    assert "dropped" not in stream.getvalue()
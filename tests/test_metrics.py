@@ -0,0 +1,54 @@
+import json
+import pytest
+from src.database.instrumentation import current_operation, label_queries
+from src.metrics import MetricsRegistry
+
+
+def test_render_histogram():
+    registry = MetricsRegistry()
+    family = registry.histogram("latency_seconds", "Latency", ("route",))
+    family.observe(("/contacts",), 0.003)
+    family.observe(("/contacts",), 20)
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{route="/contacts",le="0.0025"} 0' in text
+    assert 'latency_seconds_bucket{route="/contacts",le="0.005"} 1' in text
+    assert 'latency_seconds_bucket{route="/contacts",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{route="/contacts"} 2' in text
+
+
+def test_merges_worker_snapshots(tmp_path):
+    other_worker = MetricsRegistry()
+    other_worker.histogram("latency_seconds", "Latency", ("route",)).observe(
+        ("/contacts",), 0.003
+    )
+    (tmp_path / "metrics_1.json").write_text(json.dumps(other_worker.snapshot()))
+
+    registry = MetricsRegistry(multiproc_dir=str(tmp_path))
+    registry.histogram("latency_seconds", "Latency", ("route",)).observe(
+        ("/contacts",), 0.2
+    )
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/contacts",le="0.005"} 1' in text
+    assert 'latency_seconds_count{route="/contacts"} 2' in text
+
+
+@pytest.mark.asyncio
+async def test_label_queries():
+    @label_queries
+    class Layer:
+        async def get_contact(self):
+            return current_operation.get()
+
+        async def stream_contacts(self):
+            yield current_operation.get()
+            yield current_operation.get()
+
+    layer = Layer()
+    assert await layer.get_contact() == "get_contact"
+    assert [label async for label in layer.stream_contacts()] == [
+        "stream_contacts",
+        "stream_contacts",
+    ]
+    assert current_operation.get() == "other"
@@ -0,0 +1,68 @@
+import pytest
+import pytest_mock
+
+from src import server
+from src.config import Config
+
+
+@pytest.mark.parametrize(
+    "workers, budget, expected",
+    [
+        (4, 100, (5, 20)),
+        (8, 20, (2, 0)),
+        (3, 10, (3, 0)),
+    ],
+)
+def test_split_pool_budget(mocker: pytest_mock.MockFixture, workers, budget, expected):
+    mocker.patch.object(Config, "DB_POOL_SIZE", 5)
+    pool_size, max_overflow = server.split_pool_budget(workers, budget)
+    assert (pool_size, max_overflow) == expected
+    assert (pool_size + max_overflow) * workers <= budget
+
+
+def test_split_pool_budget_too_small():
+    with pytest.raises(ValueError):
+        server.split_pool_budget(workers=8, budget=4)
+
+
+def test_worker_count_prefers_setting(mocker: pytest_mock.MockFixture):
+    mocker.patch.object(Config, "WEB_WORKERS", 3)
+    assert server.worker_count() == 3
+
+    mocker.patch.object(Config, "WEB_WORKERS", None)
+    assert server.worker_count() >= 1
+
+
+def test_main_hands_scaled_pool_to_workers(mocker: pytest_mock.MockFixture):
+    mocker.patch.object(Config, "WEB_WORKERS", 4)
+    mocker.patch.object(Config, "DB_MAX_CONNECTIONS", 40)
+    mocker.patch.object(Config, "DB_POOL_SIZE", 5)
+    mocker.patch.object(Config, "METRICS_MULTIPROC_DIR", "/tmp/metrics")
+    environ = mocker.patch.dict("os.environ", {})
+    run = mocker.patch("src.server.uvicorn.run")
+
+    server.main()
+
+    assert environ["DB_POOL_SIZE"] == "5"
+    assert environ["DB_MAX_OVERFLOW"] == "5"
+    assert run.call_args.kwargs["workers"] == 4
+    assert run.call_args.kwargs["timeout_graceful_shutdown"] == (
+        Config.WEB_GRACEFUL_TIMEOUT
+    )
+
+
+def test_main_disables_cache_with_several_workers(mocker: pytest_mock.MockFixture):
+    mocker.patch.object(Config, "WEB_WORKERS", 2)
+    mocker.patch.object(Config, "DB_MAX_CONNECTIONS", None)
+    mocker.patch.object(Config, "METRICS_MULTIPROC_DIR", "/tmp/metrics")
+    mocker.patch.object(Config, "CONTACT_CACHE_BACKEND", None)
+    environ = mocker.patch.dict("os.environ", {})
+    mocker.patch("src.server.uvicorn.run")
+
+    server.main()
+    assert environ["CONTACT_CACHE_BACKEND"] == "none"
+
+    environ.clear()
+    mocker.patch.object(Config, "CONTACT_CACHE_BACKEND", "lru_ttl")
+    server.main()
+    assert "CONTACT_CACHE_BACKEND" not in environ